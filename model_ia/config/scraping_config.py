@@ -8,3 +8,44 @@ MAX_COMMENTS_PER_POST = 200  # maximum de commentaires par post à collecter
 
 WAIT_MIN = 1
 WAIT_MAX = 3
+
+# Écriture bufferisée (SQLite / JSONL / CSV)
+FLUSH_SIZE = 50        # nombre de lignes avant écriture d'un lot
+FLUSH_INTERVAL = 10    # secondes max entre deux écritures
+
+# Scraping parallèle
+SCRAPING_WORKERS = 1         # nombre de navigateurs en parallèle (1 = séquentiel)
+DOMAIN_MIN_INTERVAL = 1.0    # secondes min entre deux requêtes vers un même domaine
+
+# Scraping incrémental
+INCREMENTAL_STOP_AFTER = 10  # posts déjà en base d'affilée avant d'arrêter de scroller
+
+# Profil navigateur
+HEADLESS = False             # Chrome sans fenêtre
+LEAN_PROFILE = False         # profil allégé : pas d'images/médias/polices, chargement "eager"
+BLOCKED_URL_PATTERNS = [     # motifs bloqués via CDP (Network.setBlockedURLs) en profil allégé
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m4a", "*.mp3", "*.m3u8", "*.ts",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*video*.fbcdn.net/*",
+]
+
+# Attentes adaptatives
+WAIT_STRATEGY = "adaptive"   # "adaptive" : attente sur condition, "fixed" : pause WAIT_MIN–WAIT_MAX
+WAIT_TIMEOUT = 10            # secondes max d'attente d'une condition (nouveaux posts...)
+COMMENT_WAIT_TIMEOUT = 3     # secondes max pour voir apparaître des commentaires après un clic
+WAIT_POLL = 0.2              # intervalle de vérification de la condition
+POLITENESS_FLOOR = 1.0       # délai minimal entre deux actions, même si la page est déjà chargée
+MAX_EMPTY_SCROLLS = 2        # scrolls sans nouveau post d'affilée avant de considérer le fil terminé
+
+# Planification des crawls (scheduler.py)
+SCHEDULE_RATE_WINDOW_DAYS = 7      # fenêtre d'estimation du rythme de publication
+SCHEDULE_TARGET_NEW_POSTS = 20     # nouveaux posts visés par crawl (fixe l'intervalle)
+SCHEDULE_MIN_INTERVAL_H = 1        # intervalle minimal entre deux crawls d'une source
+SCHEDULE_MAX_INTERVAL_H = 72       # intervalle maximal (sources calmes)
+SCHEDULE_MIN_SCROLLS = 2           # budget de scrolls minimal par crawl
+SCHEDULE_POSTS_PER_SCROLL = 4      # nouveaux posts chargés en moyenne par scroll
+
+# Commentaires en onglets (CommentScraper, expansion="tabs")
+COMMENT_TABS = 4                 # onglets de posts ouverts en même temps
+COMMENT_POST_TIME_BUDGET = 30    # secondes max passées sur les commentaires d'un post
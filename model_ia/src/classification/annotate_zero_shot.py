@@ -1,12 +1,30 @@
 import os
 import csv
 import json
+import time
+import hashlib
 import random
 import sqlite3
+import argparse
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+import torch
 from transformers import pipeline
 
+from src.scraping.utils.post_identity import stable_post_id
+from src.scraping.utils.storage import migrate_posts_table
+from src.classification.inference.bucketed import TOKEN_BUDGET
+from src.classification.inference.backends import load_backend
+from src.classification.inference.zero_shot import BatchedZeroShot, ZERO_SHOT_MODEL
+
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.annotate_zero_shot                    # zero-shot par lots (CPU ou GPU)
+#   python -m src.classification.annotate_zero_shot --cascade 0.9      # CamemBERT d'abord, zero-shot si score < 0.9
+#   python -m src.classification.annotate_zero_shot --engine pipeline  # ancien chemin, un texte à la fois
+#   python -m src.classification.annotate_zero_shot --restart          # ignorer les annotations existantes
+# Une exécution interrompue reprend là où elle s'est arrêtée : les posts déjà annotés
+# pour le jeu de labels courant (base ou fichiers de sortie) ne sont pas recalculés.
+
 # --------------------------
 # Config
 # --------------------------
@@ -16,6 +34,7 @@ CSV_IN = DATA_DIR / "facebook_posts.csv"
 DB_IN = DATA_DIR / "facebook_posts.db"
 CSV_OUT = DATA_DIR / "facebook_posts_annotated.csv"
 JSON_OUT = DATA_DIR / "facebook_posts_annotated.json"
+JSONL_OUT = DATA_DIR / "facebook_posts_annotated.jsonl"  # écrit lot par lot, JSON_OUT en est régénéré
 
 SAMPLE_SIZE = 2000  # Augmenté
 SEED = 42
@@ -23,6 +42,18 @@ SEED = 42
 LABELS = ["Politique","Gouvernance","Économie", "Sécurité", "Santé", "Culture", "Sport", "Autres", "Social", "Environnement", "Diplomatie","Justice","Humanitaire"]
 HYPOTHESIS_TEMPLATE = "Ce texte parle de {}."
 
+# Cascade : le classifieur CamemBERT fine-tuné (mêmes labels, même ordre) annote les posts
+# dont il est sûr ; seuls les autres passent par le modèle zero-shot
+CAMEMBERT_PATH = "src/classification/saved_models/camembert_classifier/"
+CAMEMBERT_BACKEND = "bucketed"
+ZERO_SHOT_CHUNK = 256  # posts par appel au moteur zero-shot (progression, mémoire des paires)
+COMMIT_BATCH = 256     # posts annotés puis enregistrés (base + fichiers) à la fois
+ERROR_SOURCE = "erreur"  # category_source d'un post dont l'inférence a échoué : jamais enregistré
+
+# Colonnes ajoutées aux posts ; category_labelset identifie le jeu de labels
+# (LABELS + gabarit) avec lequel le post a été annoté
+ANNOTATION_FIELDS = ["post_id", "category", "category_score", "category_source", "category_labelset"]
+
 # --------------------------
 # Fonctions utilitaires
 # --------------------------
@@ -63,63 +94,286 @@ def sample_posts(posts: List[dict], n: int) -> List[dict]:
 def ensure_output_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-def add_category_column_db(db_path: Path):
-    conn = sqlite3.connect(str(db_path))
-    cur = conn.cursor()
-    try:
-        cur.execute("PRAGMA table_info(posts)")
-        cols = [r[1] for r in cur.fetchall()]
-        if "category" not in cols:
-            cur.execute("ALTER TABLE posts ADD COLUMN category TEXT")
-            conn.commit()
-            print("✅ Colonne 'category' ajoutée à la table posts (DB).")
-        else:
-            print("ℹ️ Colonne 'category' déjà présente.")
-    except Exception as e:
-        print("⚠️ Impossible d'ajouter la colonne 'category' dans la DB :", e)
-    finally:
-        conn.close()
+def label_set_version() -> str:
+    """Hash du jeu de labels et du gabarit : changer l'un ou l'autre relance l'annotation."""
+    payload = json.dumps([LABELS, HYPOTHESIS_TEMPLATE], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
 
-def write_outputs(annotated: List[dict]):
-    # CSV
-    fieldnames = list(annotated[0].keys()) if annotated else ["id","page","content","category"]
-    with open(CSV_OUT, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in annotated:
-            writer.writerow(r)
-    print(f"📁 CSV sauvegardé : {CSV_OUT}")
-
-    # JSON
-    with open(JSON_OUT, "w", encoding="utf-8") as f:
-        json.dump(annotated, f, ensure_ascii=False, indent=2)
-    print(f"📁 JSON sauvegardé : {JSON_OUT}")
-
-def update_db_categories(db_path: Path, annotated: List[dict]):
+# --------------------------
+# Base des posts : staging + mise à jour groupée
+# --------------------------
+def add_category_column_db(db_path: Path) -> Optional[sqlite3.Connection]:
+    """
+    Ouvre la base, ajoute post_id (migration du scraper) et les colonnes
+    d'annotation si besoin, et crée la table de staging. None si pas de base.
+    """
     if not db_path.exists():
         print("⚠️ DB introuvable, saut mise à jour DB.")
-        return
+        return None
     conn = sqlite3.connect(str(db_path))
-    cur = conn.cursor()
     try:
-        for r in annotated:
-            pid = r.get("id")
-            cat = r.get("category")
-            if pid is None:
-                continue
-            cur.execute("UPDATE posts SET category = ? WHERE id = ?", (cat, pid))
-        conn.commit()
-        print("✅ DB mise à jour (categories).")
+        migrate_posts_table(conn)
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(posts)")]
+        with conn:
+            for col, sql_type in (("category", "TEXT"), ("category_score", "REAL"),
+                                  ("category_source", "TEXT"), ("category_labelset", "TEXT")):
+                if col not in cols:
+                    conn.execute(f"ALTER TABLE posts ADD COLUMN {col} {sql_type}")
+                    print(f"✅ Colonne '{col}' ajoutée à la table posts (DB).")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS annotation_staging(
+                    post_id TEXT PRIMARY KEY,
+                    category TEXT,
+                    category_score REAL,
+                    category_source TEXT,
+                    category_labelset TEXT
+                )
+            """)
+            conn.execute("DELETE FROM annotation_staging")  # reste d'un lot interrompu
+        return conn
     except Exception as e:
-        print("⚠️ Erreur lors de la mise à jour DB :", e)
-    finally:
+        print("⚠️ Impossible de préparer la DB pour l'annotation :", e)
         conn.close()
+        return None
+
+def load_db_annotations(conn: sqlite3.Connection, labelset: str) -> dict:
+    """{post_id: (category, score, source)} déjà annotés en base pour ce jeu de labels."""
+    rows = conn.execute(
+        "SELECT post_id, category, category_score, category_source FROM posts "
+        "WHERE category_labelset = ? AND category IS NOT NULL", (labelset,)
+    )
+    return {pid: (cat, score, source) for pid, cat, score, source in rows}
+
+# UPDATE ... FROM : SQLite >= 3.33 ; sinon sous-requêtes corrélées sur la table de staging
+UPDATE_FROM_SUPPORTED = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+def update_db_categories(conn: sqlite3.Connection, annotated: List[dict]):
+    """
+    Un lot = un executemany dans annotation_staging puis un seul UPDATE
+    (jointure sur post_id), dans une transaction : le lot est en base ou pas du tout.
+    Lève sqlite3.Error en cas d'échec (base verrouillée...) : l'appelant ne doit
+    pas marquer le lot comme annoté.
+    """
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO annotation_staging VALUES (?, ?, ?, ?, ?)",
+            [(r["post_id"], r["category"], r.get("category_score"), r.get("category_source"),
+              r["category_labelset"]) for r in annotated]
+        )
+        if UPDATE_FROM_SUPPORTED:
+            conn.execute("""
+                UPDATE posts SET
+                    category = s.category,
+                    category_score = s.category_score,
+                    category_source = s.category_source,
+                    category_labelset = s.category_labelset
+                FROM annotation_staging AS s
+                WHERE posts.post_id = s.post_id
+            """)
+        else:
+            conn.execute("""
+                UPDATE posts SET
+                    category = (SELECT s.category FROM annotation_staging s WHERE s.post_id = posts.post_id),
+                    category_score = (SELECT s.category_score FROM annotation_staging s WHERE s.post_id = posts.post_id),
+                    category_source = (SELECT s.category_source FROM annotation_staging s WHERE s.post_id = posts.post_id),
+                    category_labelset = (SELECT s.category_labelset FROM annotation_staging s WHERE s.post_id = posts.post_id)
+                WHERE post_id IN (SELECT post_id FROM annotation_staging)
+            """)
+        conn.execute("DELETE FROM annotation_staging")
+
+# --------------------------
+# Fichiers de sortie incrémentaux
+# --------------------------
+class AnnotationOutputs:
+    """
+    CSV et JSONL complétés à chaque lot. En reprise, les posts déjà présents
+    dans le CSV (même jeu de labels) sont ignorés ; sinon les fichiers
+    repartent de zéro. Le JSON (tableau) est régénéré depuis le JSONL à la fin.
+    """
+
+    def __init__(self, fieldnames: List[str], labelset: str, resume: bool = True):
+        self.fieldnames = fieldnames
+        self.done = set()
+        existing = self.read_existing(labelset) if resume else None
+        if existing is not None:
+            self.fieldnames, self.done = existing
+        else:
+            with open(CSV_OUT, "w", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=self.fieldnames).writeheader()
+            open(JSONL_OUT, "w", encoding="utf-8").close()
+
+    @staticmethod
+    def read_existing(labelset: str):
+        if not CSV_OUT.exists() or not JSONL_OUT.exists():
+            return None
+        with open(CSV_OUT, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = reader.fieldnames
+        if not fieldnames or "category_labelset" not in fieldnames:
+            return None  # ancien format : on réannote
+        if any(r.get("category_labelset") != labelset for r in rows):
+            return None  # autre jeu de labels
+        return fieldnames, {r["post_id"] for r in rows}
+
+    def append(self, annotated: List[dict]):
+        with open(JSONL_OUT, "a", encoding="utf-8") as f:
+            for r in annotated:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        with open(CSV_OUT, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction="ignore")
+            for r in annotated:
+                writer.writerow(r)
+        self.done.update(r["post_id"] for r in annotated)
+
+    def finish(self):
+        by_id = {}
+        with open(JSONL_OUT, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    r = json.loads(line)
+                    by_id[r["post_id"]] = r
+        with open(JSON_OUT, "w", encoding="utf-8") as f:
+            json.dump(list(by_id.values()), f, ensure_ascii=False, indent=2)
+        print(f"📁 CSV sauvegardé : {CSV_OUT}")
+        print(f"📁 JSON sauvegardé : {JSON_OUT} ({len(by_id)} posts)")
+
+# --------------------------
+# Annotation
+# --------------------------
+def new_cost(name: str) -> dict:
+    return {"stage": name, "posts": 0, "forward_passes": 0, "seconds": 0.0}
+
+class Annotator:
+    """Modèles chargés une fois (au premier lot qui en a besoin) ; coût cumulé par étape."""
+
+    def __init__(self, args):
+        self.args = args
+        self.camembert = None
+        self.zero_shot = None
+        self.costs = ([new_cost("camembert")] if args.cascade is not None else []) + [new_cost("zero-shot")]
+
+    def annotate(self, posts: List[dict]):
+        """Renseigne category / category_score / category_source des `posts`."""
+        to_annotate = []
+        for p in posts:
+            if (p.get("content") or "").strip():
+                to_annotate.append(p)
+            else:
+                # Posts vides : 'Autres' sans passer par un modèle
+                p["category"] = "Autres"
+                p["category_score"] = 0.0
+                p["category_source"] = "vide"
+
+        if self.args.cascade is not None and to_annotate:
+            to_annotate = self.annotate_with_camembert(to_annotate, self.costs[0])
+        if to_annotate:
+            if self.args.engine == "pipeline":
+                self.annotate_pipeline(to_annotate, self.costs[-1])
+            else:
+                self.annotate_batched(to_annotate, self.costs[-1])
+
+    def annotate_with_camembert(self, posts: List[dict], cost: dict) -> List[dict]:
+        """Annote les posts dont le score CamemBERT atteint le seuil ; retourne les autres."""
+        start = time.perf_counter()
+        if self.camembert is None:
+            print(f"⚙️ Cascade : CamemBERT ({CAMEMBERT_PATH}) puis zero-shot sous le seuil {self.args.cascade}")
+            self.camembert = load_backend(CAMEMBERT_PATH, CAMEMBERT_BACKEND, max_length=256)
+        passes = self.camembert.forward_passes
+        results = self.camembert([(p.get("content") or "").strip() for p in posts])
+        remaining = []
+        for p, r in zip(posts, results):
+            if r["score"] >= self.args.cascade:
+                p["category"] = LABELS[int(r["label"].split("_")[-1])]
+                p["category_score"] = float(r["score"])
+                p["category_source"] = "camembert"
+            else:
+                remaining.append(p)
+        cost["posts"] += len(posts) - len(remaining)
+        cost["forward_passes"] += self.camembert.forward_passes - passes
+        cost["seconds"] += time.perf_counter() - start
+        return remaining
+
+    def annotate_batched(self, posts: List[dict], cost: dict):
+        start = time.perf_counter()
+        if self.zero_shot is None:
+            print(f"⚙️ Zero-shot par lots ({self.args.model}) sur", "GPU" if torch.cuda.is_available() else "CPU")
+            self.zero_shot = BatchedZeroShot(LABELS, HYPOTHESIS_TEMPLATE, model_name=self.args.model,
+                                             token_budget=self.args.token_budget, threads=self.args.threads)
+        passes = self.zero_shot.stats["forward_passes"]
+        for i in range(0, len(posts), ZERO_SHOT_CHUNK):
+            chunk = posts[i:i + ZERO_SHOT_CHUNK]
+            try:
+                results = self.zero_shot([(p.get("content") or "").strip() for p in chunk])
+            except Exception as e:
+                print(f"⚠️ Erreur zero-shot pour les posts {i}-{i + len(chunk)}:", e)
+                results, source = [("Autres", 0.0)] * len(chunk), ERROR_SOURCE
+            else:
+                source = "zero-shot"
+            for p, (label, score) in zip(chunk, results):
+                p["category"] = label
+                p["category_score"] = score
+                p["category_source"] = source
+        cost["posts"] += len(posts)
+        cost["forward_passes"] += self.zero_shot.stats["forward_passes"] - passes
+        cost["seconds"] += time.perf_counter() - start
+
+    def annotate_pipeline(self, posts: List[dict], cost: dict):
+        """Ancien chemin : un texte à la fois, une passe avant par label."""
+        start = time.perf_counter()
+        if self.zero_shot is None:
+            device_id = 0 if torch.cuda.is_available() else -1
+            print("⚙️ Chargement du modèle zero-shot sur", "GPU" if device_id==0 else "CPU")
+            self.zero_shot = pipeline("zero-shot-classification",
+                                      model=self.args.model,
+                                      device=device_id)
+
+        for i, p in enumerate(posts, 1):
+            text = (p.get("content") or "").strip()
+            try:
+                out = self.zero_shot(text, LABELS, hypothesis_template=HYPOTHESIS_TEMPLATE, multi_label=False)
+                top_label = out["labels"][0]
+                top_score = out["scores"][0]
+                p["category"] = top_label
+                p["category_score"] = float(top_score)
+                p["category_source"] = "zero-shot"
+            except Exception as e:
+                print(f"⚠️ Erreur zero-shot pour post {i} (id {p.get('id')}):", e)
+                p["category"] = "Autres"
+                p["category_score"] = 0.0
+                p["category_source"] = ERROR_SOURCE
+        cost["posts"] += len(posts)
+        cost["forward_passes"] += len(posts) * len(LABELS)
+        cost["seconds"] += time.perf_counter() - start
+
+def print_cost_report(costs: List[dict], n_posts: int):
+    print("\n===== Coût de l'annotation =====")
+    print(f"{'étape':<12}{'posts':>8}{'passes':>9}{'secondes':>10}{'passes/post':>13}{'s/post':>9}")
+    total_passes = sum(c["forward_passes"] for c in costs)
+    total_seconds = sum(c["seconds"] for c in costs)
+    for c in costs + [{"stage": "total", "posts": n_posts, "forward_passes": total_passes, "seconds": total_seconds}]:
+        per_post = max(c["posts"], 1)
+        print(f"{c['stage']:<12}{c['posts']:>8}{c['forward_passes']:>9}{c['seconds']:>10.1f}"
+              f"{c['forward_passes'] / per_post:>13.2f}{c['seconds'] / per_post:>9.3f}")
 
 # --------------------------
 # Main
 # --------------------------
 def main():
+    parser = argparse.ArgumentParser(description="Annotation zero-shot des posts")
+    parser.add_argument("--engine", choices=["batched", "pipeline"], default="batched",
+                        help="batched : paires NLI en lots à budget de tokens ; pipeline : ancien chemin")
+    parser.add_argument("--cascade", type=float, default=None, metavar="SEUIL",
+                        help="CamemBERT annote les posts de score >= SEUIL, le zero-shot le reste")
+    parser.add_argument("--sample", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--model", default=ZERO_SHOT_MODEL)
+    parser.add_argument("--token-budget", type=int, default=TOKEN_BUDGET)
+    parser.add_argument("--threads", type=int, default=None, help="threads intra-op (CPU)")
+    parser.add_argument("--restart", action="store_true", help="réannoter sans tenir compte de l'existant")
+    args = parser.parse_args()
+
     ensure_output_dir()
+    labelset = label_set_version()
 
     # 1) Charger posts
     posts = load_posts_from_csv(CSV_IN)
@@ -130,49 +384,73 @@ def main():
         print("❌ Aucun post trouvé dans CSV ni DB. Arrêt.")
         return
 
-    print(f"ℹ️ {len(posts)} posts disponibles, échantillonnage de {SAMPLE_SIZE} posts pour annotation auto.")
-    sampled = sample_posts(posts, SAMPLE_SIZE)
-
-    # 2) Initialiser pipeline zero-shot (GPU si dispo)
-    device_id = 0 
-    print("⚙️ Chargement du modèle zero-shot sur", "GPU" if device_id==0 else "CPU")
-    classifier = pipeline("zero-shot-classification",
-                          model="joeddav/xlm-roberta-large-xnli",
-                          device=device_id)
-
-    annotated = []
-    for i, p in enumerate(sampled, 1):
-        text = (p.get("content") or "").strip()
-        if not text:
-            p["category"] = "Autres"
-            annotated.append(p)
+    print(f"ℹ️ {len(posts)} posts disponibles, échantillonnage de {args.sample} posts pour annotation auto.")
+    sampled = sample_posts(posts, args.sample)  # échantillon déterministe (SEED) : même liste à la reprise
+    for p in sampled:
+        # Même identifiant que la colonne posts.post_id du scraper
+        p["post_id"] = p.get("post_id") or stable_post_id(p.get("post_link"), p.get("content"))
+
+    # 2) Reprise : posts déjà dans les fichiers de sortie ou déjà annotés en base
+    conn = add_category_column_db(DB_IN)
+    fieldnames = list(sampled[0].keys()) + [f for f in ANNOTATION_FIELDS if f not in sampled[0]]
+    outputs = AnnotationOutputs(fieldnames, labelset, resume=not args.restart)
+    in_db = load_db_annotations(conn, labelset) if conn is not None and not args.restart else {}
+
+    pending, from_db = [], []
+    for p in sampled:
+        if p["post_id"] in outputs.done:
             continue
+        if p["post_id"] in in_db:
+            p["category"], p["category_score"], p["category_source"] = in_db[p["post_id"]]
+            p["category_labelset"] = labelset
+            from_db.append(p)
+        else:
+            pending.append(p)
+    if from_db:
+        outputs.append(from_db)
+    print(f"ℹ️ Jeu de labels {labelset} : {len(sampled) - len(pending)} posts déjà annotés, {len(pending)} à annoter.")
+
+    # 3) Annotation par lots, chaque lot enregistré (DB + fichiers) avant le suivant
+    annotator = Annotator(args)
+    annotated = failed = 0
+    interrupted = False
+    try:
+        for i in range(0, len(pending), COMMIT_BATCH):
+            batch = pending[i:i + COMMIT_BATCH]
+            annotator.annotate(batch)
+            # Posts en erreur d'inférence : ni base ni fichiers, réannotés à la prochaine exécution
+            errors = sum(p["category_source"] == ERROR_SOURCE for p in batch)
+            batch = [p for p in batch if p["category_source"] != ERROR_SOURCE]
+            for p in batch:
+                p["category_labelset"] = labelset
+            if conn is not None:
+                try:
+                    update_db_categories(conn, batch)
+                except sqlite3.Error as e:
+                    # Lot non marqué comme annoté : il sera réannoté à la prochaine exécution
+                    print(f"❌ Erreur lors de la mise à jour DB : {e}. Arrêt ; relancez pour reprendre.")
+                    interrupted = True
+                    break
+            outputs.append(batch)
+            annotated += len(batch)
+            failed += errors
+            print(f"  → Annotés {annotated}/{len(pending)} (enregistrés)")
+    finally:
+        if conn is not None:
+            conn.close()
 
-        try:
-            out = classifier(text, LABELS, hypothesis_template=HYPOTHESIS_TEMPLATE, multi_label=False)
-            top_label = out["labels"][0]
-            top_score = out["scores"][0]
-            p["category"] = top_label
-            p["category_score"] = float(top_score)
-            annotated.append(p)
-        except Exception as e:
-            print(f"⚠️ Erreur zero-shot pour post {i} (id {p.get('id')}):", e)
-            p["category"] = "Autres"
-            p["category_score"] = 0.0
-            annotated.append(p)
-
-        if i % 50 == 0:
-            print(f"  → Annotés {i}/{len(sampled)}")
-
-    # 3) Écrire fichiers de sortie
-    write_outputs(annotated)
-
-    # 4) Mise à jour DB
-    add_category_column_db(DB_IN)
-    update_db_categories(DB_IN, annotated)
+    # 4) JSON complet
+    outputs.finish()
 
+    print_cost_report(annotator.costs, annotated)
+    if interrupted:
+        print(f"⚠️ Annotation interrompue : {len(pending) - annotated} posts restent à annoter.")
+        return
+    if failed:
+        print(f"⚠️ {failed} posts en erreur d'inférence non enregistrés : relancez pour les réannoter.")
+        return
     print("🎉 Annotation zero-shot terminée.")
-    print(f"Résultats partiels : {CSV_OUT} / {JSON_OUT} / DB updated (posts.category)")
+    print(f"Résultats : {CSV_OUT} / {JSON_OUT} / DB updated (posts.category)")
 
 if __name__ == "__main__":
     main()
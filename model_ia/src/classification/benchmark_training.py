@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+
+import torch
+from torch.utils.data import DataLoader, Subset
+from transformers import CamembertForSequenceClassification
+
+from model import (PostsDataset, PaddedPostsDataset, DynamicPaddingCollator, LengthGroupedBatchSampler,
+                   get_tokenizer, TOKENIZER_NAME)
+
+TRAIN_CSV = "data/dataset_classification/train.csv"
+BENCH_CACHE_DIR = "data/cache/tokens_benchmark"
+
+
+# ==================================================================
+# 🔹 Benchmark : padding fixe vs padding dynamique (entraînement CPU)
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python src/classification/benchmark_training.py --steps 30
+#   python src/classification/benchmark_training.py --csv data/dataset_classification/val.csv --model camembert-base
+#
+# Chaque mode tourne dans un processus séparé (pic de RSS propre à chaque mode) :
+# - avant  : PaddedPostsDataset, lots aléatoires paddés à max_length ;
+# - après  : PostsDataset (cache mmap), lots groupés par longueur, padding dynamique.
+# « après » est lancé deux fois : cache vide (tokenisation) puis cache chaud
+# (redémarrage). On mesure les tokens réels (hors padding) traités par seconde
+# en entraînement (passe avant + arrière + optimiseur) et en évaluation.
+
+def run_mode(mode, csv_path, model_name, max_length, batch_size, steps, cache_dir):
+    torch.manual_seed(0)
+    tokenizer = get_tokenizer(model_name)
+
+    start = time.perf_counter()
+    if mode == "avant":
+        dataset = PaddedPostsDataset(csv_path, max_length, tokenizer=tokenizer)
+        train_loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+        eval_loader = DataLoader(dataset, batch_size=batch_size)
+    else:
+        dataset = PostsDataset(csv_path, max_length, tokenizer=tokenizer, cache_dir=cache_dir)
+        collator = DynamicPaddingCollator(tokenizer.pad_token_id)
+        train_loader = DataLoader(dataset, batch_sampler=LengthGroupedBatchSampler(dataset.lengths, batch_size),
+                                  collate_fn=collator)
+        eval_loader = DataLoader(Subset(dataset, dataset.length_order()), batch_size=batch_size,
+                                 collate_fn=collator)
+    load_seconds = time.perf_counter() - start
+
+    model = CamembertForSequenceClassification.from_pretrained(
+        model_name, num_labels=len(dataset.label_map), ignore_mismatched_sizes=True
+    )
+    optimizer = torch.optim.AdamW(model.parameters(), lr=2e-5)
+
+    def consume(loader, train):
+        real = padded = 0
+        start = time.perf_counter()
+        for step, batch in enumerate(loader):
+            if train and step >= steps:
+                break
+            if train:
+                loss = model(**batch).loss
+                loss.backward()
+                optimizer.step()
+                optimizer.zero_grad()
+            else:
+                with torch.inference_mode():
+                    model(**batch)
+            real += int(batch["attention_mask"].sum())
+            padded += batch["input_ids"].numel()
+        return real, padded, time.perf_counter() - start
+
+    model.train()
+    train_real, train_padded, train_seconds = consume(train_loader, train=True)
+    model.eval()
+    eval_real, eval_padded, eval_seconds = consume(eval_loader, train=False)
+
+    return {
+        "mode": mode,
+        "load_s": load_seconds,
+        "train_tok_s": train_real / train_seconds,
+        "train_pad": 1 - train_real / train_padded,
+        "eval_tok_s": eval_real / eval_seconds,
+        "eval_pad": 1 - eval_real / eval_padded,
+        "eval_s": eval_seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'entraînement / évaluation CPU : avant / après")
+    parser.add_argument("--csv", default=TRAIN_CSV, help="CSV avec colonnes message / category")
+    parser.add_argument("--model", default=TOKENIZER_NAME)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=30, help="pas d'entraînement mesurés")
+    parser.add_argument("--mode", choices=["avant", "après"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:  # processus enfant
+        result = run_mode(args.mode, args.csv, args.model, args.max_length, args.batch_size, args.steps,
+                          BENCH_CACHE_DIR)
+        print(json.dumps(result))
+        return
+
+    shutil.rmtree(BENCH_CACHE_DIR, ignore_errors=True)
+    results = []
+    for mode, label in [("avant", "avant"), ("après", "après (cache vide)"), ("après", "après (cache chaud)")]:
+        cmd = [sys.executable, __file__, "--mode", mode, "--csv", args.csv, "--model", args.model,
+               "--max-length", str(args.max_length), "--batch-size", str(args.batch_size),
+               "--steps", str(args.steps)]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        result["label"] = label
+        results.append(result)
+    shutil.rmtree(BENCH_CACHE_DIR, ignore_errors=True)
+
+    print(f"\n===== {args.csv} : batch {args.batch_size}, max_length {args.max_length}, {args.steps} pas =====")
+    print(f"{'mode':<21}{'chargement (s)':>15}{'entr. tok/s':>13}{'padding':>9}"
+          f"{'éval tok/s':>12}{'padding':>9}{'éval (s)':>10}{'pic RSS (Mo)':>14}")
+    for r in results:
+        print(f"{r['label']:<21}{r['load_s']:>15.2f}{r['train_tok_s']:>13.0f}{r['train_pad']:>9.0%}"
+              f"{r['eval_tok_s']:>12.0f}{r['eval_pad']:>9.0%}{r['eval_s']:>10.1f}{r['peak_rss_mb']:>14.0f}")
+    before, after = results[0], results[-1]
+    print(f"\n📈 Entraînement : x{after['train_tok_s'] / before['train_tok_s']:.2f} tokens réels/s, "
+          f"évaluation : x{after['eval_tok_s'] / before['eval_tok_s']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
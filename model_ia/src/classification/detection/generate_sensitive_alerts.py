@@ -1,37 +1,97 @@
+import argparse
 import pandas as pd
-from transformers import pipeline
-import torch
 import json
-from tqdm import tqdm
+import sqlite3
+
+from src.scraping.utils.storage import lookup_posts
+from src.classification.inference.backends import BACKENDS, DEFAULT_BACKEND, load_backend, backend_device, classify_texts
+from src.classification.inference.cache import PredictionCache
+from src.classification.inference.dedup import classify_deduplicated
+
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.detection.generate_sensitive_alerts [--backend onnx-int8] [--no-cache] [--no-dedup]
 
 # CHEMINS (Corrects)
 MODEL_PATH = "src/classification/saved_models/sensitive_classifier/"
+MAX_LENGTH = 128
 INPUT_FILE = "data/facebook/comments_FOR_PREDICTION.csv"
 OUTPUT_FILE = "output/sensitive_alerts.json"
+# Posts liés aux alertes : post_id stable (commentaires scrapés) → base des posts ;
+# post_id = numéro de ligne (commentaires simulés) → CSV des posts
+POSTS_DB = "data/facebook/facebook_posts.db"
+POSTS_FILE = "data/facebook/facebook_posts_final.csv"
 
 # Nos labels (Corrects)
 CATEGORIES = ['normal', 'toxic', 'hateful', 'misinfo', 'adult']
 
-def generate_alerts_from_holdout():
+def link_alerts_to_posts(df_alerts):
     """
-    Charge notre modèle fine-tuné et l'exécute sur le
-    jeu de test "hold-out".
-    Version Corrigée : on garde TOUTES les détections non-normales.
+    Ajoute post_page / post_url / post_date aux seules alertes, par recherche
+    dans un dictionnaire post_id → post (pas de jointure sur tout le jeu).
     """
-    print(f"Chargement de notre modèle sensible fine-tuné (98.7% Prc) depuis {MODEL_PATH}...")
+    post_ids = df_alerts['post_id'].astype(str).unique().tolist()
+    lookup = {}
+
     try:
-        device = 0 if torch.cuda.is_available() else -1
-        sensitive_classifier = pipeline(
-            "text-classification",
-            model=MODEL_PATH,
-            tokenizer=MODEL_PATH,
-            device=device
-        )
-        print(f"Modèle chargé avec succès sur device: {'GPU' if device == 0 else 'CPU'}")
+        conn = sqlite3.connect(POSTS_DB)
+        try:
+            for pid, row in lookup_posts(conn, post_ids).items():
+                lookup[pid] = (row['page'], row['post_link'], row['post_date'])
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Base des posts non indexée ({e}) : lancez un scraping pour la migrer.")
+
+    missing = [int(pid) for pid in post_ids if pid not in lookup and pid.isdigit()]
+    if missing:
+        try:
+            df_posts = pd.read_csv(POSTS_FILE, usecols=['media', 'url', 'post_date'])
+            for row_index in missing:
+                if row_index < len(df_posts):
+                    post = df_posts.iloc[row_index]
+                    lookup[str(row_index)] = tuple(
+                        None if pd.isna(v) else v for v in (post['media'], post['url'], post['post_date'])
+                    )
+        except FileNotFoundError:
+            print(f"Fichier {POSTS_FILE} non trouvé : alertes non liées aux posts simulés.")
+
+    linked = [lookup.get(pid, (None, None, None)) for pid in df_alerts['post_id'].astype(str)]
+    df_alerts['post_page'] = [l[0] for l in linked]
+    df_alerts['post_url'] = [l[1] for l in linked]
+    df_alerts['post_date'] = [l[2] for l in linked]
+    print(f"{sum(l[0] is not None for l in linked)}/{len(linked)} alertes liées à leur post.")
+    return df_alerts
+
+
+def classify_comments(texts, backend=DEFAULT_BACKEND, threads=None, model_path=MODEL_PATH):
+    """Charge le modèle sensible et classe `texts` ; None si le modèle est introuvable."""
+    print(f"Chargement de notre modèle sensible fine-tuné (98.7% Prc) depuis {model_path}...")
+    try:
+        sensitive_classifier = load_backend(model_path, backend, MAX_LENGTH, threads)
+        print(f"Modèle chargé avec succès sur device: {backend_device(backend)} ({backend})")
     except Exception as e:
         print(f"Erreur chargement modèle : {e}. As-tu bien dézippé le modèle ?")
-        return
+        return None
+
+    print(f"Analyse de {len(texts)} commentaires du jeu 'hold-out'...")
+    return classify_texts(sensitive_classifier, texts, backend, MAX_LENGTH,
+                          fallback_label='LABEL_0', desc="Génération Alertes") # 'normal' en cas d'erreur
 
+
+def generate_alerts_from_holdout(backend=DEFAULT_BACKEND, threads=None, use_cache=True, model_path=MODEL_PATH,
+                                 dedup=True):
+    """
+    Charge notre modèle fine-tuné et l'exécute sur le
+    jeu de test "hold-out".
+    Version Corrigée : on garde TOUTES les détections non-normales.
+    `backend` : moteur d'inférence (cf. src/classification/inference/backends.py) ;
+    avec `use_cache`, seuls les commentaires absents du cache des prédictions
+    sont classés (le modèle n'est chargé que s'il en reste).
+    `model_path` : autre dossier de même format, ex. l'élève distillé
+    (src/classification/distill.py).
+    Avec `dedup`, un seul commentaire par groupe de doublons (banque de
+    commentaires simulés, copies quasi identiques) est classé.
+    """
     print(f"Chargement du jeu de test 'hold-out' : {INPUT_FILE}...")
     try:
         df_predict = pd.read_csv(INPUT_FILE)
@@ -46,17 +106,22 @@ def generate_alerts_from_holdout():
         print("Aucun commentaire à analyser.")
         return
 
-    print(f"Analyse de {len(texts)} commentaires du jeu 'hold-out'...")
-
-    results = []
-    batch_size = 32 if device == 0 else 1
-    for i in tqdm(range(0, len(texts), batch_size), desc="Génération Alertes"):
-        batch = texts[i:i+batch_size]
-        try:
-            batch_results = sensitive_classifier(batch, truncation=True, max_length=128)
-            results.extend(batch_results)
-        except Exception:
-            results.extend([{'label': 'LABEL_0', 'score': 1.0}] * len(batch)) # 'normal'
+    classify_missing = lambda batch: classify_comments(batch, backend, threads, model_path)
+    cache = PredictionCache() if use_cache else None
+    try:
+        if cache is not None:
+            version = cache.model_version(model_path, backend, MAX_LENGTH)
+            classify = lambda batch: cache.classify(version, batch, classify_missing)
+        else:
+            classify = classify_missing
+        results = classify_deduplicated(texts, classify) if dedup else classify(texts)
+        if cache is not None:
+            print(cache.report())
+    finally:
+        if cache is not None:
+            cache.close()
+    if results is None:
+        return
 
     # Ajouter les prédictions au dataframe
     df_predict['model_label_raw'] = [r['label'] for r in results]
@@ -66,6 +131,7 @@ def generate_alerts_from_holdout():
 
     # Étape 1 : On ne garde que ce qui n'est PAS 'normal'
     df_alerts = df_predict[df_predict['model_label'] != 'normal'].copy()
+    df_alerts = link_alerts_to_posts(df_alerts)
 
     
     print(f"\n{len(df_alerts)} commentaires détectés comme NON-NORMAUX.")
@@ -83,4 +149,12 @@ def generate_alerts_from_holdout():
 
 
 if __name__ == "__main__":
-    generate_alerts_from_holdout()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Alertes de contenu sensible (jeu hold-out)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--threads", type=int, default=None, help="threads intra-op")
+    parser.add_argument("--no-cache", action="store_true", help="tout reclasser sans consulter le cache")
+    parser.add_argument("--model", default=MODEL_PATH, help="dossier du modèle (ex. élève distillé)")
+    parser.add_argument("--no-dedup", action="store_true", help="classer chaque commentaire, doublons compris")
+    args = parser.parse_args()
+    generate_alerts_from_holdout(args.backend, args.threads, use_cache=not args.no_cache, model_path=args.model,
+                                 dedup=not args.no_dedup)
\ No newline at end of file
@@ -1,5 +1,5 @@
 import pandas as pd
-import random
+import numpy as np
 
 # CHEMINS
 INPUT_FILE = 'data/facebook/facebook_posts_final.csv' 
@@ -95,10 +95,45 @@ COMMENTS_BANK = {
 }
 
 
-def simulate_comments():
+SENSITIVE_CATEGORIES = ['toxic', 'hateful', 'misinfo', 'adult']
+
+
+def draw_comments(rng, post_ids, media_pages, first_comment_id=0, min_comments=1, max_comments=5):
+    """
+    Version vectorisée de la boucle historique : `min_comments` à `max_comments`
+    commentaires par post, 80% 'normal' / 20% catégorie sensible tirée uniformément,
+    texte tiré dans COMMENTS_BANK. `rng` est un numpy.random.Generator.
+    """
+    post_ids = np.asarray(post_ids)
+    media_pages = np.asarray(media_pages, dtype=object)
+    counts = rng.integers(min_comments, max_comments + 1, size=len(post_ids))
+    rows = np.repeat(np.arange(len(post_ids)), counts)
+    n = len(rows)
+
+    categories = np.where(
+        rng.random(n) < 0.8,
+        'normal',
+        np.array(SENSITIVE_CATEGORIES)[rng.integers(0, len(SENSITIVE_CATEGORIES), size=n)],
+    )
+    texts = np.empty(n, dtype=object)
+    for category, bank in COMMENTS_BANK.items():
+        mask = categories == category
+        texts[mask] = np.array(bank, dtype=object)[rng.integers(0, len(bank), size=mask.sum())]
+
+    return pd.DataFrame({
+        'comment_id': np.arange(first_comment_id, first_comment_id + n),
+        'post_id': post_ids[rows],
+        'media_page': media_pages[rows],
+        'comment_text': texts,
+        'true_category': categories,
+    })
+
+
+def simulate_comments(seed=None):
     """
     Crée un CSV de commentaires simulés (80% normaux, 20% sensibles)
     en utilisant une banque de commentaires élargie.
+    `seed` rend le tirage reproductible (posts échantillonnés et commentaires).
     """
     print(f"Chargement des posts depuis {INPUT_FILE}...")
     try:
@@ -108,41 +143,14 @@ def simulate_comments():
         print("Avez-vous bien lancé l'étape 0-A (simulate_realistic_metrics.py) ?")
         return
 
+    rng = np.random.default_rng(seed)
     n_sample = min(500, len(df_posts))
-    posts_to_comment_on = df_posts.sample(n=n_sample)
-
-    simulated_data = []
-    comment_id = 0
+    posts_to_comment_on = df_posts.sample(n=n_sample, random_state=rng)
 
     print(f"Génération de commentaires simulés pour {n_sample} posts...")
-    
-    # --- CORRECTION 1 ---
-    # On change `_` en `index`. `index` sera le numéro de la ligne (ex: 452)
-    # `post` sera la série contenant les données (media, contenu, etc.)
-    for index, post in posts_to_comment_on.iterrows():
-        
-        num_comments = random.randint(1, 5)
-
-        for _ in range(num_comments):
-            if random.random() < 0.8:
-                category = 'normal'
-            else:
-                category = random.choice(['toxic', 'hateful', 'misinfo', 'adult'])
-
-            comment_text = random.choice(COMMENTS_BANK[category])
-
-            simulated_data.append({
-                'comment_id': comment_id,
-                # --- CORRECTION 2 ---
-                # On utilise `index` (le numéro de la ligne) comme post_id
-                'post_id': index, 
-                'media_page': post['media'], 
-                'comment_text': comment_text,
-                'true_category': category 
-            })
-            comment_id += 1
 
-    df_comments = pd.DataFrame(simulated_data)
+    # `post_id` = numéro de la ligne du post dans INPUT_FILE (index du DataFrame)
+    df_comments = draw_comments(rng, posts_to_comment_on.index, posts_to_comment_on['media'])
 
     df_comments.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
     print(f"--- Étape 0-B Terminée ---")
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import argparse
+
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader
+from transformers import AutoModelForSequenceClassification
+
+from src.classification.model import DynamicPaddingCollator, LengthGroupedBatchSampler
+from src.classification.inference.bucketed import BucketedClassifier, configure_threads
+from src.classification.inference.benchmark import load_texts
+from src.classification.inference.onnx_backend import SAVED_MODELS, PARITY_FILES
+
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.distill                         # élèves des deux modèles (theme, sensitive)
+#   python -m src.classification.distill --models sensitive --layers 4 --hidden 384 --epochs 3
+#   python -m src.classification.distill --limit 300 --epochs 1  # petit essai CPU
+# L'élève est enregistré à côté du maître, même format (config.json,
+# model.safetensors, tokenizer) : saved_models/camembert_classifier_student/
+# se charge comme le maître, par ex.
+#   python src/classification/model/predict.py --model src/classification/saved_models/camembert_classifier_student/
+#   python -m src.classification.detection.generate_sensitive_alerts --model src/classification/saved_models/sensitive_classifier_student/
+
+# Textes non annotés (posts et commentaires scrapés) sur lesquels les deux
+# maîtres produisent les cibles « soft » : (fichier, colonne texte). Les
+# textes du jeu hold-out (PARITY_FILES) en sont retirés : ils servent à
+# mesurer l'accord élève / maître.
+UNLABELED_SOURCES = [
+    ("data/facebook/facebook_posts.csv", "content"),
+    ("data/facebook/facebook_posts(1800).csv", "content"),
+    ("data/facebook/comments_FOR_TRAINING.csv", "comment_text"),
+    ("data/facebook/simulated_comments.csv", "comment_text"),
+]
+STUDENT_SUFFIX = "_student"
+STUDENT_LAYERS = 4
+STUDENT_HIDDEN = 384     # têtes d'attention : hidden / 64, couche intermédiaire : 4 × hidden
+TEMPERATURE = 2.0        # adoucit les probabilités du maître (cibles « soft »)
+EPOCHS = 3
+BATCH_SIZE = 16
+LEARNING_RATE = 1e-4
+REPORT_FILE = "distillation.json"
+
+
+def student_path_for(teacher_path):
+    return teacher_path.rstrip("/") + STUDENT_SUFFIX + "/"
+
+
+def load_unlabeled(sources=UNLABELED_SOURCES, exclude=(), limit=None):
+    """Textes non vides et dédupliqués des `sources`, hors `exclude`."""
+    seen = set(exclude)
+    texts = []
+    for path, column in sources:
+        if not os.path.exists(path):
+            print(f"⚠️ {path} introuvable, ignoré.")
+            continue
+        for text in load_texts(path, column):
+            if text.strip() and text not in seen:
+                seen.add(text)
+                texts.append(text)
+    return texts[:limit] if limit else texts
+
+
+# ==================================================================
+# 🔹 Construction de l'élève
+# ==================================================================
+def build_student(teacher, layers=STUDENT_LAYERS, hidden=STUDENT_HIDDEN):
+    """
+    Même architecture que le maître, moins de couches (et hidden plus petit) :
+    - hidden identique : embeddings, couches (réparties sur la profondeur du
+      maître) et tête de classification copiés ;
+    - hidden plus petit : embeddings projetés sur les `hidden` composantes
+      principales des embeddings de mots du maître, couches initialisées au hasard.
+    """
+    config = teacher.config.__class__.from_dict(teacher.config.to_dict())
+    config.num_hidden_layers = layers
+    config.hidden_size = hidden
+    config.num_attention_heads = max(1, hidden // 64)
+    config.intermediate_size = 4 * hidden
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    t_base = teacher.base_model
+    s_base = student.base_model
+    t_emb, s_emb = t_base.embeddings, s_base.embeddings
+    with torch.no_grad():
+        if hidden == teacher.config.hidden_size:
+            s_emb.load_state_dict(t_emb.state_dict())
+            n = teacher.config.num_hidden_layers
+            picked = [round(i * (n - 1) / max(layers - 1, 1)) for i in range(layers)]
+            for s_layer, t_index in zip(s_base.encoder.layer, picked):
+                s_layer.load_state_dict(t_base.encoder.layer[t_index].state_dict())
+            student.classifier.load_state_dict(teacher.classifier.state_dict())
+        else:
+            _, _, components = torch.pca_lowrank(t_emb.word_embeddings.weight, q=hidden)
+            projection = components[:, :hidden]
+            s_emb.word_embeddings.weight.copy_(t_emb.word_embeddings.weight @ projection)
+            s_emb.position_embeddings.weight.copy_(t_emb.position_embeddings.weight @ projection)
+            s_emb.token_type_embeddings.weight.copy_(t_emb.token_type_embeddings.weight @ projection)
+    return student
+
+
+# ==================================================================
+# 🔹 Distillation
+# ==================================================================
+def distill(teacher_path, student_path, texts, max_length, layers=STUDENT_LAYERS, hidden=STUDENT_HIDDEN,
+            epochs=EPOCHS, batch_size=BATCH_SIZE, learning_rate=LEARNING_RATE, temperature=TEMPERATURE,
+            threads=None):
+    """
+    Entraîne l'élève à reproduire les logits du maître sur `texts`
+    (KL entre distributions adoucies par `temperature`, × T²) et
+    l'enregistre dans `student_path`. Retourne la durée (s).
+    """
+    start = time.perf_counter()
+    teacher = BucketedClassifier(teacher_path, max_length=max_length, threads=threads)
+    print(f"🧑‍🏫 Logits du maître sur {len(texts)} textes...")
+    teacher_logits = teacher.predict_logits(texts).clone()  # hors inference_mode : cible utilisable en entraînement
+
+    student = build_student(teacher.model, layers, hidden)
+    tokenizer = teacher.tokenizer
+    input_ids = teacher.encode(texts)
+    features = [{"input_ids": torch.tensor(ids), "labels": teacher_logits[i]} for i, ids in enumerate(input_ids)]
+    loader = DataLoader(features,
+                        batch_sampler=LengthGroupedBatchSampler([len(ids) for ids in input_ids], batch_size),
+                        collate_fn=DynamicPaddingCollator(tokenizer.pad_token_id))
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate, weight_decay=0.01)
+    total_steps = epochs * len(loader)
+    scheduler = torch.optim.lr_scheduler.LambdaLR(optimizer, lambda step: 1 - step / max(total_steps, 1))
+    student.train()
+    for epoch in range(epochs):
+        running = 0.0
+        for batch in loader:
+            targets = batch.pop("labels")
+            logits = student(**batch).logits
+            loss = F.kl_div(F.log_softmax(logits / temperature, dim=-1),
+                            F.softmax(targets / temperature, dim=-1),
+                            reduction="batchmean") * temperature ** 2
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad()
+            running += loss.item()
+        print(f"  époque {epoch + 1}/{epochs} : perte KL {running / max(len(loader), 1):.4f}")
+
+    student.eval()
+    os.makedirs(student_path, exist_ok=True)
+    student.save_pretrained(student_path)
+    tokenizer.save_pretrained(student_path)
+    return time.perf_counter() - start
+
+
+def compare_with_teacher(teacher_path, student_path, texts, max_length, threads=None):
+    """Accord des prédictions élève / maître et vitesse relative (moteur bucketed)."""
+    results = {}
+    for name, path in [("maître", teacher_path), ("élève", student_path)]:
+        classifier = BucketedClassifier(path, max_length=max_length, threads=threads)
+        classifier.predict_logits(texts[:8])  # préchauffage hors mesure
+        start = time.perf_counter()
+        logits = classifier.predict_logits(texts)
+        results[name] = {
+            "seconds": time.perf_counter() - start,
+            "labels": logits.argmax(dim=-1),
+            "params_m": sum(p.numel() for p in classifier.model.parameters()) / 1e6,
+        }
+    teacher, student = results["maître"], results["élève"]
+    return {
+        "texts": len(texts),
+        "agreement": float((teacher["labels"] == student["labels"]).float().mean()) if texts else 0.0,
+        "teacher_posts_s": len(texts) / teacher["seconds"],
+        "student_posts_s": len(texts) / student["seconds"],
+        "speedup": teacher["seconds"] / student["seconds"],
+        "teacher_params_m": teacher["params_m"],
+        "student_params_m": student["params_m"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distillation des classifieurs CamemBERT en élèves compacts (CPU)")
+    parser.add_argument("--models", nargs="+", choices=list(SAVED_MODELS), default=list(SAVED_MODELS))
+    parser.add_argument("--teacher", default=None, help="dossier du maître (un seul modèle ; défaut : saved_models/)")
+    parser.add_argument("--output", default=None, help="dossier de l'élève (un seul modèle ; défaut : <maître>_student/)")
+    parser.add_argument("--layers", type=int, default=STUDENT_LAYERS)
+    parser.add_argument("--hidden", type=int, default=STUDENT_HIDDEN)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=LEARNING_RATE)
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--limit", type=int, default=None, help="textes de distillation max")
+    parser.add_argument("--eval-limit", type=int, default=1000, help="textes hold-out pour la comparaison")
+    parser.add_argument("--threads", type=int, default=None, help="threads intra-op")
+    args = parser.parse_args()
+    if (args.teacher or args.output) and len(args.models) > 1:
+        parser.error("--teacher / --output : préciser un seul modèle avec --models")
+    configure_threads(args.threads)
+    torch.manual_seed(42)
+
+    for name in args.models:
+        teacher_path = args.teacher or SAVED_MODELS[name]
+        student_path = args.output or student_path_for(teacher_path)
+        eval_file, eval_column, max_length = PARITY_FILES[name]
+        eval_texts = [t for t in load_texts(eval_file, eval_column, args.eval_limit) if t.strip()]
+        texts = load_unlabeled(UNLABELED_SOURCES, exclude=eval_texts, limit=args.limit)
+
+        print(f"\n🎓 Distillation {name} : {teacher_path} → {student_path} "
+              f"({args.layers} couches, hidden {args.hidden}, {len(texts)} textes)")
+        seconds = distill(teacher_path, student_path, texts, max_length, args.layers, args.hidden,
+                          args.epochs, args.batch_size, args.lr, args.temperature, args.threads)
+
+        print(f"🔎 Comparaison sur {len(eval_texts)} textes hold-out de {eval_file}")
+        report = compare_with_teacher(teacher_path, student_path, eval_texts, max_length, args.threads)
+        print(f"  accord avec le maître : {report['agreement']:.1%}")
+        print(f"  maître : {report['teacher_posts_s']:.1f} posts/s ({report['teacher_params_m']:.0f} M paramètres)")
+        print(f"  élève  : {report['student_posts_s']:.1f} posts/s ({report['student_params_m']:.0f} M paramètres)"
+              f" → x{report['speedup']:.2f}")
+
+        report.update({
+            "teacher": teacher_path, "train_texts": len(texts), "train_seconds": seconds,
+            "layers": args.layers, "hidden": args.hidden, "epochs": args.epochs, "temperature": args.temperature,
+            "eval_file": eval_file, "max_length": max_length,
+        })
+        with open(os.path.join(student_path, REPORT_FILE), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"✅ Élève enregistré dans {student_path}")
+
+
+if __name__ == "__main__":
+    main()
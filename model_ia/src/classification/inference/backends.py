@@ -0,0 +1,60 @@
+import torch
+from transformers import pipeline
+from tqdm import tqdm
+
+from src.classification.inference.bucketed import BucketedClassifier, TOKEN_BUDGET, INTRA_OP_THREADS
+
+# Moteurs d'inférence disponibles (--backend des scripts de classification) :
+#   pipeline  : pipeline(...) transformers, batch de 1 sur CPU (chemin historique)
+#   bucketed  : PyTorch, lots triés par longueur à budget de tokens (bucketed.py)
+#   onnx      : ONNX Runtime fp32 (export : onnx_backend.py)
+#   onnx-int8 : ONNX Runtime, poids quantifiés int8
+BACKENDS = ("pipeline", "bucketed", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "bucketed"
+
+
+def load_backend(model_path, backend=DEFAULT_BACKEND, max_length=256, threads=INTRA_OP_THREADS,
+                 token_budget=TOKEN_BUDGET):
+    """Classifieur `backend` pour le modèle sauvegardé `model_path` (lève une exception si absent)."""
+    if backend == "pipeline":
+        # Si tu as un GPU local, mets 0. Sinon, -1 utilisera le CPU.
+        device = 0 if torch.cuda.is_available() else -1
+        return pipeline("text-classification", model=model_path, tokenizer=model_path, device=device)
+    if backend in ("onnx", "onnx-int8"):
+        from src.classification.inference.onnx_backend import OnnxClassifier
+        precision = "int8" if backend == "onnx-int8" else "fp32"
+        return OnnxClassifier(model_path, precision=precision, max_length=max_length,
+                              token_budget=token_budget, threads=threads)
+    if backend == "bucketed":
+        return BucketedClassifier(model_path, max_length=max_length, token_budget=token_budget,
+                                  threads=threads)
+    raise ValueError(f"Moteur inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+
+
+def backend_device(backend):
+    if backend.startswith("onnx"):
+        return "CPU"
+    return "GPU" if torch.cuda.is_available() else "CPU"
+
+
+def classify_texts(classifier, texts, backend=DEFAULT_BACKEND, max_length=256,
+                   fallback_label="LABEL_0", progress=True, desc="Classification"):
+    """
+    Résultats du classifieur ({'label', 'score'}) dans l'ordre de `texts`.
+    Le chemin pipeline garde la boucle historique : un lot en erreur est
+    remplacé par `fallback_label` (résultats marqués 'fallback', jamais mis en cache).
+    """
+    if backend != "pipeline":
+        return classifier(texts)
+
+    results = []
+    batch_size = 32 if torch.cuda.is_available() else 1 # batch_size de 1 si CPU
+    for i in tqdm(range(0, len(texts), batch_size), desc=desc, disable=not progress):
+        batch = texts[i:i+batch_size]
+        try:
+            results.extend(classifier(batch, truncation=True, max_length=max_length))
+        except Exception as e:
+            # Gérer les textes vides ou problématiques
+            print(f"Erreur sur batch {i}: {e}. Remplacement par '{fallback_label}'.")
+            results.extend({'label': fallback_label, 'score': 1.0, 'fallback': True} for _ in batch)
+    return results
@@ -0,0 +1,109 @@
+import time
+import argparse
+
+import pandas as pd
+import torch
+
+from src.classification.inference.bucketed import length_buckets, TOKEN_BUDGET, MAX_BATCH, INTRA_OP_THREADS
+from src.classification.inference.backends import BACKENDS, load_backend, classify_texts
+
+MODEL_PATH = "src/classification/saved_models/camembert_classifier/"
+INPUT_FILE = "data/facebook/facebook_posts_final.csv"
+
+
+# ==================================================================
+# 🔹 Benchmark : débit, mémoire et parité des moteurs d'inférence
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.inference.benchmark --limit 500 --threads 4
+#   python -m src.classification.inference.benchmark --backends bucketed onnx onnx-int8
+#
+# Mesure posts/s sur facebook_posts_final.csv pour chaque moteur (backends.py),
+# la mémoire résidente ajoutée par le chargement du modèle, et l'accord des
+# labels / l'écart de score max par rapport au premier moteur de la liste.
+
+def load_texts(path, column, limit=None):
+    return pd.read_csv(path)[column].fillna("").astype(str).tolist()[:limit]
+
+
+def rss_mb():
+    """Mémoire résidente actuelle du processus (Linux), 0 si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096 / 1e6
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def padding_stats(classifier, texts, token_budget, max_batch):
+    """Tokens réellement calculés (padding compris) vs tokens utiles."""
+    lengths = [len(ids) for ids in classifier.encode(texts)]
+    buckets = length_buckets(lengths, token_budget, max_batch)
+    padded = sum(len(b) * max(lengths[i] for i in b) for b in buckets)
+    return sum(lengths), padded, len(buckets)
+
+
+def compare_backends(model_path, texts, backends, max_length=256, threads=INTRA_OP_THREADS,
+                     token_budget=TOKEN_BUDGET):
+    """Classe `texts` avec chaque moteur ; retourne {moteur: mesures + labels/scores}."""
+    results = {}
+    for backend in backends:
+        before = rss_mb()
+        try:
+            classifier = load_backend(model_path, backend, max_length, threads, token_budget)
+        except Exception as e:
+            print(f"  {backend} ignoré : {e}")
+            continue
+        loaded = rss_mb() - before
+        classify_texts(classifier, texts[:8], backend, max_length, progress=False)  # préchauffage
+        start = time.perf_counter()
+        predictions = classify_texts(classifier, texts, backend, max_length, progress=False)
+        seconds = time.perf_counter() - start
+        results[backend] = {"seconds": seconds, "rss_mb": loaded,
+                            "labels": [p["label"] for p in predictions],
+                            "scores": [p["score"] for p in predictions]}
+        if backend != "pipeline":
+            useful, padded, n_batches = padding_stats(classifier, texts, token_budget, MAX_BATCH)
+            print(f"  {backend} : {n_batches} lots, tokens utiles {useful}, calculés {padded} "
+                  f"({padded / max(useful, 1):.2f}×)")
+        del classifier
+    return results
+
+
+def print_comparison(results, n_texts, reference):
+    print(f"\n{'moteur':<12}{'secondes':>10}{'posts/s':>10}{'accél.':>8}{'RSS (Mo)':>10}"
+          f"{'labels id.':>12}{'écart max':>11}")
+    ref = results.get(reference)
+    for backend, r in results.items():
+        speedup = ref["seconds"] / r["seconds"] if ref else float("nan")
+        agreement, drift = float("nan"), float("nan")
+        if ref:
+            agreement = sum(a == b for a, b in zip(ref["labels"], r["labels"])) / max(n_texts, 1)
+            drift = max((abs(a - b) for a, b in zip(ref["scores"], r["scores"])), default=0.0)
+        print(f"{backend:<12}{r['seconds']:>10.1f}{n_texts / r['seconds']:>10.1f}{speedup:>7.1f}×"
+              f"{r['rss_mb']:>10.0f}{agreement:>12.1%}{drift:>11.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'inférence CPU")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["pipeline", "bucketed"],
+                        help="le premier sert de référence (accélération, parité)")
+    parser.add_argument("--limit", type=int, default=500, help="posts mesurés (le chemin pipeline est lent)")
+    parser.add_argument("--threads", type=int, default=INTRA_OP_THREADS)
+    parser.add_argument("--token-budget", type=int, default=TOKEN_BUDGET)
+    parser.add_argument("--model", default=MODEL_PATH, help="dossier du modèle (défaut : camembert_classifier)")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--column", default="contenu")
+    parser.add_argument("--max-length", type=int, default=256)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    print(f"{len(texts)} textes, {torch.get_num_threads()} threads par défaut")
+    results = compare_backends(args.model, texts, args.backends, args.max_length,
+                               args.threads, args.token_budget)
+    print("\n===== Classification (CPU) =====")
+    print_comparison(results, len(texts), reference=args.backends[0])
+
+
+if __name__ == "__main__":
+    main()
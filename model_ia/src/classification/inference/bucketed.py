@@ -0,0 +1,116 @@
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+# Paramètres par défaut de l'inférence CPU
+TOKEN_BUDGET = 8192      # tokens (padding compris) par lot : 32 textes de 256, ou 256 textes de 32
+MAX_BATCH = 128          # textes max par lot, même très courts
+MAX_PADDING = 1.25       # tokens calculés (padding compris) / tokens utiles, au plus, par lot
+INTRA_OP_THREADS = None  # threads PyTorch par opération (None : valeur par défaut de torch)
+
+
+# ==================================================================
+# 🔹 Threads CPU
+# ==================================================================
+def configure_threads(intra_op=INTRA_OP_THREADS, inter_op=None):
+    """Fixe le parallélisme intra-op (et inter-op) de PyTorch ; à appeler avant la première inférence."""
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            pass  # déjà fixé : impossible une fois le pool inter-op démarré
+    return torch.get_num_threads()
+
+
+# ==================================================================
+# 🔹 Lots par longueur avec budget de tokens
+# ==================================================================
+def length_buckets(lengths, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH, max_padding=MAX_PADDING):
+    """
+    Trie les indices par longueur et forme des lots dont le coût
+    (nombre de textes × longueur max du lot) reste sous `token_budget`,
+    et sous `max_padding` × les tokens utiles du lot : sur un petit
+    nombre de textes de longueurs dispersées (micro-batches), un lot ne
+    paie pas le padding d'un texte long.
+    Retourne une liste de listes d'indices (dans l'ordre trié).
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets, current, longest, useful = [], [], 0, 0
+    for i in order:
+        new_longest = max(longest, lengths[i])
+        cost = (len(current) + 1) * new_longest
+        if current and (cost > token_budget or len(current) >= max_batch
+                        or cost > max_padding * (useful + lengths[i])):
+            buckets.append(current)
+            current, new_longest, useful = [], lengths[i], 0
+        current.append(i)
+        longest = new_longest
+        useful += lengths[i]
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+class BucketedClassifier:
+    """
+    Classification de séquences optimisée CPU :
+    - tokenisation de tout le lot une seule fois, sans padding ;
+    - tri par longueur et lots à budget de tokens (length_buckets) ;
+    - padding uniquement jusqu'à la longueur max de chaque lot ;
+    - résultats remis dans l'ordre d'origine.
+    Les sorties ont le format du pipeline "text-classification"
+    ({'label': 'LABEL_i', 'score': p}) pour garder le code de mapping existant.
+    Le modèle est appelé par `forward` : les autres moteurs (ONNX) ne
+    redéfinissent que `load_model` et `forward`.
+    """
+
+    def __init__(self, model_path, max_length=256, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH,
+                 device=None, threads=INTRA_OP_THREADS):
+        self.threads = configure_threads(threads)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.max_length = max_length
+        self.token_budget = token_budget
+        self.max_batch = max_batch
+        self.id2label = self.load_model(model_path)
+        self.forward_passes = 0
+
+    def load_model(self, model_path):
+        """Charge le modèle et retourne son mapping id → label."""
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path).to(self.device)
+        self.model.eval()
+        return self.model.config.id2label
+
+    def forward(self, batch):
+        """Logits (tenseur CPU float) d'un lot paddé."""
+        batch = {k: v.to(self.device) for k, v in batch.items()}
+        return self.model(**batch).logits.float().cpu()
+
+    def encode(self, texts):
+        return self.tokenizer(
+            [t if isinstance(t, str) else "" for t in texts],
+            truncation=True, max_length=self.max_length, padding=False,
+        )["input_ids"]
+
+    def predict_logits(self, texts):
+        """Logits (tenseur n × n_labels) dans l'ordre de `texts`."""
+        input_ids = self.encode(texts)
+        logits = [None] * len(texts)
+        with torch.inference_mode():
+            for bucket in length_buckets([len(ids) for ids in input_ids], self.token_budget, self.max_batch):
+                batch = self.tokenizer.pad({"input_ids": [input_ids[i] for i in bucket]}, return_tensors="pt")
+                bucket_logits = self.forward(batch)
+                self.forward_passes += 1
+                for row, i in enumerate(bucket):
+                    logits[i] = bucket_logits[row]
+        return torch.stack(logits) if logits else torch.empty(0, len(self.id2label))
+
+    def predict_proba(self, texts):
+        """Probabilités (tenseur n × n_labels) dans l'ordre de `texts`."""
+        return torch.softmax(self.predict_logits(texts), dim=-1)
+
+    def __call__(self, texts, **_):
+        probs = self.predict_proba(texts)
+        scores, ids = probs.max(dim=-1)
+        return [{"label": self.id2label[int(i)], "score": float(s)} for s, i in zip(scores, ids)]
@@ -0,0 +1,194 @@
+import os
+import time
+import sqlite3
+import hashlib
+import unicodedata
+
+# Cache persistant des prédictions : (version du modèle, hash du texte normalisé) → (label, score)
+CACHE_DB = "data/cache/predictions.db"
+CACHE_MAX_ROWS = 2_000_000   # au-delà, les entrées les moins récemment utilisées sont évincées
+CHUNK = 500                  # paramètres par requête IN (...), comme lookup_posts
+
+# Fichier de poids lu pour la version du modèle, selon le moteur (cf. backends.py) ;
+# pipeline et bucketed donnent les mêmes prédictions : même version
+WEIGHT_FILES = {
+    "pipeline": ("model.safetensors", "pytorch_model.bin"),
+    "bucketed": ("model.safetensors", "pytorch_model.bin"),
+    "onnx": ("onnx/model.onnx",),
+    "onnx-int8": ("onnx/model.int8.onnx",),
+}
+
+
+# ==================================================================
+# 🔹 Clés : texte normalisé et version du modèle
+# ==================================================================
+def text_key(text):
+    """
+    Hash du texte tel que le voit le modèle : Unicode NFC, espaces multiples
+    réduits. La casse est conservée (CamemBERT est sensible à la casse).
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text if isinstance(text, str) else "").split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def hash_file(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Table SQLite `predictions` adressée par le contenu : une ligne par
+    (version du modèle, texte normalisé). La version du modèle est le hash
+    de config.json, des poids utilisés par le moteur et de max_length :
+    réentraîner ou réexporter le modèle invalide le cache sans rien purger.
+    Les hash de poids sont mémorisés par (chemin, taille, date de
+    modification) pour ne pas relire 400 Mo à chaque lancement.
+    """
+
+    def __init__(self, db_path=CACHE_DB, max_rows=CACHE_MAX_ROWS):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_last_used ON predictions(last_used)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY, size INTEGER, mtime REAL, sha1 TEXT
+            )
+        """)
+        self.conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    # ------------------------------------------------------------------
+    # 🔹 Version du modèle
+    # ------------------------------------------------------------------
+    def file_hash(self, path):
+        stat = os.stat(path)
+        row = self.conn.execute(
+            "SELECT sha1 FROM file_hashes WHERE path = ? AND size = ? AND mtime = ?",
+            (os.path.abspath(path), stat.st_size, stat.st_mtime)
+        ).fetchone()
+        if row:
+            return row[0]
+        sha1 = hash_file(path)
+        self.conn.execute("INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                          (os.path.abspath(path), stat.st_size, stat.st_mtime, sha1))
+        self.conn.commit()
+        return sha1
+
+    def model_version(self, model_path, backend, max_length):
+        """Identifiant du modèle en cache ; None si son dossier est introuvable ou incomplet."""
+        weights = [os.path.join(model_path, name) for name in WEIGHT_FILES[backend]]
+        weights = [p for p in weights if os.path.exists(p)][:1]
+        try:
+            parts = [self.file_hash(p) for p in [os.path.join(model_path, "config.json")] + weights]
+        except OSError:
+            return None
+        parts.append(f"{WEIGHT_FILES[backend][0]}:{max_length}")
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    # ------------------------------------------------------------------
+    # 🔹 Lecture / écriture
+    # ------------------------------------------------------------------
+    def get_many(self, model, keys):
+        """{text_hash: (label, score)} pour les clés en cache ; les rafraîchit (LRU)."""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), CHUNK):
+            chunk = keys[i:i + CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, label, score in self.conn.execute(
+                f"SELECT text_hash, label, score FROM predictions "
+                f"WHERE model = ? AND text_hash IN ({placeholders})", [model] + chunk
+            ):
+                found[key] = (label, score)
+        now = time.time()
+        self.conn.executemany("UPDATE predictions SET last_used = ? WHERE model = ? AND text_hash = ?",
+                              [(now, model, key) for key in found])
+        self.conn.commit()
+        return found
+
+    def put_many(self, model, items):
+        """items : [(text_hash, label, score)]."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+            [(model, key, label, float(score), now) for key, label, score in items]
+        )
+        self.conn.commit()
+        self.stats["stored"] += len(items)
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_rows."""
+        excess = self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_rows
+        if excess > 0:
+            self.conn.execute("""
+                DELETE FROM predictions WHERE (model, text_hash) IN (
+                    SELECT model, text_hash FROM predictions ORDER BY last_used LIMIT ?
+                )
+            """, (excess,))
+            self.conn.commit()
+            self.stats["evicted"] += excess
+
+    # ------------------------------------------------------------------
+    # 🔹 Classification avec cache
+    # ------------------------------------------------------------------
+    def classify(self, model, texts, classify_missing):
+        """
+        Résultats ({'label', 'score'}) dans l'ordre de `texts` : les textes en
+        cache ne sont pas reclassés, les autres (dédoublonnés) passent par
+        `classify_missing(textes)`, appelé seulement s'il y a des absents ;
+        il retourne None si le modèle n'a pas pu être chargé.
+        Sans version de modèle (`model` None), le cache est ignoré :
+        `classify_missing` reçoit tous les textes et signale l'erreur de chargement.
+        """
+        if model is None:
+            return classify_missing(list(texts))
+        keys = [text_key(t) for t in texts]
+        cached = self.get_many(model, set(keys))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        hits = sum(key in cached for key in keys)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+
+        if missing:
+            results = classify_missing(list(missing.values()))
+            if results is None:
+                return None
+            # Les remplacements d'un lot en erreur ('fallback') ne sont pas mis en cache
+            new = [(key, r["label"], r["score"]) for key, r in zip(missing, results) if not r.get("fallback")]
+            self.put_many(model, new)
+            cached.update({key: (r["label"], r["score"]) for key, r in zip(missing, results)})
+
+        return [{"label": cached[key][0], "score": cached[key][1]} for key in keys]
+
+    def report(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        rate = self.stats["hits"] / total if total else 0.0
+        return (f"Cache des prédictions ({self.db_path}) : {self.stats['hits']} hits, "
+                f"{self.stats['misses']} misses ({rate:.1%}), {self.stats['stored']} ajoutées, "
+                f"{self.stats['evicted']} évincées")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,185 @@
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+
+# Paramètres du dédoublonnage
+NUM_PERM = 128            # permutations MinHash (taille de la signature)
+LSH_BANDS = 16            # bandes LSH de NUM_PERM / LSH_BANDS lignes : candidats dès ~70 % de similarité
+JACCARD_THRESHOLD = 0.8   # similarité de Jaccard (estimée) pour fusionner deux textes candidats
+SHINGLE_CHARS = 5         # n-grammes de caractères comparés
+PREFIX_CHARS = 40         # longueur min. d'un texte tronqué rattaché au texte qu'il commence
+MINHASH_PRIME = (1 << 31) - 1
+SEED = 42
+
+# « … En voir plus » (troncature de Facebook au défilement)
+TRUNCATION_RE = re.compile(r"\s*(…|\.\.\.)?\s*(en )?voir plus\s*$", re.IGNORECASE)
+
+
+# ==================================================================
+# 🔹 Normalisation
+# ==================================================================
+def normalize_for_dedup(text):
+    """
+    (texte normalisé, tronqué ?) : NFKC (les lettres « 𝗴𝗿𝗮𝘀𝘀𝗲𝘀 » deviennent
+    ordinaires), minuscules, marqueur « … En voir plus » retiré,
+    ponctuation et espaces réduits à un espace.
+    """
+    text = unicodedata.normalize("NFKC", text if isinstance(text, str) else "")
+    stripped = TRUNCATION_RE.sub("", text)
+    normalized = " ".join(re.sub(r"[\W_]+", " ", stripped.lower()).split())
+    return normalized, stripped != text
+
+
+def shingles(normalized):
+    if len(normalized) <= SHINGLE_CHARS:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_CHARS] for i in range(len(normalized) - SHINGLE_CHARS + 1)}
+
+
+class MinHasher:
+    """Signatures MinHash : min de (a·h + b) mod p sur les n-grammes hachés (crc32)."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, grams):
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) % MINHASH_PRIME for g in grams),
+                             dtype=np.uint64, count=len(grams))
+        # a, h < 2^31 : produit < 2^62, pas de dépassement en uint64
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+
+# ==================================================================
+# 🔹 Groupes de doublons
+# ==================================================================
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent, i, j):
+    i, j = _find(parent, i), _find(parent, j)
+    if i != j:
+        parent[max(i, j)] = min(i, j)
+
+
+def _separated(parent, rivals, i, j):
+    """Vrai si réunir les groupes de i et j réunirait deux textes rivaux."""
+    i, j = _find(parent, i), _find(parent, j)
+    return any({_find(parent, a), _find(parent, b)} == {i, j} for a, b in rivals)
+
+
+def dedup_groups(texts, near=True, threshold=JACCARD_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS):
+    """
+    Représentant de chaque texte : (representatives, stats), où
+    representatives[i] est l'indice du texte classé à la place de texts[i].
+    1) doublons exacts après normalisation ;
+    2) textes tronqués (« … En voir plus ») rattachés au texte qu'ils commencent,
+       s'il est le seul à commencer ainsi ;
+    3) avec `near`, quasi-doublons par MinHash / LSH (Jaccard estimé ≥ `threshold`).
+    Deux textes complets qu'un même texte tronqué peut prolonger restent
+    distincts (jamais fusionnés, même par l'étape 3).
+    Le représentant d'un groupe est son texte non tronqué le plus long
+    (longueur normalisée, sans le marqueur « … En voir plus »).
+    """
+    # 1) Doublons exacts : un identifiant par texte normalisé
+    unique_ids, keys, truncated, text_ids, ranks = {}, [], [], [], []
+    for text in texts:
+        normalized, was_truncated = normalize_for_dedup(text)
+        ranks.append((not was_truncated, len(normalized)))
+        if normalized not in unique_ids:
+            unique_ids[normalized] = len(keys)
+            keys.append(normalized)
+            truncated.append(was_truncated)
+        elif was_truncated:
+            truncated[unique_ids[normalized]] = True
+        text_ids.append(unique_ids[normalized])
+    parent = list(range(len(keys)))
+
+    # 2) Troncatures : même début, le texte tronqué est un préfixe de l'autre.
+    # Rattaché seulement s'il ne prolonge qu'un texte complet : un début commun
+    # à plusieurs posts distincts ne doit pas les fusionner entre eux.
+    by_prefix, rivals = {}, []
+    for k, key in enumerate(keys):
+        if len(key) >= PREFIX_CHARS:
+            by_prefix.setdefault(key[:PREFIX_CHARS], []).append(k)
+    for k, key in enumerate(keys):
+        if truncated[k] and len(key) >= PREFIX_CHARS:
+            longer = [other for other in by_prefix[key[:PREFIX_CHARS]]
+                      if len(keys[other]) > len(key) and keys[other].startswith(key)]
+            # Candidats maximaux : une troncature plus longue du même texte n'en est pas un
+            full = [other for other in longer
+                    if not any(o != other and keys[o].startswith(keys[other]) for o in longer)]
+            if len(full) == 1:
+                _union(parent, k, full[0])
+            else:
+                rivals.extend((a, b) for pos, a in enumerate(full) for b in full[pos + 1:])
+
+    # 3) Quasi-doublons : candidats LSH (une bande identique), vérifiés sur la signature
+    merged_near = 0
+    if near and len(keys) > 1:
+        hasher = MinHasher(num_perm)
+        signatures = np.stack([hasher.signature(shingles(key)) for key in keys])
+        rows = num_perm // bands
+        for band in range(bands):
+            buckets = {}
+            for k, sig in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+                buckets.setdefault(sig.tobytes(), []).append(k)
+            for members in buckets.values():
+                for pos, k in enumerate(members[1:], start=1):
+                    for other in members[:pos]:
+                        if _find(parent, k) == _find(parent, other):
+                            break
+                        if rivals and _separated(parent, rivals, k, other):
+                            continue
+                        if (signatures[k] == signatures[other]).mean() >= threshold:
+                            _union(parent, k, other)
+                            merged_near += 1
+                            break
+
+    # Représentant : texte non tronqué le plus long (normalisé) de chaque groupe
+    group_of = [_find(parent, k) for k in text_ids]
+    best = {}
+    for i, (group, rank) in enumerate(zip(group_of, ranks)):
+        if group not in best or rank > best[group][0]:
+            best[group] = (rank, i)
+    representatives = [best[group][1] for group in group_of]
+
+    stats = {
+        "texts": len(texts),
+        "exact_unique": len(keys),
+        "groups": len(best),
+        "near_merged": merged_near,
+    }
+    return representatives, stats
+
+
+def dedup_report(stats):
+    n, groups = stats["texts"], stats["groups"]
+    saved = 1 - groups / n if n else 0.0
+    return (f"🧹 Dédoublonnage : {n} textes → {stats['exact_unique']} après normalisation → "
+            f"{groups} groupes ({saved:.0%} de textes en moins à classer)")
+
+
+def classify_deduplicated(texts, classify, near=True):
+    """
+    Classe un représentant par groupe de doublons avec `classify(textes)`
+    (même contrat que le classifieur : une prédiction par texte, ou None)
+    et recopie sa prédiction sur tous les textes du groupe.
+    """
+    if not texts:
+        return classify(texts)
+    representatives, stats = dedup_groups(texts, near=near)
+    print(dedup_report(stats))
+    unique = sorted(set(representatives))
+    results = classify([texts[i] for i in unique])
+    if results is None:
+        return None
+    by_index = dict(zip(unique, results))
+    return [by_index[r] for r in representatives]
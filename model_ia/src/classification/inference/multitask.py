@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import argparse
+
+import torch
+from torch import nn
+from transformers import AutoModel
+
+from src.classification.inference.bucketed import BucketedClassifier, TOKEN_BUDGET, INTRA_OP_THREADS
+from src.classification.inference.benchmark import load_texts, INPUT_FILE
+
+MULTITASK_PATH = "src/classification/saved_models/multitask_classifier/"
+THEME_MODEL_PATH = "src/classification/saved_models/camembert_classifier/"
+SENSITIVE_MODEL_PATH = "src/classification/saved_models/sensitive_classifier/"
+MAX_LENGTH = 256
+TASKS_FILE = "tasks.json"   # {tâche: [labels dans l'ordre des sorties de la tête]}
+HEADS_FILE = "heads.pt"     # poids des têtes de classification
+
+
+# ==================================================================
+# 🔹 Modèle : un encodeur partagé, une tête par tâche
+# ==================================================================
+class ClassificationHead(nn.Module):
+    """Même tête que CamembertForSequenceClassification (dense + tanh sur <s>)."""
+
+    def __init__(self, hidden_size, num_labels, dropout=0.1):
+        super().__init__()
+        self.dense = nn.Linear(hidden_size, hidden_size)
+        self.dropout = nn.Dropout(dropout)
+        self.out_proj = nn.Linear(hidden_size, num_labels)
+
+    def forward(self, hidden_states):
+        x = self.dropout(hidden_states[:, 0, :])
+        x = torch.tanh(self.dense(x))
+        return self.out_proj(self.dropout(x))
+
+
+class MultiTaskModel(nn.Module):
+    """
+    Encodeur CamemBERT partagé + une tête par tâche : une seule passe
+    avant de l'encodeur donne les logits de toutes les tâches.
+    Format du dossier : encodeur (config.json, model.safetensors),
+    tokenizer, TASKS_FILE et HEADS_FILE.
+    """
+
+    def __init__(self, encoder, tasks):
+        super().__init__()
+        self.encoder = encoder
+        self.tasks = {task: list(labels) for task, labels in tasks.items()}
+        dropout = encoder.config.hidden_dropout_prob
+        self.heads = nn.ModuleDict({
+            task: ClassificationHead(encoder.config.hidden_size, len(labels), dropout)
+            for task, labels in self.tasks.items()
+        })
+
+    @classmethod
+    def from_encoder(cls, encoder_name, tasks):
+        """Nouvelles têtes sur un encodeur pré-entraîné (camembert-base, ou un classifieur fine-tuné)."""
+        return cls(AutoModel.from_pretrained(encoder_name, add_pooling_layer=False), tasks)
+
+    @classmethod
+    def from_pretrained(cls, model_path):
+        with open(os.path.join(model_path, TASKS_FILE), "r", encoding="utf-8") as f:
+            tasks = json.load(f)
+        model = cls(AutoModel.from_pretrained(model_path, add_pooling_layer=False), tasks)
+        model.heads.load_state_dict(torch.load(os.path.join(model_path, HEADS_FILE), map_location="cpu"))
+        return model
+
+    def save_pretrained(self, model_path, tokenizer=None):
+        os.makedirs(model_path, exist_ok=True)
+        self.encoder.save_pretrained(model_path)
+        torch.save(self.heads.state_dict(), os.path.join(model_path, HEADS_FILE))
+        with open(os.path.join(model_path, TASKS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.tasks, f, indent=4, ensure_ascii=False)
+        if tokenizer is not None:
+            tokenizer.save_pretrained(model_path)
+
+    def forward(self, input_ids, attention_mask=None, tasks=None):
+        """{tâche: logits} pour `tasks` (toutes par défaut), en une passe de l'encodeur."""
+        hidden = self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        return {task: self.heads[task](hidden) for task in (tasks or self.tasks)}
+
+
+# ==================================================================
+# 🔹 Inférence : thème et sensibilité en une passe avant
+# ==================================================================
+class MultiTaskClassifier(BucketedClassifier):
+    """
+    Lots par longueur de BucketedClassifier ; `forward` renvoie les logits
+    des têtes concaténés (une colonne par label, tâches dans l'ordre de
+    TASKS_FILE), découpés ensuite par tâche.
+    """
+
+    def load_model(self, model_path):
+        self.model = MultiTaskModel.from_pretrained(model_path).to(self.device)
+        self.model.eval()
+        self.tasks = self.model.tasks
+        labels = [f"{task}:{label}" for task, task_labels in self.tasks.items() for label in task_labels]
+        return dict(enumerate(labels))
+
+    def forward(self, batch):
+        batch = {k: v.to(self.device) for k, v in batch.items()}
+        logits = self.model(batch["input_ids"], batch.get("attention_mask"))
+        return torch.cat([logits[task] for task in self.tasks], dim=-1).float().cpu()
+
+    def predict_proba(self, texts):
+        """{tâche: probabilités (tenseur n × n_labels de la tâche)} dans l'ordre de `texts`."""
+        logits = self.predict_logits(texts)
+        sizes = [len(labels) for labels in self.tasks.values()]
+        return {task: torch.softmax(part, dim=-1)
+                for task, part in zip(self.tasks, torch.split(logits, sizes, dim=-1))}
+
+    def __call__(self, texts, **_):
+        """{tâche: [{'label': nom, 'score': p}]} dans l'ordre de `texts`."""
+        results = {}
+        for task, probs in self.predict_proba(texts).items():
+            scores, ids = probs.max(dim=-1)
+            results[task] = [{"label": self.tasks[task][int(i)], "score": float(s)} for s, i in zip(scores, ids)]
+        return results
+
+
+def classify_both(texts, model_path=MULTITASK_PATH, max_length=MAX_LENGTH, threads=INTRA_OP_THREADS,
+                  token_budget=TOKEN_BUDGET):
+    """Thème et sensibilité de `texts` en une passe avant par lot."""
+    return MultiTaskClassifier(model_path, max_length=max_length, token_budget=token_budget, threads=threads)(texts)
+
+
+# ==================================================================
+# 🔹 Benchmark : deux classifieurs vs modèle multi-tâche
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.inference.multitask --limit 500
+#   python -m src.classification.inference.multitask --model <dossier multi-tâche> --theme-model <dossier> --sensitive-model <dossier>
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût d'inférence : deux encodeurs vs un encodeur partagé")
+    parser.add_argument("--model", default=MULTITASK_PATH)
+    parser.add_argument("--theme-model", default=THEME_MODEL_PATH)
+    parser.add_argument("--sensitive-model", default=SENSITIVE_MODEL_PATH)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--column", default="contenu")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--threads", type=int, default=INTRA_OP_THREADS)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    separate = [BucketedClassifier(path, max_length=args.max_length, threads=args.threads)
+                for path in (args.theme_model, args.sensitive_model)]
+    shared = MultiTaskClassifier(args.model, max_length=args.max_length, threads=args.threads)
+
+    timings = {}
+    for name, classifiers in [("deux modèles", separate), ("multi-tâche", [shared])]:
+        for classifier in classifiers:
+            classifier.predict_logits(texts[:8])  # préchauffage hors mesure
+        passes = sum(c.forward_passes for c in classifiers)
+        start = time.perf_counter()
+        for classifier in classifiers:
+            classifier.predict_logits(texts)
+        timings[name] = (time.perf_counter() - start, sum(c.forward_passes for c in classifiers) - passes)
+
+    print(f"\n===== {len(texts)} textes de {args.input} : thème + sensibilité =====")
+    print(f"{'mode':<15}{'secondes':>10}{'posts/s':>10}{'passes avant':>14}")
+    for name, (seconds, passes) in timings.items():
+        print(f"{name:<15}{seconds:>10.2f}{len(texts) / seconds:>10.1f}{passes:>14}")
+    ratio = timings["multi-tâche"][0] / timings["deux modèles"][0]
+    print(f"\n📉 Coût multi-tâche : {ratio:.0%} de celui des deux modèles séparés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import time
+import argparse
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification
+
+from src.classification.inference.bucketed import BucketedClassifier, INTRA_OP_THREADS
+
+# Modèles exportés : <modèle>/onnx/model.onnx (fp32) et model.int8.onnx (int8 dynamique) ;
+# le tokenizer et config.json restent ceux du dossier du modèle
+ONNX_DIR = "onnx"
+ONNX_FILES = {"fp32": "model.onnx", "int8": "model.int8.onnx"}
+ONNX_OPSET = 17
+
+SAVED_MODELS = {
+    "theme": "src/classification/saved_models/camembert_classifier/",
+    "sensitive": "src/classification/saved_models/sensitive_classifier/",
+}
+# Fichiers hold-out de la vérification de parité (fichier, colonne texte, max_length)
+PARITY_FILES = {
+    "theme": ("data/facebook/facebook_posts_final.csv", "contenu", 256),
+    "sensitive": ("data/facebook/comments_FOR_PREDICTION.csv", "comment_text", 128),
+}
+
+
+def onnx_path(model_path, precision="fp32"):
+    return os.path.join(model_path, ONNX_DIR, ONNX_FILES[precision])
+
+
+# ==================================================================
+# 🔹 Inférence ONNX Runtime
+# ==================================================================
+class OnnxClassifier(BucketedClassifier):
+    """
+    Même découpage en lots par longueur que BucketedClassifier, mais le
+    modèle tourne dans ONNX Runtime (CPU), en fp32 ou quantifié int8.
+    """
+
+    def __init__(self, model_path, precision="fp32", **options):
+        self.precision = precision
+        super().__init__(model_path, device="cpu", **options)
+
+    def load_model(self, model_path):
+        import onnxruntime as ort
+
+        path = onnx_path(model_path, self.precision)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"{path} introuvable : lancez `python -m src.classification.inference.onnx_backend`"
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        return AutoConfig.from_pretrained(model_path).id2label
+
+    def forward(self, batch):
+        logits = self.session.run(None, {
+            "input_ids": batch["input_ids"].numpy(),
+            "attention_mask": batch["attention_mask"].numpy(),
+        })[0]
+        return torch.from_numpy(logits).float()
+
+
+# ==================================================================
+# 🔹 Export (fp32 + int8 dynamique)
+# ==================================================================
+class _LogitsOnly(torch.nn.Module):
+    """Sortie unique `logits` : graphe ONNX simple, entrées input_ids / attention_mask."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def export_model(model_path):
+    """Écrit <modèle>/onnx/model.onnx puis sa version quantifiée int8 ; retourne les tailles (Mo)."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(os.path.join(model_path, ONNX_DIR), exist_ok=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+    dummy = torch.ones(2, 16, dtype=torch.long)
+    dynamic = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        _LogitsOnly(model), (dummy, dummy), onnx_path(model_path, "fp32"),
+        input_names=["input_ids", "attention_mask"], output_names=["logits"],
+        dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "logits": {0: "batch"}},
+        opset_version=ONNX_OPSET, dynamo=False,
+    )
+    # Poids des couches linéaires en int8, activations quantifiées à la volée
+    quantize_dynamic(onnx_path(model_path, "fp32"), onnx_path(model_path, "int8"),
+                     weight_type=QuantType.QInt8)
+    return {p: os.path.getsize(onnx_path(model_path, p)) / 1e6 for p in ONNX_FILES}
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE
+# ==================================================================
+# python -m src.classification.inference.onnx_backend                  # export + parité des deux modèles
+# python -m src.classification.inference.onnx_backend --models sensitive --limit 500
+# python -m src.classification.inference.onnx_backend --no-export      # parité seule
+def main():
+    from src.classification.inference.benchmark import compare_backends, print_comparison, load_texts
+
+    parser = argparse.ArgumentParser(description="Export ONNX (fp32 / int8) et vérification de parité")
+    parser.add_argument("--models", nargs="+", choices=list(SAVED_MODELS), default=list(SAVED_MODELS))
+    parser.add_argument("--no-export", action="store_true", help="vérifier la parité des exports existants")
+    parser.add_argument("--no-check", action="store_true", help="exporter sans vérifier la parité")
+    parser.add_argument("--limit", type=int, default=1000, help="textes hold-out utilisés pour la parité")
+    parser.add_argument("--threads", type=int, default=INTRA_OP_THREADS)
+    args = parser.parse_args()
+
+    for name in args.models:
+        model_path = SAVED_MODELS[name]
+        if not args.no_export:
+            print(f"\n📦 Export ONNX de {model_path}...")
+            start = time.perf_counter()
+            sizes = export_model(model_path)
+            print(f"  fp32 : {sizes['fp32']:.0f} Mo, int8 : {sizes['int8']:.0f} Mo "
+                  f"({time.perf_counter() - start:.0f}s)")
+        if args.no_check:
+            continue
+
+        path, column, max_length = PARITY_FILES[name]
+        texts = load_texts(path, column, args.limit)
+        print(f"\n🔎 Parité {name} sur {len(texts)} textes de {path}")
+        results = compare_backends(model_path, texts, ["bucketed", "onnx", "onnx-int8"],
+                                   max_length=max_length, threads=args.threads)
+        print_comparison(results, len(texts), reference="bucketed")
+
+
+if __name__ == "__main__":
+    main()
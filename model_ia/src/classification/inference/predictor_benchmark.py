@@ -0,0 +1,83 @@
+import time
+import argparse
+import statistics
+import threading
+
+from src.classification.predict import Predictor, MODEL_DIR, MAX_BATCH, MAX_WAIT_MS
+from src.classification.inference.benchmark import load_texts, INPUT_FILE
+
+
+# ==================================================================
+# 🔹 Benchmark : Predictor sous appels concurrents
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.inference.predictor_benchmark --callers 1 8 64
+#   python -m src.classification.inference.predictor_benchmark --model src/classification/saved_models/camembert_classifier/
+#
+# Chaque appelant (thread) envoie ses textes un par un via predict(text),
+# comme le ferait un endpoint de l'API. On compare la file de micro-batching
+# à un Predictor sans regroupement (un texte par passe avant), et on mesure
+# latence (p50 / p95) et débit.
+
+def run_callers(predictor, texts, n_callers):
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(share):
+        mine = []
+        for text in share:
+            start = time.perf_counter()
+            predictor.predict(text)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=caller, args=(texts[i::n_callers],)) for i in range(n_callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "seconds": seconds,
+        "throughput": len(texts) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence / débit du Predictor sous appels concurrents")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--limit", type=int, default=512, help="textes envoyés par mesure")
+    parser.add_argument("--model", default=MODEL_DIR)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--column", default="contenu")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    modes = {
+        "unitaire": Predictor(args.model, max_batch=1, max_wait_ms=0, threads=args.threads),
+        "micro-batch": Predictor(args.model, max_batch=MAX_BATCH, max_wait_ms=args.max_wait_ms, threads=args.threads),
+    }
+    for predictor in modes.values():
+        predictor.predict_many(texts[:8])  # chargement + préchauffage hors mesure
+
+    print(f"\n===== Predictor : {len(texts)} appels predict(text) =====")
+    print(f"{'mode':<13}{'appelants':>10}{'posts/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'textes/lot':>12}")
+    for n_callers in args.callers:
+        for mode, predictor in modes.items():
+            before = dict(predictor.stats)
+            r = run_callers(predictor, texts, n_callers)
+            batches = predictor.stats["batches"] - before["batches"]
+            per_batch = (predictor.stats["requests"] - before["requests"]) / max(batches, 1)
+            print(f"{mode:<13}{n_callers:>10}{r['throughput']:>10.1f}{r['p50_ms']:>10.1f}"
+                  f"{r['p95_ms']:>10.1f}{per_batch:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
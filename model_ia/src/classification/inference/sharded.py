@@ -0,0 +1,159 @@
+import os
+import time
+import argparse
+import multiprocessing as mp
+
+import torch
+
+from src.classification.inference.bucketed import TOKEN_BUDGET
+from src.classification.inference.backends import BACKENDS, DEFAULT_BACKEND, load_backend, classify_texts
+
+SHARDS_PER_WORKER = 4   # plusieurs shards par worker : un shard de textes longs ne bloque pas la fin
+
+
+# ==================================================================
+# 🔹 Inférence multi-processus
+# ==================================================================
+# Chaque worker (processus "spawn") charge sa propre copie du modèle une
+# seule fois, avec un nombre fixe de threads intra-op et, si le système le
+# permet, ses propres cœurs (sched_setaffinity) : les workers ne se
+# disputent pas les cœurs. L'entrée est découpée en shards contigus,
+# distribués à la demande ; imap rend les résultats dans l'ordre des
+# shards, donc dans l'ordre d'origine. Un modèle qui ne se charge pas dans
+# un worker n'arrête pas le worker (le pool le relancerait sans fin) :
+# l'erreur est gardée et levée (WorkerLoadError) au premier shard.
+
+_worker = {}
+
+
+class WorkerLoadError(RuntimeError):
+    """Le modèle n'a pas pu être chargé dans un worker."""
+
+
+def default_threads(workers):
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _init_worker(model_path, backend, max_length, threads, token_budget, counter):
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        mine = cores[index * threads:(index + 1) * threads]
+        if len(mine) == threads:
+            os.sched_setaffinity(0, mine)
+    torch.set_num_threads(threads)
+    try:
+        _worker["classifier"] = load_backend(model_path, backend, max_length, threads, token_budget)
+    except Exception as e:
+        _worker["error"] = f"{type(e).__name__}: {e}"
+    _worker["backend"] = backend
+    _worker["max_length"] = max_length
+
+
+def _classify_shard(texts):
+    if "error" in _worker:
+        raise WorkerLoadError(_worker["error"])
+    return classify_texts(_worker["classifier"], texts, _worker["backend"], _worker["max_length"], progress=False)
+
+
+def shard(texts, n_shards):
+    size = max(1, -(-len(texts) // n_shards))
+    return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+
+class ShardedClassifier:
+    """
+    Pool de `workers` processus gardé ouvert entre les appels (classification
+    par morceaux, cf. streaming.py) ; `__call__(texts)` rend les résultats
+    dans l'ordre de `texts`.
+    """
+
+    def __init__(self, model_path, workers, backend=DEFAULT_BACKEND, max_length=256, threads=None,
+                 token_budget=TOKEN_BUDGET):
+        self.workers = workers
+        self.threads = threads or default_threads(workers)
+        context = mp.get_context("spawn")
+        counter = context.Value("i", 0)
+        self.pool = context.Pool(workers, initializer=_init_worker,
+                                 initargs=(model_path, backend, max_length, self.threads, token_budget, counter))
+
+    def __call__(self, texts):
+        results = []
+        for shard_results in self.pool.imap(_classify_shard, shard(texts, self.workers * SHARDS_PER_WORKER)):
+            results.extend(shard_results)
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+def classify_sharded(model_path, texts, workers, backend=DEFAULT_BACKEND, max_length=256, threads=None,
+                     token_budget=TOKEN_BUDGET):
+    """Résultats ({'label', 'score'}) dans l'ordre de `texts`, calculés par `workers` processus."""
+    with ShardedClassifier(model_path, workers, backend, max_length, threads, token_budget) as classifier:
+        return classifier(texts)
+
+
+# ==================================================================
+# 🔹 Rapport de passage à l'échelle
+# ==================================================================
+# python -m src.classification.inference.sharded --workers 1 2 4 8 --limit 4000
+# python -m src.classification.inference.sharded --backend onnx-int8 --threads 1
+def main():
+    from src.classification.inference.benchmark import load_texts, MODEL_PATH, INPUT_FILE
+
+    parser = argparse.ArgumentParser(description="Passage à l'échelle de l'inférence multi-processus (CPU)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=None,
+                        help="threads par worker (défaut : cœurs / workers)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--limit", type=int, default=4000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--column", default="contenu")
+    parser.add_argument("--max-length", type=int, default=256)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    print(f"{len(texts)} textes, {os.cpu_count()} cœurs, moteur {args.backend}")
+
+    rows, reference = [], None
+    for workers in args.workers:
+        threads = args.threads or default_threads(workers)
+        start = time.perf_counter()
+        results = classify_sharded(args.model, texts, workers, args.backend, args.max_length, threads)
+        seconds = time.perf_counter() - start   # chargement des modèles compris
+        labels = [r["label"] for r in results]
+        reference = reference or labels
+        # int8 : la quantification dynamique dépend de la composition des lots, l'accord peut être < 100 %
+        agreement = sum(a == b for a, b in zip(reference, labels)) / max(len(texts), 1)
+        rows.append((workers, threads, seconds, agreement))
+        print(f"  {workers} workers × {threads} threads : {seconds:.1f}s")
+
+    base = rows[0][2] * rows[0][0]
+    print("\n===== Passage à l'échelle (CPU) =====")
+    print(f"{'workers':>8}{'threads':>9}{'secondes':>10}{'posts/s':>10}{'accél.':>8}{'efficacité':>12}{'labels id.':>12}")
+    for workers, threads, seconds, agreement in rows:
+        speedup = rows[0][2] / seconds
+        print(f"{workers:>8}{threads:>9}{seconds:>10.1f}{len(texts) / seconds:>10.1f}{speedup:>7.1f}×"
+              f"{base / (seconds * workers):>12.0%}{agreement:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
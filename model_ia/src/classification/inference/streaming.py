@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import codecs
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000   # lignes lues, classées et écrites à la fois : la mémoire reste bornée par un morceau
+
+
+# ==================================================================
+# 🔹 Classification par morceaux, reprise sur checkpoint
+# ==================================================================
+# Le CSV d'entrée est lu par morceaux (read_csv(chunksize=...)) ; chaque
+# morceau classé est ajouté au CSV de sortie, synchronisé sur disque, puis
+# le checkpoint (JSON à côté de la sortie) enregistre le nombre de lignes
+# d'entrée traitées et la taille de la sortie à cet instant. Au
+# redémarrage, la sortie est tronquée à cette taille (un morceau écrit à
+# moitié disparaît) et la lecture reprend après la dernière ligne traitée.
+# Le checkpoint est supprimé quand tout le fichier est traité.
+
+def checkpoint_path(output_path):
+    return output_path + ".checkpoint.json"
+
+
+def load_checkpoint(output_path, input_path):
+    """État de reprise pour ce couple entrée / sortie, ou None."""
+    try:
+        with open(checkpoint_path(output_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if state.get("input") != os.path.abspath(input_path) or not os.path.exists(output_path):
+        return None
+    return state
+
+
+def save_checkpoint(output_path, state):
+    """Écriture atomique (fichier temporaire + os.replace)."""
+    path = checkpoint_path(output_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def append_chunk(output_path, df, first):
+    """Ajoute `df` au CSV (UTF-8 avec BOM, en-tête au premier morceau) ; retourne la taille du fichier."""
+    data = df.to_csv(index=False, header=first).encode("utf-8")
+    with open(output_path, "wb" if first else "ab") as f:
+        if first:
+            f.write(codecs.BOM_UTF8)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def stream_classify(input_path, output_path, process_chunk, chunk_rows=CHUNK_ROWS, resume=True):
+    """
+    Applique `process_chunk(df) -> df` à `input_path` morceau par morceau.
+    `process_chunk` retourne None pour interrompre (modèle introuvable...) :
+    le checkpoint reste alors valable. Retourne le nombre de lignes traitées
+    au total, ou None si interrompu.
+    """
+    state = load_checkpoint(output_path, input_path) if resume else None
+    rows_done = state["rows_done"] if state else 0
+    if state:
+        with open(output_path, "r+b") as f:
+            f.truncate(state["output_bytes"])
+        print(f"Reprise après {rows_done} lignes (checkpoint {checkpoint_path(output_path)}).")
+
+    start, new_rows, rows_read = time.perf_counter(), 0, 0
+    for chunk in pd.read_csv(input_path, chunksize=chunk_rows):
+        rows_read += len(chunk)
+        if rows_read <= rows_done:
+            continue  # déjà traité : lu et ignoré, sans le garder en mémoire
+        chunk = chunk.iloc[len(chunk) - (rows_read - rows_done):]
+
+        classified = process_chunk(chunk)
+        if classified is None:
+            return None
+        output_bytes = append_chunk(output_path, classified, first=rows_done == 0)
+        rows_done = rows_read
+        new_rows += len(chunk)
+        save_checkpoint(output_path, {"input": os.path.abspath(input_path), "rows_done": rows_done,
+                                      "output_bytes": output_bytes})
+        seconds = time.perf_counter() - start
+        print(f"  {rows_done:>10} lignes traitées ({new_rows / seconds:,.0f} lignes/s)")
+
+    if os.path.exists(checkpoint_path(output_path)):
+        os.remove(checkpoint_path(output_path))
+    return rows_done
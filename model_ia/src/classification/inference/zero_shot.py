@@ -0,0 +1,77 @@
+import time
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from src.classification.inference.bucketed import length_buckets, configure_threads, TOKEN_BUDGET, MAX_BATCH
+
+ZERO_SHOT_MODEL = "joeddav/xlm-roberta-large-xnli"
+NLI_MAX_LENGTH = 256
+
+
+# ==================================================================
+# 🔹 Zero-shot par NLI, paires (prémisse, hypothèse) en lots
+# ==================================================================
+class BatchedZeroShot:
+    """
+    Même calcul que pipeline("zero-shot-classification", multi_label=False) :
+    chaque (texte, label) devient une paire (texte, gabarit.format(label)),
+    et les logits "entailment" des labels d'un texte passent par un softmax.
+    Mais les paires de tous les textes sont tokenisées d'un coup, triées par
+    longueur et regroupées en lots à budget de tokens (length_buckets) :
+    une passe avant traite des dizaines de paires au lieu d'une.
+    `stats` compte les passes avant, les paires et le temps de calcul.
+    """
+
+    def __init__(self, labels, hypothesis_template, model_name=ZERO_SHOT_MODEL, max_length=NLI_MAX_LENGTH,
+                 token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH, device=None, threads=None):
+        configure_threads(threads)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+        self.labels = list(labels)
+        self.hypotheses = [hypothesis_template.format(label) for label in self.labels]
+        self.max_length = max_length
+        self.token_budget = token_budget
+        self.max_batch = max_batch
+        self.entailment_id = self.find_entailment_id(self.model.config.label2id)
+        self.stats = {"texts": 0, "pairs": 0, "forward_passes": 0, "seconds": 0.0}
+
+    @staticmethod
+    def find_entailment_id(label2id):
+        for label, i in label2id.items():
+            if label.lower().startswith("entail"):
+                return int(i)
+        return -1  # convention du pipeline transformers : dernier logit
+
+    def scores(self, texts):
+        """Tenseur n × n_labels de probabilités (softmax des logits entailment par texte)."""
+        start = time.perf_counter()
+        n_labels = len(self.labels)
+        premises = [t for t in texts for _ in range(n_labels)]
+        hypotheses = self.hypotheses * len(texts)
+        encoded = self.tokenizer(premises, hypotheses, truncation="only_first",
+                                 max_length=self.max_length, padding=False)
+        features = [{k: encoded[k][i] for k in encoded.keys()} for i in range(len(premises))]
+
+        entail = torch.empty(len(premises))
+        with torch.inference_mode():
+            for bucket in length_buckets([len(f["input_ids"]) for f in features], self.token_budget, self.max_batch):
+                batch = self.tokenizer.pad([features[i] for i in bucket], return_tensors="pt")
+                batch = {k: v.to(self.device) for k, v in batch.items()}
+                logits = self.model(**batch).logits.float().cpu()
+                entail[bucket] = logits[:, self.entailment_id]
+                self.stats["forward_passes"] += 1
+
+        self.stats["texts"] += len(texts)
+        self.stats["pairs"] += len(premises)
+        self.stats["seconds"] += time.perf_counter() - start
+        return torch.softmax(entail.view(len(texts), n_labels), dim=-1)
+
+    def __call__(self, texts):
+        """[(label, score)] dans l'ordre de `texts`."""
+        if not texts:
+            return []
+        scores, ids = self.scores(texts).max(dim=-1)
+        return [(self.labels[int(i)], float(s)) for s, i in zip(scores, ids)]
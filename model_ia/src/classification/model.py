@@ -1,18 +1,118 @@
+import os
+import random
+import hashlib
+
+import numpy as np
 from transformers import CamembertTokenizer
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, Sampler
 import pandas as pd
 
-tokenizer = CamembertTokenizer.from_pretrained("camembert-base")
+TOKENIZER_NAME = "camembert-base"
+TOKEN_CACHE_DIR = "data/cache/tokens"   # ids tokenisés (.npy mappés en mémoire), clé : hash du CSV + tokenizer
+TOKENIZE_CHUNK = 10_000
+
+_tokenizers = {}
+
+def get_tokenizer(name=TOKENIZER_NAME):
+    """Tokenizer chargé au premier usage (plus au chargement du module)."""
+    if name not in _tokenizers:
+        _tokenizers[name] = CamembertTokenizer.from_pretrained(name)
+    return _tokenizers[name]
+
+
+# ==================================================================
+# 🔹 Cache de tokenisation (NumPy mappé en mémoire)
+# ==================================================================
+# Tous les ids d'un CSV sont concaténés dans un tableau int32 (<clé>.ids.npy) ;
+# <clé>.offsets.npy donne le début de chaque texte (n + 1 valeurs). Les deux
+# fichiers sont relus avec mmap_mode="r" : pas de retokenisation au
+# redémarrage, et seules les pages lues sont chargées en mémoire.
+
+def token_cache_key(csv_path, tokenizer, max_length):
+    digest = hashlib.sha1()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(f"|{type(tokenizer).__name__}|{tokenizer.name_or_path}|{len(tokenizer)}|{max_length}".encode())
+    return digest.hexdigest()[:20]
+
+
+def save_npy(path, array):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def load_or_tokenize(csv_path, texts, tokenizer, max_length, cache_dir=TOKEN_CACHE_DIR):
+    """(ids, offsets) mappés en mémoire ; tokenise et écrit le cache si absent."""
+    key = token_cache_key(csv_path, tokenizer, max_length)
+    ids_path = os.path.join(cache_dir, f"{key}.ids.npy")
+    offsets_path = os.path.join(cache_dir, f"{key}.offsets.npy")
 
+    if not (os.path.exists(ids_path) and os.path.exists(offsets_path)):
+        os.makedirs(cache_dir, exist_ok=True)
+        chunks, lengths = [], []
+        for i in range(0, len(texts), TOKENIZE_CHUNK):
+            encoded = tokenizer(texts[i:i + TOKENIZE_CHUNK], truncation=True, max_length=max_length,
+                                padding=False)["input_ids"]
+            lengths.extend(len(ids) for ids in encoded)
+            chunks.append(np.fromiter((t for ids in encoded for t in ids), dtype=np.int32))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        save_npy(ids_path, np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32))
+        save_npy(offsets_path, offsets)  # écrit en dernier : sa présence marque un cache complet
+
+    return np.load(ids_path, mmap_mode="r"), np.load(offsets_path, mmap_mode="r")
+
+
+# ==================================================================
+# 🔹 Datasets
+# ==================================================================
 class PostsDataset(Dataset):
-    def __init__(self, csv_path, max_length=128):
+    """
+    Ids non paddés, lus dans le cache de tokenisation. Le padding est fait
+    par lot (DynamicPaddingCollator), à la longueur du plus long texte du lot.
+    """
+
+    def __init__(self, csv_path, max_length=128, tokenizer=None, cache_dir=TOKEN_CACHE_DIR):
+        df = pd.read_csv(csv_path)
+        categories = df["category"].astype("category")
+        self.labels = torch.tensor(categories.cat.codes.to_numpy(), dtype=torch.long)
+        self.label_map = dict(enumerate(categories.cat.categories))
+
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.ids, self.offsets = load_or_tokenize(
+            csv_path, df["message"].astype(str).tolist(), self.tokenizer, max_length, cache_dir
+        )
+        self.lengths = np.diff(self.offsets)
+
+    def __getitem__(self, idx):
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return {
+            "input_ids": torch.from_numpy(self.ids[start:end].astype(np.int64)),
+            "labels": self.labels[idx],
+        }
+
+    def __len__(self):
+        return len(self.labels)
+
+    def length_order(self):
+        """Indices triés par longueur (évaluation : lots homogènes, métriques inchangées)."""
+        return np.argsort(self.lengths, kind="stable").tolist()
+
+
+class PaddedPostsDataset(Dataset):
+    """Ancienne version : tokenisation complète au chargement, padding à max_length."""
+
+    def __init__(self, csv_path, max_length=128, tokenizer=None):
         df = pd.read_csv(csv_path)
         self.texts = df["message"].tolist()
         self.labels = df["category"].astype("category").cat.codes.tolist()
         self.label_map = dict(enumerate(df["category"].astype("category").cat.categories))
 
-        self.encodings = tokenizer(
+        self.encodings = (tokenizer or get_tokenizer())(
             self.texts,
             truncation=True,
             padding="max_length",
@@ -28,3 +128,59 @@ class PostsDataset(Dataset):
 
     def __len__(self):
         return len(self.labels)
+
+
+# ==================================================================
+# 🔹 Padding dynamique et lots groupés par longueur
+# ==================================================================
+class DynamicPaddingCollator:
+    """Padde chaque lot à la longueur de son plus long texte et construit attention_mask."""
+
+    def __init__(self, pad_token_id):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, features):
+        longest = max(len(f["input_ids"]) for f in features)
+        input_ids = torch.full((len(features), longest), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(features), longest), dtype=torch.long)
+        for row, f in enumerate(features):
+            n = len(f["input_ids"])
+            input_ids[row, :n] = f["input_ids"]
+            attention_mask[row, :n] = 1
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "labels": torch.stack([torch.as_tensor(f["labels"]) for f in features]),
+        }
+
+
+class LengthGroupedBatchSampler(Sampler):
+    """
+    Lots de textes de longueurs voisines, dans un ordre aléatoire : les
+    indices sont mélangés, découpés en « méga-lots » de
+    batch_size × mega_batch_mult, triés par longueur dans chaque méga-lot,
+    puis découpés en lots dont l'ordre est mélangé. Nouveau tirage à chaque
+    époque (graine + numéro d'itération).
+    """
+
+    def __init__(self, lengths, batch_size, mega_batch_mult=50, seed=42):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.mega_batch = batch_size * mega_batch_mult
+        self.seed = seed
+        self.epoch = 0
+
+    def __iter__(self):
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+        indices = list(range(len(self.lengths)))
+        rng.shuffle(indices)
+        batches = []
+        for i in range(0, len(indices), self.mega_batch):
+            mega = sorted(indices[i:i + self.mega_batch], key=lambda j: self.lengths[j])
+            batches.extend(mega[k:k + self.batch_size] for k in range(0, len(mega), self.batch_size))
+        rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self):
+        return -(-len(self.lengths) // self.batch_size)
@@ -1,38 +1,136 @@
-import torch
-from transformers import CamembertTokenizer, CamembertForSequenceClassification, pipeline
+import os
+import sys
+import argparse
 import pandas as pd
-from tqdm import tqdm
+
+# Lancé comme script : src/classification/model.py masque le dossier model/,
+# on rend donc `src.` importable depuis la racine model_ia/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from src.classification.inference.bucketed import TOKEN_BUDGET, INTRA_OP_THREADS
+from src.classification.inference.backends import BACKENDS, DEFAULT_BACKEND, load_backend, backend_device, classify_texts
+from src.classification.inference.cache import PredictionCache
+from src.classification.inference.sharded import ShardedClassifier, WorkerLoadError
+from src.classification.inference.streaming import stream_classify, CHUNK_ROWS
+from src.classification.inference.dedup import classify_deduplicated
+
+# Lancement (depuis model_ia/) :
+#   python src/classification/model/predict.py [--backend bucketed|pipeline|onnx|onnx-int8] [--threads N] [--workers N] [--no-cache]
+#                                               [--stream [--chunk-rows N] [--restart]] [--model DOSSIER] [--no-dedup]
+#   --model : autre dossier de modèle de même format, ex. l'élève distillé
+#             src/classification/saved_models/camembert_classifier_student/ (src/classification/distill.py)
 
 # CHEMINS (Ils sont corrects)
 MODEL_PATH = "src/classification/saved_models/camembert_classifier/"
 INPUT_FILE = "data/facebook/facebook_posts_final.csv"
 OUTPUT_FILE = "data/facebook/facebook_posts_classified.csv"
+MAX_LENGTH = 256  # comme à l'entraînement
+
+
+def load_classifier(backend=DEFAULT_BACKEND, threads=INTRA_OP_THREADS, token_budget=TOKEN_BUDGET,
+                    model_path=MODEL_PATH):
+    """
+    Charge le modèle à la demande (plus au chargement du module) avec le
+    moteur choisi (cf. src/classification/inference/backends.py).
+    Retourne None si le modèle est introuvable.
+    """
+    print(f"Chargement du modèle fine-tuné depuis {model_path}...")
+    try:
+        classifier = load_backend(model_path, backend, MAX_LENGTH, threads, token_budget)
+        print(f"Modèle chargé avec succès sur le device: {backend_device(backend)} ({backend})")
+        return classifier
+    except Exception as e:
+        print(f"Erreur lors du chargement du modèle : {e}")
+        print("Assure-toi que les fichiers (config.json, model.safetensors, etc.) sont bien dans le dossier.")
+        return None
 
-# Charger le pipeline
-print(f"Chargement du modèle fine-tuné depuis {MODEL_PATH}...")
-try:
-    # Si tu as un GPU local, mets 0. Sinon, -1 utilisera le CPU.
-    device = 0 if torch.cuda.is_available() else -1 
-    classifier = pipeline(
-        "text-classification",
-        model=MODEL_PATH,
-        tokenizer=MODEL_PATH,
-        device=device 
-    )
-    print(f"Modèle chargé avec succès sur le device: {'GPU' if device == 0 else 'CPU'}")
-except Exception as e:
-    print(f"Erreur lors du chargement du modèle : {e}")
-    print("Assure-toi que les fichiers (config.json, model.safetensors, etc.) sont bien dans le dossier.")
-    exit()
 
 # Labels (doivent correspondre EXACTEMENT à l'entraînement)
 CATEGORIES = ["Politique","Gouvernance","Économie", "Sécurité", "Santé", "Culture", "Sport", "Autres", "Social", "Environnement", "Diplomatie","Justice","Humanitaire"]
 
-def classify_all_posts():
+class PostClassifier:
+    """
+    Classification thématique réutilisable d'un appel à l'autre (morceaux
+    du mode streaming) : le modèle, ou le pool de processus si `workers` > 1
+    (sharded.py), n'est chargé qu'une fois, au premier texte absent du cache
+    des prédictions (cache.py, désactivé par `use_cache=False`).
+    Avec `dedup`, les doublons (exacts, tronqués « … En voir plus », ou
+    quasi-doublons) ne sont classés qu'une fois (dedup.py).
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND, threads=INTRA_OP_THREADS, use_cache=True, workers=1,
+                 model_path=MODEL_PATH, dedup=True):
+        self.backend = backend
+        self.dedup = dedup
+        self.model_path = model_path
+        self.threads = threads
+        self.workers = workers
+        self.classifier = None
+        self.cache = PredictionCache() if use_cache else None
+        self.version = self.cache.model_version(model_path, backend, MAX_LENGTH) if use_cache else None
+
+    def classify_missing(self, texts):
+        if self.classifier is None:
+            if self.workers > 1:
+                print(f"Démarrage de {self.workers} processus d'inférence ({self.backend})...")
+                self.classifier = ShardedClassifier(self.model_path, self.workers, self.backend, MAX_LENGTH, self.threads)
+            else:
+                self.classifier = load_classifier(self.backend, self.threads, model_path=self.model_path)
+                if self.classifier is None:
+                    return None
+        print(f"Classification de {len(texts)} posts (cela peut prendre du temps)...")
+        if self.workers > 1:
+            try:
+                return self.classifier(texts)
+            except WorkerLoadError as e:
+                print(f"Erreur lors du chargement du modèle : {e}")
+                self.classifier.terminate()
+                self.classifier = None
+                return None
+        # On utilise max_length=256, comme à l'entraînement ; 'LABEL_6' en cas d'erreur
+        return classify_texts(self.classifier, texts, self.backend, MAX_LENGTH, fallback_label='LABEL_6')
+
+    def classify_unique(self, texts):
+        if self.cache is None:
+            return self.classify_missing(texts)
+        return self.cache.classify(self.version, texts, self.classify_missing)
+
+    def __call__(self, texts):
+        if self.dedup:
+            return classify_deduplicated(texts, self.classify_unique)
+        return self.classify_unique(texts)
+
+    def close(self):
+        if self.cache is not None:
+            print(self.cache.report())
+            self.cache.close()
+        if isinstance(self.classifier, ShardedClassifier):
+            self.classifier.close()
+
+
+def label_posts(df, results):
+    """Mapper les résultats (ex: 'LABEL_0') aux noms (ex: 'Politique')."""
+    df['theme'] = [CATEGORIES[int(r['label'].split('_')[-1])] for r in results]
+    df['theme_confidence'] = [r['score'] for r in results]
+    return df
+
+
+def classify_all_posts(backend=DEFAULT_BACKEND, threads=INTRA_OP_THREADS, use_cache=True, workers=1,
+                       stream=False, chunk_rows=CHUNK_ROWS, resume=True, model_path=MODEL_PATH, dedup=True):
     """
-    Charge le CSV final, applique la classification sur chaque post, 
+    Charge le CSV final, applique la classification sur chaque post,
     et sauvegarde le résultat.
+    Avec `use_cache`, seuls les posts absents du cache des prédictions
+    sont classés ; avec `workers` > 1, ils sont répartis entre autant de
+    processus (cf. PostClassifier) ; avec `dedup`, un seul post par groupe
+    de doublons est classé.
+    Avec `stream`, le CSV est lu, classé et écrit par morceaux de
+    `chunk_rows` lignes avec un checkpoint : une exécution interrompue
+    reprend à la dernière ligne traitée (streaming.py).
     """
+    if stream:
+        return classify_posts_streaming(backend, threads, use_cache, workers, chunk_rows, resume, model_path, dedup)
+
     try:
         df = pd.read_csv(INPUT_FILE)
     except FileNotFoundError:
@@ -44,37 +142,68 @@ def classify_all_posts():
     if 'contenu' not in df.columns:
         print(f"Erreur : Colonne 'contenu' non trouvée dans {INPUT_FILE}.")
         return
-    
+
     text_column = 'contenu'
     # --- FIN MODIFICATION ---
 
     texts = df[text_column].fillna("").tolist()
 
-    print(f"Début de la classification de {len(texts)} posts (cela peut prendre du temps)...")
-
-    # Classification par batch pour la vitesse (si GPU disponible)
-    results = []
-    batch_size = 32 if device == 0 else 1 # batch_size de 1 si CPU
-
-    # tqdm pour la barre de progression
-    for i in tqdm(range(0, len(texts), batch_size), desc="Classification"):
-        batch = texts[i:i+batch_size]
-        try:
-            # On utilise max_length=256, comme à l'entraînement
-            batch_results = classifier(batch, truncation=True, max_length=256)
-            results.extend(batch_results)
-        except Exception as e:
-            # Gérer les textes vides ou problématiques
-            print(f"Erreur sur batch {i}: {e}. Remplacement par 'Autres'.")
-            results.extend([{'label': 'LABEL_6', 'score': 1.0}] * len(batch))
-
-    # Mapper les résultats (ex: 'LABEL_0') aux noms (ex: 'Politique')
-    df['theme'] = [CATEGORIES[int(r['label'].split('_')[-1])] for r in results]
-    df['theme_confidence'] = [r['score'] for r in results]
+    classifier = PostClassifier(backend, threads, use_cache, workers, model_path, dedup)
+    try:
+        results = classifier(texts)
+    finally:
+        classifier.close()
+    if results is None:
+        return
+
+    label_posts(df, results)
 
     df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
     print(f"\n--- Étape 1 (predict) Terminée ---")
     print(f"Classification terminée. Fichier sauvegardé : {OUTPUT_FILE}")
 
+
+def classify_posts_streaming(backend=DEFAULT_BACKEND, threads=INTRA_OP_THREADS, use_cache=True, workers=1,
+                             chunk_rows=CHUNK_ROWS, resume=True, model_path=MODEL_PATH, dedup=True):
+    if not os.path.exists(INPUT_FILE):
+        print(f"Erreur : Fichier {INPUT_FILE} non trouvé. Avez-vous lancé l'étape 0 ?")
+        return
+
+    classifier = PostClassifier(backend, threads, use_cache, workers, model_path, dedup)
+
+    def process_chunk(df):
+        if 'contenu' not in df.columns:
+            print(f"Erreur : Colonne 'contenu' non trouvée dans {INPUT_FILE}.")
+            return None
+        results = classifier(df['contenu'].fillna("").tolist())
+        return None if results is None else label_posts(df, results)
+
+    print(f"Classification par morceaux de {chunk_rows} lignes : {INPUT_FILE} → {OUTPUT_FILE}")
+    try:
+        rows = stream_classify(INPUT_FILE, OUTPUT_FILE, process_chunk, chunk_rows, resume)
+    finally:
+        classifier.close()
+    if rows is None:
+        print("Classification interrompue : relancez la commande pour reprendre au dernier morceau écrit.")
+        return
+    print(f"\n--- Étape 1 (predict) Terminée ---")
+    print(f"Classification terminée ({rows} posts). Fichier sauvegardé : {OUTPUT_FILE}")
+
 if __name__ == "__main__":
-    classify_all_posts()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Classification thématique des posts")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="bucketed : lots par longueur (CPU optimisé) ; pipeline : ancien chemin ; "
+                             "onnx / onnx-int8 : ONNX Runtime (export préalable)")
+    parser.add_argument("--threads", type=int, default=INTRA_OP_THREADS, help="threads intra-op")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processus d'inférence (threads par processus : --threads, défaut cœurs / workers)")
+    parser.add_argument("--no-cache", action="store_true", help="tout reclasser sans consulter le cache")
+    parser.add_argument("--stream", action="store_true", help="lecture / écriture par morceaux, avec reprise")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--restart", action="store_true", help="ignorer le checkpoint et repartir du début")
+    parser.add_argument("--model", default=MODEL_PATH, help="dossier du modèle (ex. élève distillé)")
+    parser.add_argument("--no-dedup", action="store_true", help="classer chaque post, doublons compris")
+    args = parser.parse_args()
+    classify_all_posts(args.backend, args.threads, use_cache=not args.no_cache, workers=args.workers,
+                       stream=args.stream, chunk_rows=args.chunk_rows, resume=not args.restart, model_path=args.model,
+                       dedup=not args.no_dedup)
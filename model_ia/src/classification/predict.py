@@ -1,22 +1,120 @@
-from transformers import CamembertTokenizer, CamembertForSequenceClassification
-import torch
+import os
 import json
+import time
+import queue
+import threading
+from concurrent.futures import Future
 
+from src.classification.inference.bucketed import BucketedClassifier, TOKEN_BUDGET
+
+MODEL_DIR = "model_classification/"
+MAX_LENGTH = 256
+MAX_BATCH = 64        # textes max par passe avant de la file de micro-batching
+MAX_WAIT_MS = 5       # attente max, après la première requête, pour regrouper les appels concurrents
+
+
+# ==================================================================
+# 🔹 Service d'inférence en processus (API FastAPI et scripts batch)
+# ==================================================================
 class Predictor:
-    def __init__(self):
-        self.tokenizer = CamembertTokenizer.from_pretrained("camembert-base")
-        self.model = CamembertForSequenceClassification.from_pretrained("model_classification/")
-        self.model.eval()
+    """
+    Le modèle n'est chargé qu'au premier appel (import sans coût), avec le
+    tokenizer rapide du dossier du modèle.
+    - `predict_many(texts)` : classification directe d'une liste (scripts
+      batch), lots par longueur (BucketedClassifier) ;
+    - `predict(text)` / `submit(text)` : appels unitaires, éventuellement
+      concurrents ; un thread regroupe les requêtes arrivées dans les
+      MAX_WAIT_MS ms (jusqu'à MAX_BATCH) en une seule passe avant.
+    `submit` retourne un concurrent.futures.Future : depuis un endpoint
+    async, `await asyncio.wrap_future(predictor.submit(text))`.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, max_length=MAX_LENGTH, max_batch=MAX_BATCH,
+                 max_wait_ms=MAX_WAIT_MS, threads=None):
+        self.model_dir = model_dir
+        self.max_length = max_length
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.threads = threads
+        self.classifier = None
+        self.label_map = None
+        self.load_lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.worker = None
+        self.stats = {"requests": 0, "batches": 0}
+
+    def load(self):
+        with self.load_lock:
+            if self.classifier is None:
+                classifier = BucketedClassifier(self.model_dir, max_length=self.max_length,
+                                                token_budget=TOKEN_BUDGET, threads=self.threads)
+                labels_path = os.path.join(self.model_dir, "labels.json")
+                if os.path.exists(labels_path):
+                    with open(labels_path, "r") as f:
+                        self.label_map = {int(k): v for k, v in json.load(f).items()}
+                else:
+                    self.label_map = {int(k): v for k, v in classifier.id2label.items()}
+                self.classifier = classifier
+        return self.classifier
 
-        with open("model_classification/labels.json", "r") as f:
-            self.label_map = json.load(f)
+    # ------------------------------------------------------------------
+    # 🔹 Lots
+    # ------------------------------------------------------------------
+    def predict_many(self, texts, return_scores=False):
+        """Catégories (et scores) dans l'ordre de `texts`."""
+        if not texts:
+            return []
+        probs = self.load().predict_proba(texts)
+        scores, ids = probs.max(dim=-1)
+        labels = [self.label_map[int(i)] for i in ids]
+        if return_scores:
+            return list(zip(labels, [float(s) for s in scores]))
+        return labels
+
+    # ------------------------------------------------------------------
+    # 🔹 Appels unitaires regroupés (micro-batching)
+    # ------------------------------------------------------------------
+    def submit(self, text):
+        if self.worker is None:
+            with self.load_lock:
+                if self.worker is None:
+                    self.worker = threading.Thread(target=self._serve, name="predictor-batcher", daemon=True)
+                    self.worker.start()
+        future = Future()
+        self.requests.put((text, future))
+        return future
 
     def predict(self, text):
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        with torch.no_grad():
-            logits = self.model(**inputs).logits
-        pred_id = torch.argmax(logits).item()
-        return self.label_map[str(pred_id)]
+        return self.submit(text).result()
+
+    def _serve(self):
+        while True:
+            batch = [self.requests.get()]
+            end = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = end - time.monotonic()
+                try:
+                    batch.append(self.requests.get(timeout=remaining) if remaining > 0
+                                 else self.requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Futures annulées par l'appelant (client déconnecté) : ignorées
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                results = self.predict_many(texts)  # charge le modèle au premier lot
+                for (_, future), label in zip(batch, results):
+                    future.set_result(label)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+
 
 predictor = Predictor()
 
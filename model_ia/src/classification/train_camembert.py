@@ -1,16 +1,22 @@
 import torch
+from torch.utils.data import DataLoader, Subset
 from transformers import CamembertForSequenceClassification, Trainer, TrainingArguments
-from model import PostsDataset
+from model import PostsDataset, DynamicPaddingCollator, LengthGroupedBatchSampler
 import json
 import os
 
+BATCH_SIZE = 8
+
 # ----------- GPU AUTO ----------- #
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 print("🖥️ Device used for training :", device)
 
 # ----------- DATA ----------- #
+# Ids tokenisés une seule fois puis relus depuis data/cache/tokens/ (mmap) ;
+# padding à la longueur du plus long texte du lot, pas à max_length.
 train_ds = PostsDataset("data/dataset_classification/train.csv")
 val_ds = PostsDataset("data/dataset_classification/val.csv")
+collator = DynamicPaddingCollator(train_ds.tokenizer.pad_token_id)
 
 num_labels = len(train_ds.label_map)
 
@@ -31,8 +37,8 @@ args = TrainingArguments(
     evaluation_strategy="epoch",
     save_strategy="epoch",
     learning_rate=2e-5,
-    per_device_train_batch_size=8,
-    per_device_eval_batch_size=8,
+    per_device_train_batch_size=BATCH_SIZE,
+    per_device_eval_batch_size=BATCH_SIZE,
     num_train_epochs=5,
     weight_decay=0.01,
     load_best_model_at_end=True,
@@ -41,11 +47,23 @@ args = TrainingArguments(
     fp16=torch.cuda.is_available(),  # 👉 Active mixed precision si GPU
 )
 
-trainer = Trainer(
+class LengthGroupedTrainer(Trainer):
+    """Lots d'entraînement de longueurs voisines (LengthGroupedBatchSampler)."""
+
+    def get_train_dataloader(self):
+        sampler = LengthGroupedBatchSampler(self.train_dataset.lengths, self.args.per_device_train_batch_size,
+                                            seed=self.args.seed)
+        return DataLoader(self.train_dataset, batch_sampler=sampler, collate_fn=self.data_collator,
+                          num_workers=self.args.dataloader_num_workers)
+
+
+trainer = LengthGroupedTrainer(
     model=model,
     args=args,
     train_dataset=train_ds,
-    eval_dataset=val_ds,
+    # Évaluation dans l'ordre des longueurs : lots homogènes, métriques inchangées
+    eval_dataset=Subset(val_ds, val_ds.length_order()),
+    data_collator=collator,
 )
 
 # ----------- TRAIN ----------- #
@@ -0,0 +1,154 @@
+import os
+import json
+import random
+import argparse
+
+import torch
+import torch.nn.functional as F
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from transformers import AutoTokenizer
+
+from src.classification.model import DynamicPaddingCollator, LengthGroupedBatchSampler
+from src.classification.inference.bucketed import length_buckets, configure_threads
+from src.classification.inference.multitask import MultiTaskModel, MULTITASK_PATH, MAX_LENGTH
+
+# Lancement (depuis model_ia/) :
+#   python -m src.classification.train_multitask
+#   python -m src.classification.train_multitask --encoder src/classification/saved_models/camembert_classifier/ --epochs 2
+#   python -m src.classification.train_multitask --limit 300 --epochs 1      # petit essai CPU
+# Un encodeur CamemBERT partagé, une tête par tâche, entraînés sur les deux
+# jeux annotés ; inférence : src/classification/inference/multitask.py.
+
+# Jeux annotés par tâche : (fichier, colonne texte, colonne label)
+TASK_DATASETS = {
+    "theme": ("data/facebook/facebook_posts_annotated.csv", "content", "category"),
+    "sensitive": ("data/facebook/comments_FOR_TRAINING.csv", "comment_text", "true_category"),
+}
+# Labels dans l'ordre des sorties de chaque tête (mêmes listes, même ordre que
+# CATEGORIES de model/predict.py et de detection/generate_sensitive_alerts.py)
+TASK_LABELS = {
+    "theme": ["Politique","Gouvernance","Économie", "Sécurité", "Santé", "Culture", "Sport", "Autres", "Social", "Environnement", "Diplomatie","Justice","Humanitaire"],
+    "sensitive": ['normal', 'toxic', 'hateful', 'misinfo', 'adult'],
+}
+ENCODER_NAME = "camembert-base"
+VAL_SIZE = 0.1
+BATCH_SIZE = 8
+EPOCHS = 5
+LEARNING_RATE = 2e-5
+SEED = 42
+REPORT_FILE = "training.json"
+
+
+def load_task(task, tokenizer, max_length, limit=None):
+    """(train, val) : listes de features {'input_ids', 'labels'} de la tâche."""
+    path, text_column, label_column = TASK_DATASETS[task]
+    df = pd.read_csv(path).dropna(subset=[text_column, label_column])
+    label_ids = {label: i for i, label in enumerate(TASK_LABELS[task])}
+    unknown = set(df[label_column]) - set(label_ids)
+    if unknown:
+        print(f"⚠️ {task} : labels inconnus ignorés : {sorted(unknown)}")
+        df = df[df[label_column].isin(label_ids)]
+    if limit:
+        df = df.sample(n=min(limit, len(df)), random_state=SEED)
+
+    train, val = train_test_split(df, test_size=VAL_SIZE, random_state=SEED)
+    splits = []
+    for part in (train, val):
+        input_ids = tokenizer(part[text_column].astype(str).tolist(), truncation=True,
+                              max_length=max_length, padding=False)["input_ids"]
+        splits.append([{"input_ids": torch.tensor(ids), "labels": torch.tensor(label_ids[label])}
+                       for ids, label in zip(input_ids, part[label_column])])
+    return splits
+
+
+def task_batches(datasets, batch_size, seed):
+    """Lots (tâche, features) des deux tâches, mélangés : chaque lot ne sert qu'une tête."""
+    batches = []
+    for task, features in datasets.items():
+        sampler = LengthGroupedBatchSampler([len(f["input_ids"]) for f in features], batch_size, seed=seed)
+        batches.extend((task, [features[i] for i in batch]) for batch in sampler)
+    random.Random(seed).shuffle(batches)
+    return batches
+
+
+def evaluate(model, datasets, collator, device):
+    """Exactitude par tâche (lots triés par longueur)."""
+    model.eval()
+    accuracy = {}
+    with torch.inference_mode():
+        for task, features in datasets.items():
+            correct = 0
+            for bucket in length_buckets([len(f["input_ids"]) for f in features]):
+                batch = {k: v.to(device) for k, v in collator([features[i] for i in bucket]).items()}
+                logits = model(batch["input_ids"], batch["attention_mask"], tasks=[task])[task]
+                correct += int((logits.argmax(dim=-1) == batch["labels"]).sum())
+            accuracy[task] = correct / max(len(features), 1)
+    model.train()
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraînement du modèle multi-tâche (thème + sensibilité)")
+    parser.add_argument("--encoder", default=ENCODER_NAME, help="encodeur de départ (nom ou dossier)")
+    parser.add_argument("--output", default=MULTITASK_PATH)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=LEARNING_RATE)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--limit", type=int, default=None, help="exemples max par tâche")
+    parser.add_argument("--threads", type=int, default=None, help="threads intra-op")
+    args = parser.parse_args()
+    configure_threads(args.threads)
+    torch.manual_seed(SEED)
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print("🖥️ Device used for training :", device)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.encoder)
+    train_sets, val_sets = {}, {}
+    for task in TASK_DATASETS:
+        train_sets[task], val_sets[task] = load_task(task, tokenizer, args.max_length, args.limit)
+        print(f"📚 {task} : {len(train_sets[task])} exemples d'entraînement, {len(val_sets[task])} de validation")
+
+    model = MultiTaskModel.from_encoder(args.encoder, TASK_LABELS).to(device)
+    collator = DynamicPaddingCollator(tokenizer.pad_token_id)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=args.lr, weight_decay=0.01)
+    steps_per_epoch = len(task_batches(train_sets, args.batch_size, SEED))
+    total_steps = args.epochs * steps_per_epoch
+    scheduler = torch.optim.lr_scheduler.LambdaLR(optimizer, lambda step: 1 - step / max(total_steps, 1))
+
+    history = []
+    best = None
+    model.train()
+    for epoch in range(args.epochs):
+        running = {task: [0.0, 0] for task in TASK_DATASETS}
+        for task, features in task_batches(train_sets, args.batch_size, SEED + epoch):
+            batch = {k: v.to(device) for k, v in collator(features).items()}
+            logits = model(batch["input_ids"], batch["attention_mask"], tasks=[task])[task]
+            loss = F.cross_entropy(logits, batch["labels"])
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad()
+            running[task][0] += loss.item()
+            running[task][1] += 1
+
+        accuracy = evaluate(model, val_sets, collator, device)
+        losses = {task: total / max(n, 1) for task, (total, n) in running.items()}
+        history.append({"epoch": epoch + 1, "loss": losses, "val_accuracy": accuracy})
+        print(f"  époque {epoch + 1}/{args.epochs} : "
+              + ", ".join(f"{t} perte {losses[t]:.4f} / exactitude {accuracy[t]:.1%}" for t in TASK_DATASETS))
+
+        score = sum(accuracy.values()) / len(accuracy)
+        if best is None or score > best:
+            best = score
+            model.save_pretrained(args.output, tokenizer)  # meilleur modèle (moyenne des exactitudes)
+
+    with open(os.path.join(args.output, REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump({"encoder": args.encoder, "history": history}, f, indent=4, ensure_ascii=False)
+    print(f"🎉 Modèle multi-tâche sauvegardé dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
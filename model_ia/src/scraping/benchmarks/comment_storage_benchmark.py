@@ -0,0 +1,136 @@
+import os
+import csv
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime
+
+from src.scraping.utils.storage import CommentWriter
+
+
+# ==================================================================
+# 🔹 Benchmark : commentaires/seconde, ancien save_comment vs CommentWriter
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.scraping.benchmarks.comment_storage_benchmark --n 100000
+#
+# L'ancien chemin relit et réécrit tout le JSON à chaque commentaire (O(n²)) :
+# il est mesuré sur les `--legacy-n` premiers commentaires seulement, son débit
+# ne pouvant que baisser ensuite.
+
+WORDS = ("merci", "info", "burkina", "paix", "courage", "vraiment", "triste",
+         "bonne", "nouvelle", "force", "FDS", "Dieu", "pays", "vérité", "suite")
+
+
+def synthetic_comments(n, seed=42):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "page": f"Page {i % 9}",
+            "post_id": str(i // 200),
+            "post_url": f"https://web.facebook.com/page/posts/{i // 200}",
+            "comment": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) + f" #{i}",
+            "comment_date": None,
+        }
+
+
+def legacy_save_comment(db_path, json_path, csv_path, page, post_id, post_url, comment_text, comment_date):
+    """Copie du save_comment historique (connexion + réécriture JSON par commentaire)."""
+    timestamp = datetime.now().isoformat()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO comments(page, post_id, post_url, comment, comment_date, scraped_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (page, post_id, post_url, comment_text, comment_date, timestamp))
+    conn.commit()
+    conn.close()
+
+    with open(json_path, "r+", encoding="utf-8") as f:
+        data = json.load(f)
+        data.append({
+            "page": page,
+            "post_id": post_id,
+            "post_url": post_url,
+            "comment": comment_text,
+            "comment_date": comment_date,
+            "scraped_at": timestamp
+        })
+        f.seek(0)
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([page, post_id, post_url, comment_text, comment_date, timestamp])
+
+
+def bench_legacy(workdir, n):
+    db_path = os.path.join(workdir, "legacy.db")
+    json_path = os.path.join(workdir, "legacy.json")
+    csv_path = os.path.join(workdir, "legacy.csv")
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(CommentWriter.schema)
+    conn.commit()
+    conn.close()
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump([], f)
+
+    start = time.perf_counter()
+    for c in synthetic_comments(n):
+        legacy_save_comment(db_path, json_path, csv_path, c["page"], c["post_id"],
+                            c["post_url"], c["comment"], c["comment_date"])
+    return n / (time.perf_counter() - start)
+
+
+def bench_buffered(workdir, n, flush_size):
+    start = time.perf_counter()
+    with CommentWriter(os.path.join(workdir, "buffered.db"),
+                       os.path.join(workdir, "buffered.jsonl"),
+                       os.path.join(workdir, "buffered.csv"),
+                       flush_size=flush_size, flush_interval=float("inf")) as writer:
+        for c in synthetic_comments(n):
+            writer.add(c)
+    rate = n / (time.perf_counter() - start)
+
+    # Deuxième passage : mêmes commentaires → upsert, aucune nouvelle ligne
+    with CommentWriter(os.path.join(workdir, "buffered.db"),
+                       os.path.join(workdir, "rerun.jsonl"),
+                       os.path.join(workdir, "rerun.csv"),
+                       flush_size=flush_size, flush_interval=float("inf")) as writer:
+        for c in synthetic_comments(n):
+            writer.add(c)
+    conn = sqlite3.connect(os.path.join(workdir, "buffered.db"))
+    rows = conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+    conn.close()
+    return rate, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du stockage des commentaires")
+    parser.add_argument("--n", type=int, default=100_000, help="commentaires synthétiques")
+    parser.add_argument("--legacy-n", type=int, default=2_000, help="commentaires pour l'ancien chemin")
+    parser.add_argument("--flush-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        legacy_n = min(args.n, args.legacy_n)
+        print(f"Ancien save_comment sur {legacy_n} commentaires...")
+        legacy_rate = bench_legacy(workdir, legacy_n)
+
+        print(f"CommentWriter sur {args.n} commentaires (lots de {args.flush_size})...")
+        buffered_rate, rows = bench_buffered(workdir, args.n, args.flush_size)
+
+    print("\n===== Résultats =====")
+    print(f"Ancien chemin  : {legacy_rate:10.0f} commentaires/s (sur {legacy_n}, se dégrade avec n)")
+    print(f"CommentWriter  : {buffered_rate:10.0f} commentaires/s (sur {args.n})")
+    print(f"Accélération   : x{buffered_rate / legacy_rate:.0f}")
+    print(f"Relance identique : {rows} lignes en base pour {args.n} commentaires (upsert)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+import time
+import argparse
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from src.scraping.utils.driver import get_driver
+from src.scraping.replay.server import FixtureSite
+from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from src.scraping.facebook.selectors import POST_CONTENT
+
+
+# ==================================================================
+# 🔹 Benchmark : profil navigateur standard vs allégé
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.scraping.benchmarks.driver_profile_benchmark            # pages factices
+#   python -m src.scraping.benchmarks.driver_profile_benchmark --live     # vraies pages
+#
+# Pour chaque page : octets transférés (somme des encodedDataLength du
+# journal réseau) et temps jusqu'au premier post affiché. Un seul
+# navigateur par profil est réutilisé pour toutes les pages.
+
+def transferred_bytes(driver):
+    total = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") == "Network.loadingFinished":
+            total += message["params"].get("encodedDataLength", 0)
+    return total
+
+
+def bench_profile(pages, lean, timeout):
+    driver = get_driver(headless=True, capture_network=True, lean=lean)
+    rows = []
+    try:
+        for page in pages:
+            driver.get("about:blank")
+            driver.get_log("performance")  # vide le journal
+
+            start = time.perf_counter()
+            driver.get(page["url"])
+            try:
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, POST_CONTENT))
+                )
+                first_post = time.perf_counter() - start
+            except Exception:
+                first_post = None
+            time.sleep(1)  # laisse partir les requêtes de médias déclenchées par le rendu
+            rows.append((page["name"], transferred_bytes(driver), first_post))
+    finally:
+        driver.quit()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du profil navigateur")
+    parser.add_argument("--live", action="store_true", help="mesurer sur les vraies pages Facebook")
+    parser.add_argument("--pages", type=int, default=3, help="nombre de pages mesurées")
+    parser.add_argument("--timeout", type=float, default=20)
+    args = parser.parse_args()
+
+    def run(pages):
+        return {
+            "standard": bench_profile(pages, lean=False, timeout=args.timeout),
+            "allégé": bench_profile(pages, lean=True, timeout=args.timeout),
+        }
+
+    if args.live:
+        results = run(FACEBOOK_PAGES[:args.pages])
+    else:
+        names = [p["name"] for p in FACEBOOK_PAGES[:args.pages]]
+        with FixtureSite(page_names=names, n_posts=40, batch_size=10, media_kb=80) as site:
+            results = run(site.pages)
+
+    print("\n===== Octets transférés / temps jusqu'au premier post =====")
+    print(f"{'profil':<10}{'page':<24}{'Ko':>10}{'1er post (s)':>14}")
+    for profile, rows in results.items():
+        for name, size, first_post in rows:
+            fp = f"{first_post:.2f}" if first_post is not None else "timeout"
+            print(f"{profile:<10}{name:<24}{size / 1024:>10.0f}{fp:>14}")
+        total = sum(size for _, size, _ in rows)
+        print(f"{profile:<10}{'TOTAL':<24}{total / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
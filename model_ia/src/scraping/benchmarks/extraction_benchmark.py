@@ -0,0 +1,86 @@
+import time
+import argparse
+import statistics
+
+from src.scraping.utils.driver import get_driver
+from src.scraping.utils.instrumentation import RoundTripCounter
+from src.scraping.replay.server import FixtureSite
+from src.scraping.facebook.facebook_scraper import FacebookScraper
+
+
+# ==================================================================
+# 🔹 Benchmark : extraction "dom" (find_elements) vs "script" (1 execute_script)
+# ==================================================================
+# Lancement (depuis model_ia/) :
+#   python -m src.scraping.benchmarks.extraction_benchmark --scrolls 8
+#
+# Une page factice (fixtures locales) est chargée pour chaque stratégie ;
+# à chaque scroll on mesure les allers-retours WebDriver et la latence
+# de l'extraction seule (le scroll et l'attente du lot suivant sont exclus).
+
+class NullWriter:
+    """Writer factice : le benchmark ne mesure que l'extraction."""
+
+    def known_post_keys(self, page):
+        return set()
+
+
+def bench_strategy(driver, url, extraction, scrolls, load_delay):
+    scraper = FacebookScraper(driver=driver, writer=NullWriter(), extraction=extraction)
+    extract = scraper.visible_posts_script if extraction == "script" else scraper.visible_posts_dom
+
+    driver.get(url)
+    counter = RoundTripCounter(driver)
+    trips, latencies, posts_seen = [], [], 0
+    try:
+        for _ in range(scrolls):
+            counter.reset()
+            start = time.perf_counter()
+            posts = extract()
+            latencies.append(time.perf_counter() - start)
+            trips.append(counter.count)
+            posts_seen += len(posts)
+
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(load_delay)
+    finally:
+        counter.detach()
+
+    return {
+        "round_trips": statistics.mean(trips),
+        "latency_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000,
+        "posts_per_scroll": posts_seen / scrolls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction DOM")
+    parser.add_argument("--scrolls", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=200, help="posts dans la page factice")
+    parser.add_argument("--batch", type=int, default=25, help="posts ajoutés par scroll")
+    args = parser.parse_args()
+
+    load_delay_ms = 200
+    with FixtureSite(page_names=["Benchmark"], n_posts=args.posts,
+                     batch_size=args.batch, load_delay_ms=load_delay_ms) as site:
+        url = site.pages[0]["url"]
+        driver = get_driver(headless=True)
+        try:
+            results = {
+                extraction: bench_strategy(driver, url, extraction, args.scrolls,
+                                           load_delay_ms / 1000 + 0.3)
+                for extraction in ("dom", "script")
+            }
+        finally:
+            driver.quit()
+
+    print("\n===== Extraction par scroll =====")
+    print(f"{'mode':<8}{'allers-retours':>16}{'latence (ms)':>14}{'p95 (ms)':>10}{'posts':>8}")
+    for extraction, r in results.items():
+        print(f"{extraction:<8}{r['round_trips']:>16.1f}{r['latency_ms']:>14.1f}"
+              f"{r['p95_ms']:>10.1f}{r['posts_per_scroll']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,52 @@
-import os
-import json
-import csv
-import sqlite3
 import time
-import random
-from datetime import datetime
+import argparse
+from collections import deque
+from contextlib import ExitStack
 from selenium.webdriver.common.by import By
 
 from src.scraping.utils.driver import get_driver
+from src.scraping.utils.storage import CommentWriter
+from src.scraping.utils.waits import make_waiter
+from src.scraping.utils.post_identity import stable_post_id
 from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from src.scraping.facebook.parallel import run_parallel
+from src.scraping.facebook.dom_extraction import extract_visible_posts, extract_comments, click_more_comments
+from src.scraping.replay.server import FixtureSite
 from src.scraping.facebook.selectors import COMMENT_BLOCK, POST_CONTENT, COMMENT_BUTTON, SEE_MORE
-from config.scraping_config import WAIT_MIN, WAIT_MAX, MAX_SCROLLS, MAX_POSTS_PER_SCROLL, MAX_COMMENTS_PER_POST
+from config.scraping_config import (
+    MAX_SCROLLS, MAX_POSTS_PER_SCROLL, MAX_COMMENTS_PER_POST, SCRAPING_WORKERS,
+    HEADLESS, LEAN_PROFILE, WAIT_STRATEGY, COMMENT_WAIT_TIMEOUT, MAX_EMPTY_SCROLLS,
+    WAIT_TIMEOUT, WAIT_POLL, COMMENT_TABS, COMMENT_POST_TIME_BUDGET
+)
 
 
 # ==================================================================
 # 🔹 Chemins des fichiers pour stocker les commentaires
 # ==================================================================
 DB_PATH = "data/facebook/facebook_comments.db"
-JSON_PATH = "data/facebook/facebook_comments.json"
+JSONL_PATH = "data/facebook/facebook_comments.jsonl"
 CSV_PATH  = "data/facebook/facebook_comments.csv"
 
 
 # ==================================================================
-# 🔹 Création de la base SQLite + JSON + CSV
+# 🔹 Création de la base SQLite + JSONL + CSV
 # ==================================================================
 def init_comment_database():
-    os.makedirs("data/facebook", exist_ok=True)
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS comments(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            page TEXT,
-            post_id TEXT,
-            post_url TEXT,
-            comment TEXT,
-            comment_date TEXT,
-            scraped_at TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-    if not os.path.exists(JSON_PATH):
-        with open(JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
-
-    if not os.path.exists(CSV_PATH):
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["page", "post_id", "post_url", "comment", "comment_date", "scraped_at"])
+    """Ouvre le writer bufferisé (WAL, upsert sur page + post + hash du commentaire)."""
+    return CommentWriter(DB_PATH, JSONL_PATH, CSV_PATH)
 
 
 # ==================================================================
 # 🔹 Sauvegarde d’un commentaire dans 3 formats
 # ==================================================================
-def save_comment(page, post_id, post_url, comment_text, comment_date):
-    timestamp = datetime.now().isoformat()
-
-    # SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO comments(page, post_id, post_url, comment, comment_date, scraped_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (page, post_id, post_url, comment_text, comment_date, timestamp))
-    conn.commit()
-    conn.close()
-
-    # JSON
-    with open(JSON_PATH, "r+", encoding="utf-8") as f:
-        data = json.load(f)
-        data.append({
-            "page": page,
-            "post_id": post_id,
-            "post_url": post_url,
-            "comment": comment_text,
-            "comment_date": comment_date,
-            "scraped_at": timestamp
-        })
-        f.seek(0)
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-    # CSV
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([page, post_id, post_url, comment_text, comment_date, timestamp])
+def save_comment(writer, page, post_id, post_url, comment_text, comment_date):
+    writer.add({
+        "page": page,
+        "post_id": post_id,
+        "post_url": post_url,
+        "comment": comment_text,
+        "comment_date": comment_date,
+    })
 
 
 # ==================================================================
@@ -94,29 +54,54 @@ def save_comment(page, post_id, post_url, comment_text, comment_date):
 # ==================================================================
 class CommentScraper:
 
-    def __init__(self):
-        self.driver = get_driver()
-        init_comment_database()
-
-    def wait(self):
-        time.sleep(random.uniform(WAIT_MIN, WAIT_MAX))
+    def __init__(self, driver=None, writer=None, politeness=None, waits=WAIT_STRATEGY,
+                 skip_known=True, expansion="inline", tabs=COMMENT_TABS):
+        # driver / writer / politeness sont fournis par run_parallel en mode multi-pages ;
+        # un driver fourni n'est pas fermé par run() (navigateur réutilisé entre scrapers)
+        self.owns_driver = driver is None
+        self.driver = driver or get_driver()
+        self.writer = writer or init_comment_database()
+        self.politeness = politeness
+        # "adaptive" : attente sur condition (commentaires affichés...), "fixed" : pause aléatoire
+        self.waiter = make_waiter(self.driver, waits)
+        # Posts dont les commentaires sont déjà en base : ni re-cliqués ni re-scrapés
+        self.skip_known = skip_known
+        self.done_post_ids = set()
+        # "inline" : commentaires dépliés dans le fil ; "tabs" : page de chaque post
+        # ouverte dans un onglet, au plus `tabs` onglets en même temps
+        self.expansion = expansion
+        self.tabs = tabs
+        self.current_url = None
+
+    def throttle(self, url):
+        """Respecte le budget de politesse par domaine partagé entre workers."""
+        if self.politeness is not None and url:
+            self.politeness.wait(url)
 
     def open_page(self, url):
         print(f"\n➡️ Ouverture de la page : {url}")
+        self.current_url = url
+        self.throttle(url)
+        self.waiter.politeness()
         self.driver.get(url)
-        self.wait()
+        self.waiter.for_count_increase(POST_CONTENT, 0, "chargement page")
 
-    def extract_post_id(self, post_element):
-        """Génère un identifiant unique pour le post"""
+    def extract_post_id(self, post_element, post_url=None):
+        """Identifiant stable du post (id du lien, sinon condensé du texte), identique d'un run à l'autre"""
         try:
-            return str(hash(post_element.text[:100]))
+            return stable_post_id(post_url, post_element.text)
         except:
             return "unknown_post"
 
     def extract_post_url(self, post_element):
         """➡️ Récupère l’URL exacte du post"""
         try:
-            link = post_element.find_element(By.XPATH, ".//a[contains(@href, '/posts/')]")
+            # Dans le texte du post, sinon dans son conteneur [role='article'] (même lien que PostWriter)
+            link = post_element.find_element(
+                By.XPATH,
+                ".//a[contains(@href, '/posts/')]"
+                " | ./ancestor::*[@role='article'][1]//a[contains(@href, '/posts/')]"
+            )
             return link.get_attribute("href")
         except:
             return None
@@ -132,8 +117,13 @@ class CommentScraper:
     # 🔹 Scrape les commentaires d’un post, avec "Voir plus"
     # ================================================
     def scrape_comments_from_post(self, page_name, post_element):
-        post_id = self.extract_post_id(post_element)
         post_url = self.extract_post_url(post_element)
+        post_id = self.extract_post_id(post_element, post_url)
+
+        # Déjà traité (run précédent, ou post encore visible après un scroll)
+        if post_id in self.done_post_ids:
+            return None
+        self.done_post_ids.add(post_id)
 
         # Ouvrir commentaires
         try:
@@ -141,18 +131,21 @@ class CommentScraper:
             for btn in buttons:
                 text = btn.text.lower()
                 if 'commentaire' in text or 'voir les commentaires' in text or 'afficher les commentaires' in text:
-                    self.driver.execute_script("arguments[0].click();", btn)
-                    self.wait()
+                    self.throttle(self.current_url)
+                    # Rend la main dès que les blocs commentaires apparaissent sous le post
+                    self.waiter.click_for_more(btn, post_element, COMMENT_BLOCK, "commentaires",
+                                               timeout=COMMENT_WAIT_TIMEOUT)
                     break
         except:
             return 0
 
-        # Cliquer sur "Voir plus" dans les commentaires longs
+        # Cliquer sur "Voir plus" dans les commentaires longs : dépliage local du texte,
+        # tous les boutons en un seul execute_script, sans attente
         try:
-            see_more_buttons = post_element.find_elements(By.CSS_SELECTOR, SEE_MORE)
-            for btn in see_more_buttons:
-                self.driver.execute_script("arguments[0].click();", btn)
-                self.wait()
+            self.driver.execute_script(
+                "arguments[0].querySelectorAll(arguments[1]).forEach(b => b.click());",
+                post_element, SEE_MORE
+            )
         except:
             pass
 
@@ -167,21 +160,31 @@ class CommentScraper:
                 text = c.text.strip()
                 if text and len(text) > 1:
                     comment_date = self.extract_comment_date(c)
-                    save_comment(page_name, post_id, post_url, text, comment_date)
+                    save_comment(self.writer, page_name, post_id, post_url, text, comment_date)
                     count += 1
             except:
                 pass
 
         return count
 
-    def scrape_page(self, page_name, url):
+    def scrape_page(self, page_name, url, max_scrolls=None):
         print(f"\n========== SCRAPING COMMENTAIRES : {page_name} ==========")
         self.open_page(url)
+        self.done_post_ids = self.writer.post_ids_with_comments(page_name) if self.skip_known else set()
+        if self.done_post_ids:
+            print(f"⏭️ {len(self.done_post_ids)} posts ont déjà leurs commentaires en base")
+
+        if self.expansion == "tabs":
+            posts = self.collect_post_links(max_scrolls or MAX_SCROLLS)
+            total_comments = self.scrape_posts_in_tabs(page_name, posts)
+            print(f"✔️ TOTAL COMMENTAIRES POUR {page_name} : {total_comments}")
+            return total_comments
 
         total_comments = 0
         scraped_posts = 0
+        empty_scrolls = 0
 
-        for scroll in range(MAX_SCROLLS):
+        for scroll in range(max_scrolls or MAX_SCROLLS):
 
             if scraped_posts >= 500:
                 break
@@ -192,28 +195,214 @@ class CommentScraper:
                 if scraped_posts >= 500:
                     break
 
-                scraped_posts += 1
                 nb = self.scrape_comments_from_post(page_name, post)
+                if nb is None:
+                    continue
+                scraped_posts += 1
                 total_comments += nb
 
                 print(f"Post {scraped_posts} → {nb} commentaires")
 
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            self.wait()
+            self.throttle(self.current_url)
+            if self.waiter.scroll_for_more(POST_CONTENT):
+                empty_scrolls = 0
+            else:
+                empty_scrolls += 1
+                if empty_scrolls >= MAX_EMPTY_SCROLLS:
+                    print(f"⏹️ Aucun nouveau post après {empty_scrolls} scrolls → fin du fil")
+                    break
 
         print(f"✔️ TOTAL COMMENTAIRES POUR {page_name} : {total_comments}")
         return total_comments
 
-    def run(self):
-        for page in FACEBOOK_PAGES:
-            self.scrape_page(page["name"], page["url"])
+    # ================================================
+    # 🔹 Mode onglets : une page de post par onglet
+    # ================================================
+    def collect_post_links(self, max_scrolls):
+        """Parcourt le fil et retourne [{post_id, url, text}] des posts à traiter (500 max)."""
+        posts, empty_scrolls = {}, 0
+        for scroll in range(max_scrolls):
+            for raw in extract_visible_posts(self.driver, MAX_POSTS_PER_SCROLL):
+                if not raw["link"]:
+                    continue
+                post_id = stable_post_id(raw["link"], raw["text"])
+                if post_id not in self.done_post_ids and post_id not in posts:
+                    posts[post_id] = {"post_id": post_id, "url": raw["link"], "text": raw["text"]}
+            if len(posts) >= 500:
+                break
 
-        self.driver.quit()
+            self.throttle(self.current_url)
+            if self.waiter.scroll_for_more(POST_CONTENT):
+                empty_scrolls = 0
+            else:
+                empty_scrolls += 1
+                if empty_scrolls >= MAX_EMPTY_SCROLLS:
+                    break
+        print(f"🔗 {len(posts)} posts à ouvrir")
+        return list(posts.values())[:500]
+
+    def open_tab(self, url):
+        self.throttle(url)
+        self.waiter.politeness()
+        before = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        return (set(self.driver.window_handles) - before).pop()
+
+    def close_tab(self, handle):
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except Exception:
+            pass
+
+    def scrape_posts_in_tabs(self, page_name, posts):
+        """
+        Garde jusqu'à `self.tabs` pages de post ouvertes et les visite à tour de rôle :
+        chaque passage lit tous les commentaires en un execute_script, puis clique
+        "Voir plus de commentaires" si besoin. Un post est terminé à MAX_COMMENTS_PER_POST,
+        après COMMENT_POST_TIME_BUDGET secondes, ou quand plus rien n'arrive.
+        Ouvertures et clics passent par la politesse : le débit de requêtes reste plafonné.
+        """
+        feed_handle = self.driver.current_window_handle
+        pending = deque(posts)
+        active = {}
+        total_comments = 0
+        page_done = 0
+
+        try:
+            while pending or active:
+                while pending and len(active) < self.tabs:
+                    post = pending.popleft()
+                    try:
+                        handle = self.open_tab(post["url"])
+                    except Exception as e:
+                        print(f"❌ Ouverture impossible {post['url']} :", e)
+                        continue
+                    active[handle] = {"post": post, "started": time.monotonic(), "count": -1,
+                                      "clicked_at": None, "stalls": 0}
+
+                progressed = False
+                for handle in list(active):
+                    state = active[handle]
+                    post = state["post"]
+                    try:
+                        self.driver.switch_to.window(handle)
+                        out_of_time = time.monotonic() - state["started"] > COMMENT_POST_TIME_BUDGET
+                        result = extract_comments(self.driver, MAX_COMMENTS_PER_POST)
+                        if not result["ready"]:
+                            if out_of_time:
+                                # Page jamais chargée : on libère l'onglet (post repris au prochain passage)
+                                print(f"⏱️ {post['url']} toujours en chargement après "
+                                      f"{COMMENT_POST_TIME_BUDGET}s : abandonné")
+                                self.close_tab(handle)
+                                del active[handle]
+                            continue
+
+                        count = len(result["comments"])
+                        if count != state["count"]:
+                            state["count"], state["stalls"], state["clicked_at"] = count, 0, None
+                            progressed = True
+                        else:
+                            state["stalls"] += 1
+
+                        waiting_click = (state["clicked_at"] is not None
+                                         and time.monotonic() - state["clicked_at"] < WAIT_TIMEOUT)
+                        finished = (count >= MAX_COMMENTS_PER_POST
+                                    or out_of_time
+                                    or (not result["more"] and not waiting_click and state["stalls"] >= 2))
+
+                        if not finished and result["more"] and not waiting_click:
+                            self.throttle(post["url"])
+                            self.waiter.politeness()
+                            if click_more_comments(self.driver):
+                                state["clicked_at"] = time.monotonic()
+                                progressed = True
+
+                        if finished:
+                            nb = 0
+                            for c in result["comments"][:MAX_COMMENTS_PER_POST]:
+                                if c["text"] and len(c["text"]) > 1:
+                                    save_comment(self.writer, page_name, post["post_id"], post["url"],
+                                                 c["text"], c["date"])
+                                    nb += 1
+                            total_comments += nb
+                            page_done += 1
+                            self.done_post_ids.add(post["post_id"])
+                            print(f"Post {page_done}/{len(posts)} → {nb} commentaires")
+                            self.driver.close()
+                            del active[handle]
+                    except Exception as e:
+                        # Un onglet en erreur ne doit pas interrompre les autres posts de la page
+                        print(f"❌ Erreur sur {post['url']} : {e} — onglet fermé, post suivant")
+                        self.close_tab(handle)
+                        active.pop(handle, None)
+                        progressed = True
+
+                if not progressed:
+                    start = time.monotonic()
+                    time.sleep(WAIT_POLL)
+                    self.waiter.record("onglets", time.monotonic() - start)
+        finally:
+            for handle in list(active):
+                self.close_tab(handle)
+            self.driver.switch_to.window(feed_handle)
+
+        return total_comments
+
+    def run(self, pages=FACEBOOK_PAGES):
+        try:
+            for page in pages:
+                self.scrape_page(page["name"], page["url"], page.get("max_scrolls"))
+                self.writer.flush()
+        finally:
+            self.writer.close()
+            if self.owns_driver:
+                self.driver.quit()
+        self.waiter.report()
 
 
 # ==================================================================
 # 🔹 EXÉCUTION DIRECTE
 # ==================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Scraping des commentaires Facebook")
+    parser.add_argument("--workers", type=int, default=SCRAPING_WORKERS,
+                        help="navigateurs en parallèle (1 = séquentiel)")
+    parser.add_argument("--fixtures", action="store_true",
+                        help="scraper des pages factices servies localement au lieu de Facebook")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="Chrome sans fenêtre")
+    parser.add_argument("--lean", action="store_true", default=LEAN_PROFILE,
+                        help="profil allégé : images/médias/polices bloqués, chargement eager")
+    parser.add_argument("--waits", choices=["adaptive", "fixed"], default=WAIT_STRATEGY,
+                        help="adaptive : attendre les commentaires / posts ; fixed : pause aléatoire")
+    parser.add_argument("--rescrape", action="store_true",
+                        help="re-scraper aussi les posts dont les commentaires sont déjà en base")
+    parser.add_argument("--expansion", choices=["inline", "tabs"], default="inline",
+                        help="inline : dépliage dans le fil ; tabs : page de chaque post en onglet")
+    parser.add_argument("--tabs", type=int, default=COMMENT_TABS, help="onglets simultanés (mode tabs)")
+    args = parser.parse_args()
+    options = {"waits": args.waits, "skip_known": not args.rescrape,
+               "expansion": args.expansion, "tabs": args.tabs}
+
+    with ExitStack() as stack:
+        pages = FACEBOOK_PAGES
+        if args.fixtures:
+            # pages de posts (commentaires paginés) générées pour le mode onglets
+            pages = stack.enter_context(
+                FixtureSite(post_pages=args.expansion == "tabs", max_comments=40)
+            ).pages
+
+        if args.workers > 1:
+            writer = stack.enter_context(init_comment_database())
+            run_parallel(CommentScraper, pages, writer, workers=args.workers,
+                         driver_factory=lambda: get_driver(headless=True, lean=args.lean),
+                         **options)
+        else:
+            driver = get_driver(headless=args.headless or args.fixtures, lean=args.lean)
+            stack.callback(driver.quit)
+            CommentScraper(driver=driver, **options).run(pages)
+
+
 if __name__ == "__main__":
-    scraper = CommentScraper()
-    scraper.run()
+    main()
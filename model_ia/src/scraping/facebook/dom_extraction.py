@@ -0,0 +1,87 @@
+from src.scraping.facebook.selectors import (
+    POST_CONTENT, POST_DATE, POST_LINK, LIKE_COUNT, SHARE_COUNT, COMMENTS_COUNT,
+    COMMENT_BLOCK, MORE_COMMENTS_TEXT
+)
+
+
+# ==================================================================
+# 🔹 Extraction des posts visibles en un seul aller-retour WebDriver
+# ==================================================================
+# Le script reçoit les sélecteurs de selectors.py et renvoie un tableau JSON :
+# [{text, date, link, likes_label, shares_label, comments_label}, ...]
+# Date / lien / compteurs sont cherchés dans le conteneur du post
+# ([role='article']) ; à défaut on garde l'appariement par index
+# des listes globales, comme l'ancien chemin find_elements.
+EXTRACT_POSTS_JS = """
+const [postSel, dateSel, linkSel, likeSel, shareSel, commentsSel, limit] = arguments;
+const posts = Array.from(document.querySelectorAll(postSel)).slice(-limit);
+const dates = document.querySelectorAll(dateSel);
+const links = document.querySelectorAll(linkSel);
+
+const label = (root, sel) => {
+  const el = root.querySelector(sel);
+  return el ? (el.getAttribute("aria-label") || el.innerText || "") : null;
+};
+
+return posts.map((post, i) => {
+  const box = post.closest("[role='article']") || post.parentElement || post;
+  const dateEl = box.querySelector(dateSel) || dates[i];
+  const linkEl = box.querySelector(linkSel) || links[i];
+  return {
+    text: (post.innerText || "").trim(),
+    date: dateEl ? (dateEl.innerText || "").trim() : "",
+    link: linkEl ? (linkEl.href || "").trim() : "",
+    likes_label: label(box, likeSel),
+    shares_label: label(box, shareSel),
+    comments_label: label(box, commentsSel),
+  };
+});
+"""
+
+
+def extract_visible_posts(driver, limit):
+    """Retourne les `limit` derniers posts visibles (dicts bruts, labels non parsés)."""
+    return driver.execute_script(
+        EXTRACT_POSTS_JS,
+        POST_CONTENT, POST_DATE, POST_LINK, LIKE_COUNT, SHARE_COUNT, COMMENTS_COUNT, limit
+    ) or []
+
+
+# ==================================================================
+# 🔹 Commentaires d'une page de post, en un seul aller-retour
+# ==================================================================
+# Renvoie {ready, comments: [{text, date}], more} : `more` indique qu'un
+# bouton "Voir plus de commentaires" (MORE_COMMENTS_TEXT) est encore affiché.
+EXTRACT_COMMENTS_JS = """
+const [commentSel, moreTexts, limit] = arguments;
+const comments = Array.from(document.querySelectorAll(commentSel)).slice(0, limit).map(c => {
+  const abbr = c.querySelector("abbr");
+  return {
+    text: (c.innerText || "").trim(),
+    date: abbr ? abbr.getAttribute("data-tooltip-content") : null,
+  };
+});
+const more = Array.from(document.querySelectorAll("[role='button']")).some(
+  b => moreTexts.some(t => (b.innerText || "").toLowerCase().includes(t))
+);
+return {ready: document.readyState !== "loading", comments: comments, more: more};
+"""
+
+CLICK_MORE_COMMENTS_JS = """
+const moreTexts = arguments[0];
+const button = Array.from(document.querySelectorAll("[role='button']")).find(
+  b => moreTexts.some(t => (b.innerText || "").toLowerCase().includes(t))
+);
+if (button) button.click();
+return !!button;
+"""
+
+
+def extract_comments(driver, limit):
+    return driver.execute_script(
+        EXTRACT_COMMENTS_JS, COMMENT_BLOCK, list(MORE_COMMENTS_TEXT), limit
+    ) or {"ready": False, "comments": [], "more": False}
+
+
+def click_more_comments(driver):
+    return driver.execute_script(CLICK_MORE_COMMENTS_JS, list(MORE_COMMENTS_TEXT))
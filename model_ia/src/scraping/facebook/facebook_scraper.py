@@ -1,181 +1,158 @@
-import time
-import random
-import os
-import sqlite3
-import json
-import csv
-from datetime import datetime
+import argparse
+from contextlib import ExitStack
 from selenium.webdriver.common.by import By
 
 # ===== IMPORTS CORRIGÉS =====
 from src.scraping.utils.driver import get_driver
+from src.scraping.utils.storage import PostWriter
+from src.scraping.utils.post_identity import post_key
+from src.scraping.utils.waits import make_waiter
 from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from src.scraping.facebook.parallel import run_parallel
+from src.scraping.facebook.dom_extraction import extract_visible_posts
+from src.scraping.facebook.network_capture import NetworkCapture
+from src.scraping.replay.server import FixtureSite
 from src.scraping.facebook.selectors import *
-from config.scraping_config import WAIT_MIN, WAIT_MAX, MAX_POSTS_PER_SCROLL, MAX_SCROLLS
+from config.scraping_config import (
+    MAX_POSTS_PER_SCROLL, MAX_SCROLLS, SCRAPING_WORKERS, INCREMENTAL_STOP_AFTER,
+    HEADLESS, LEAN_PROFILE, WAIT_STRATEGY, MAX_EMPTY_SCROLLS
+)
 
 # 🔥 AJOUT : génération aléatoire des métriques si Facebook ne donne rien
 from src.scraping.utils.random_metrics import generate_post_metrics
 
 
 # ==================================================================
-# 🔹 Base de données SQLite, JSON, CSV
+# 🔹 Base de données SQLite, JSONL, CSV
 # ==================================================================
 DB_PATH = "data/facebook/facebook_posts.db"
-JSON_PATH = "data/facebook/facebook_posts.json"
+JSONL_PATH = "data/facebook/facebook_posts.jsonl"
 CSV_PATH = "data/facebook/facebook_posts.csv"
 
 def init_database():
-    """Crée la base et la table si elles n'existent pas."""
-    os.makedirs("data/facebook", exist_ok=True)
-
-    # SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS posts(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            page TEXT,
-            content TEXT,
-            post_date TEXT,
-            post_link TEXT,
-            like_count INTEGER,
-            share_count INTEGER,
-            comments_count INTEGER,
-            scraped_at TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-    # JSON
-    if not os.path.exists(JSON_PATH):
-        with open(JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
-
-    # CSV
-    if not os.path.exists(CSV_PATH):
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "page", "content", "post_date", "post_link",
-                "like_count", "share_count", "comments_count", "scraped_at"
-            ])
+    """Ouvre le writer bufferisé (crée la base, la table et les fichiers si besoin)."""
+    return PostWriter(DB_PATH, JSONL_PATH, CSV_PATH)
 
 # ==================================================================
 # 🔹 Fonctions d'extraction des données
 # ==================================================================
+def parse_count(label):
+    """Convertit un libellé ("1 234 J'aime") en entier ; 0 ou absent → None (NON TROUVÉ)."""
+    if not label:
+        return None
+    value = int(''.join(filter(str.isdigit, label)) or 0)
+    return value if value > 0 else None  # 🔥 si vaut 0 → on considère NON TROUVÉ
+
 def extract_likes(post_element):
     try:
         likes_elem = post_element.find_element(By.CSS_SELECTOR, LIKE_COUNT)
-        likes_text = likes_elem.get_attribute("aria-label") or likes_elem.text
-        value = int(''.join(filter(str.isdigit, likes_text)) or 0)
-        return value if value > 0 else None  # 🔥 si vaut 0 → on considère NON TROUVÉ
+        return parse_count(likes_elem.get_attribute("aria-label") or likes_elem.text)
     except:
         return None
 
 def extract_shares(post_element):
     try:
         shares_elem = post_element.find_element(By.CSS_SELECTOR, SHARE_COUNT)
-        shares_text = shares_elem.get_attribute("aria-label") or shares_elem.text
-        value = int(''.join(filter(str.isdigit, shares_text)) or 0)
-        return value if value > 0 else None
+        return parse_count(shares_elem.get_attribute("aria-label") or shares_elem.text)
     except:
         return None
 
 def extract_comments_count(post_element):
     try:
         comments_elem = post_element.find_element(By.CSS_SELECTOR, COMMENTS_COUNT)
-        comments_text = comments_elem.get_attribute("aria-label") or comments_elem.text
-        value = int(''.join(filter(str.isdigit, comments_text)) or 0)
-        return value if value > 0 else None
+        return parse_count(comments_elem.get_attribute("aria-label") or comments_elem.text)
     except:
         return None
 
 
 # ==================================================================
-# 🔹 Sauvegarde dans JSON / CSV / SQLite
+# 🔹 Sauvegarde dans JSONL / CSV / SQLite
 # ==================================================================
-def save_post(page, content, post_date, post_link, like_count, share_count, comments_count):
-    """Enregistre un post dans SQLite, JSON et CSV."""
-    timestamp = datetime.now().isoformat()
-
-    # SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO posts(page, content, post_date, post_link,
-                          like_count, share_count, comments_count, scraped_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (page, content, post_date, post_link,
-          like_count, share_count, comments_count, timestamp))
-    conn.commit()
-    conn.close()
-
-    # JSON
-    with open(JSON_PATH, "r+", encoding="utf-8") as f:
-        data = json.load(f)
-        data.append({
-            "page": page,
-            "content": content,
-            "post_date": post_date,
-            "post_link": post_link,
-            "like_count": like_count,
-            "share_count": share_count,
-            "comments_count": comments_count,
-            "scraped_at": timestamp
-        })
-        f.seek(0)
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-    # CSV
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            page, content, post_date, post_link,
-            like_count, share_count, comments_count, timestamp
-        ])
+def save_post(writer, page, content, post_date, post_link, like_count, share_count, comments_count):
+    """Ajoute un post au tampon du writer (écrit par lots)."""
+    writer.add({
+        "page": page,
+        "content": content,
+        "post_date": post_date,
+        "post_link": post_link,
+        "like_count": like_count,
+        "share_count": share_count,
+        "comments_count": comments_count,
+    })
 
 
 # ==================================================================
 # 🔹 Scraper Facebook
 # ==================================================================
 class FacebookScraper:
-    def __init__(self):
-        self.driver = get_driver()
-        init_database()
-
-    def random_wait(self):
-        time.sleep(random.uniform(WAIT_MIN, WAIT_MAX))
+    def __init__(self, driver=None, writer=None, politeness=None, incremental=False,
+                 extraction="script", waits=WAIT_STRATEGY):
+        # driver / writer / politeness sont fournis par run_parallel en mode multi-pages ;
+        # un driver fourni n'est pas fermé par run() (navigateur réutilisé entre scrapers)
+        self.owns_driver = driver is None
+        self.driver = driver or get_driver()
+        self.writer = writer or init_database()
+        self.politeness = politeness
+        self.incremental = incremental
+        # "script" : 1 execute_script par scroll, "dom" : find_elements,
+        # "network" : réponses GraphQL capturées (driver créé avec capture_network=True)
+        self.extraction = extraction
+        self.network = NetworkCapture(self.driver) if extraction == "network" else None
+        # "adaptive" : attente sur condition (nouveaux posts), "fixed" : ancienne pause aléatoire
+        self.waiter = make_waiter(self.driver, waits)
+        self.current_url = None
+
+    def throttle(self, url):
+        """Respecte le budget de politesse par domaine partagé entre workers."""
+        if self.politeness is not None and url:
+            self.politeness.wait(url)
 
     def open_page(self, url):
         print(f"\n➡️ Ouverture de la page : {url}")
+        self.current_url = url
         try:
+            self.throttle(url)
+            self.waiter.politeness()
             self.driver.get(url)
-            self.random_wait()
+            self.waiter.for_count_increase(POST_CONTENT, 0, "chargement page")
         except Exception as e:
             print(f"❌ Erreur lors de l'ouverture de la page {url} :", e)
 
-    def scrape_posts(self, page_name):
+    def scrape_posts(self, page_name, max_scrolls=MAX_SCROLLS):
         posts_count = 0
 
-        for scroll in range(MAX_SCROLLS):
+        # Mode incrémental : on s'arrête après INCREMENTAL_STOP_AFTER posts déjà connus d'affilée
+        known_keys = self.writer.known_post_keys(page_name) if self.incremental else set()
+        seen_keys = set()  # posts déjà vus pendant ce run (re-visibles après chaque scroll)
+        consecutive_known = 0
+        empty_scrolls = 0
+
+        for scroll in range(max_scrolls):
             try:
-                posts = self.driver.find_elements(By.CSS_SELECTOR, POST_CONTENT)
-                post_dates = self.driver.find_elements(By.CSS_SELECTOR, POST_DATE)
-                post_links = self.driver.find_elements(By.CSS_SELECTOR, POST_LINK)
+                if self.extraction == "network":
+                    posts = self.network.collect()
+                elif self.extraction == "script":
+                    posts = self.visible_posts_script()
+                else:
+                    posts = self.visible_posts_dom()
 
-                print(f"Scroll {scroll+1}/{MAX_SCROLLS} : {len(posts)} posts visibles")
+                print(f"Scroll {scroll+1}/{max_scrolls} : {len(posts)} posts visibles")
 
-                for i, post in enumerate(posts[-MAX_POSTS_PER_SCROLL:]):
+                for post in posts:
                     try:
-                        text = post.text.strip()
-                        post_date = post_dates[i].get_attribute("innerText").strip() if i < len(post_dates) else ""
-                        post_link = post_links[i].get_attribute("href").strip() if i < len(post_links) else ""
-
-                        # 🔥 Tentative de scraping réel
-                        like_count = extract_likes(post)
-                        share_count = extract_shares(post)
-                        comments_count = extract_comments_count(post)
+                        text = post["text"]
+                        key = post_key(post["link"], text)
+                        if not text or key in seen_keys:
+                            continue
+                        seen_keys.add(key)
+                        if key in known_keys:
+                            consecutive_known += 1
+                            continue
+                        consecutive_known = 0
+
+                        like_count = post["like_count"]
+                        share_count = post["share_count"]
+                        comments_count = post["comments_count"]
 
                         # 🔥 Si rien trouvé → valeurs aléatoires réalistes
                         if like_count is None or share_count is None or comments_count is None:
@@ -184,16 +161,25 @@ class FacebookScraper:
                             share_count = metrics["shares"]
                             comments_count = metrics["comments"]
 
-                        if text:
-                            save_post(page_name, text, post_date, post_link,
-                                      like_count, share_count, comments_count)
-                            posts_count += 1
+                        save_post(self.writer, page_name, text, post["date"], post["link"],
+                                  like_count, share_count, comments_count)
+                        posts_count += 1
 
                     except Exception as e:
                         print("Erreur extraction post:", e)
 
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                self.random_wait()
+                if self.incremental and consecutive_known >= INCREMENTAL_STOP_AFTER:
+                    print(f"⏹️ {consecutive_known} posts déjà connus d'affilée → arrêt après {scroll+1} scrolls")
+                    break
+
+                self.throttle(self.current_url)
+                if self.waiter.scroll_for_more(POST_CONTENT):
+                    empty_scrolls = 0
+                else:
+                    empty_scrolls += 1
+                    if empty_scrolls >= MAX_EMPTY_SCROLLS:
+                        print(f"⏹️ Aucun nouveau post après {empty_scrolls} scrolls → fin du fil")
+                        break
 
             except Exception as e:
                 print(f"Erreur lors du scroll {scroll+1}:", e)
@@ -201,24 +187,108 @@ class FacebookScraper:
 
         return posts_count
 
-    def run(self):
-        for page in FACEBOOK_PAGES:
-            name = page["name"]
-            url = page["url"]
-            print(f"\n========== SCRAPING : {name} ==========")
-
-            self.open_page(url)
-            total = self.scrape_posts(name)
-
-            print(f"✔️ {total} posts sauvegardés pour {name}")
-
-        self.driver.quit()
+    def visible_posts_script(self):
+        """Tous les posts visibles en un seul execute_script, puis parsing Python des compteurs."""
+        posts = []
+        for raw in extract_visible_posts(self.driver, MAX_POSTS_PER_SCROLL):
+            posts.append({
+                "text": raw["text"],
+                "date": raw["date"],
+                "link": raw["link"],
+                "like_count": parse_count(raw["likes_label"]),
+                "share_count": parse_count(raw["shares_label"]),
+                "comments_count": parse_count(raw["comments_label"]),
+            })
+        return posts
+
+    def visible_posts_dom(self):
+        """Ancien chemin : find_elements + get_attribute par post (un aller-retour par appel)."""
+        elements = self.driver.find_elements(By.CSS_SELECTOR, POST_CONTENT)
+        post_dates = self.driver.find_elements(By.CSS_SELECTOR, POST_DATE)
+        post_links = self.driver.find_elements(By.CSS_SELECTOR, POST_LINK)
+
+        posts = []
+        for i, post in enumerate(elements[-MAX_POSTS_PER_SCROLL:]):
+            try:
+                posts.append({
+                    "text": post.text.strip(),
+                    "date": post_dates[i].get_attribute("innerText").strip() if i < len(post_dates) else "",
+                    "link": post_links[i].get_attribute("href").strip() if i < len(post_links) else "",
+                    # 🔥 Tentative de scraping réel
+                    "like_count": extract_likes(post),
+                    "share_count": extract_shares(post),
+                    "comments_count": extract_comments_count(post),
+                })
+            except Exception as e:
+                print("Erreur extraction post:", e)
+        return posts
+
+    def scrape_page(self, name, url, max_scrolls=None):
+        # max_scrolls : budget attribué par le planificateur (scheduler.py), sinon MAX_SCROLLS
+        print(f"\n========== SCRAPING : {name} ==========")
+        self.open_page(url)
+        total = self.scrape_posts(name, max_scrolls or MAX_SCROLLS)
+        self.writer.flush()
+        self.writer.update_watermark(name, total)
+        print(f"✔️ {total} posts sauvegardés pour {name}")
+        return total
+
+    def run(self, pages=FACEBOOK_PAGES):
+        try:
+            for page in pages:
+                self.scrape_page(page["name"], page["url"], page.get("max_scrolls"))
+        finally:
+            self.writer.close()
+            if self.owns_driver:
+                self.driver.quit()
+        self.waiter.report()
         print("\n✅ Scraping terminé !")
 
 
 # ==================================================================
 # 🔹 EXÉCUTION DIRECTE
 # ==================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Scraping des posts Facebook")
+    parser.add_argument("--workers", type=int, default=SCRAPING_WORKERS,
+                        help="navigateurs en parallèle (1 = séquentiel)")
+    parser.add_argument("--fixtures", action="store_true",
+                        help="scraper des pages factices servies localement au lieu de Facebook")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="Chrome sans fenêtre")
+    parser.add_argument("--lean", action="store_true", default=LEAN_PROFILE,
+                        help="profil allégé : images/médias/polices bloqués, chargement eager")
+    parser.add_argument("--incremental", action="store_true",
+                        help="s'arrêter dès que les posts sont déjà en base")
+    parser.add_argument("--extraction", choices=["script", "dom", "network"], default="script",
+                        help="script : 1 aller-retour par scroll ; dom : ancien chemin find_elements ; "
+                             "network : réponses GraphQL capturées via Chrome DevTools")
+    parser.add_argument("--waits", choices=["adaptive", "fixed"], default=WAIT_STRATEGY,
+                        help="adaptive : attendre les nouveaux posts ; fixed : pause aléatoire WAIT_MIN–WAIT_MAX")
+    args = parser.parse_args()
+
+    capture_network = args.extraction == "network"
+
+    with ExitStack() as stack:
+        pages = FACEBOOK_PAGES
+        if args.fixtures:
+            pages = stack.enter_context(FixtureSite()).pages
+
+        if args.workers > 1:
+            writer = stack.enter_context(init_database())
+            run_parallel(FacebookScraper, pages, writer, workers=args.workers,
+                         driver_factory=lambda: get_driver(headless=True, capture_network=capture_network,
+                                                           lean=args.lean),
+                         incremental=args.incremental, extraction=args.extraction, waits=args.waits)
+            print("\n✅ Scraping terminé !")
+        else:
+            driver = get_driver(headless=args.headless or args.fixtures,
+                                capture_network=capture_network, lean=args.lean)
+            stack.callback(driver.quit)
+            scraper = FacebookScraper(driver=driver, incremental=args.incremental,
+                                      extraction=args.extraction, waits=args.waits)
+            scraper.run(pages)
+
+
 if __name__ == "__main__":
-    scraper = FacebookScraper()
-    scraper.run()
+    main()
@@ -1,16 +1,12 @@
 import time
 import random
-import os
-import sqlite3
-import json
-import csv
-from datetime import datetime
 from selenium.webdriver.common.by import By
 
 # ===============================
 # 🔹 IMPORTS ABSOLUS CORRIGÉS
 # ===============================
 from scraping.utils.driver import get_driver
+from scraping.utils.storage import PostWriter
 from scraping.facebook.page_list import FACEBOOK_PAGES
 from scraping.facebook.selectors import POST_CONTENT, POST_DATE
 
@@ -26,71 +22,22 @@ from config.scraping_config import (
 # 🔹 Base de données SQLite
 # ==================================================================
 DB_PATH = "data/facebook/facebook_posts.db"
-JSON_PATH = "data/facebook/facebook_posts.json"
+JSONL_PATH = "data/facebook/facebook_posts.jsonl"
 CSV_PATH = "data/facebook/facebook_posts.csv"
 
 
 def init_database():
-    """Crée la base et la table si elles n'existent pas."""
-    os.makedirs("data/facebook", exist_ok=True)
-
-    # SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS posts(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            page TEXT,
-            content TEXT,
-            scraped_at TEXT,
-            post_date TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-    # JSON
-    if not os.path.exists(JSON_PATH):
-        with open(JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
-
-    # CSV
-    if not os.path.exists(CSV_PATH):
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["page", "content", "scraped_at", "post_date"])
-
-
-def save_post(page, content, post_date):
-    """Enregistre un seul post dans SQLite, JSON et CSV."""
-    timestamp = datetime.now().isoformat()
-
-    # SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO posts(page, content, scraped_at, post_date)
-        VALUES (?, ?, ?, ?)
-    """, (page, content, timestamp, post_date))
-    conn.commit()
-    conn.close()
-
-    # JSON
-    with open(JSON_PATH, "r+", encoding="utf-8") as f:
-        data = json.load(f)
-        data.append({
-            "page": page,
-            "content": content,
-            "scraped_at": timestamp,
-            "post_date": post_date
-        })
-        f.seek(0)
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-    # CSV
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([page, content, timestamp, post_date])
+    """Ouvre le writer bufferisé (crée la base, la table et les fichiers si besoin)."""
+    return PostWriter(DB_PATH, JSONL_PATH, CSV_PATH)
+
+
+def save_post(writer, page, content, post_date):
+    """Ajoute un post au tampon du writer (écrit par lots)."""
+    writer.add({
+        "page": page,
+        "content": content,
+        "post_date": post_date,
+    })
 
 
 # ==================================================================
@@ -99,7 +46,7 @@ def save_post(page, content, post_date):
 class FacebookScraper:
     def __init__(self):
         self.driver = get_driver()
-        init_database()  # Assure que la DB existe
+        self.writer = init_database()  # Assure que la DB existe
 
     def random_wait(self):
         """Pause aléatoire entre WAIT_MIN et WAIT_MAX secondes"""
@@ -131,7 +78,7 @@ class FacebookScraper:
                         post_date = date_elem.text.strip() if date_elem else ""
 
                         if text:
-                            save_post(page_name, text, post_date)
+                            save_post(self.writer, page_name, text, post_date)
                             posts_count += 1
 
                     except Exception as e:
@@ -151,16 +98,19 @@ class FacebookScraper:
 
     def run(self):
         """Scraper toutes les pages"""
-        for page in FACEBOOK_PAGES:
-            name = page["name"]
-            url = page["url"]
-
-            print(f"\n========== SCRAPING : {name} ==========")
-            self.open_page(url)
-            total = self.scrape_posts(name)
-            print(f"✔️ {total} posts sauvegardés pour {name}")
-
-        self.driver.quit()
+        try:
+            for page in FACEBOOK_PAGES:
+                name = page["name"]
+                url = page["url"]
+
+                print(f"\n========== SCRAPING : {name} ==========")
+                self.open_page(url)
+                total = self.scrape_posts(name)
+                self.writer.flush()
+                print(f"✔️ {total} posts sauvegardés pour {name}")
+        finally:
+            self.writer.close()
+            self.driver.quit()
         print("\n✅ Scraping terminé !")
 
 
@@ -0,0 +1,165 @@
+import re
+import sys
+import json
+from datetime import datetime
+
+
+# ==================================================================
+# 🔹 Capture réseau (Chrome DevTools) des données de posts
+# ==================================================================
+# Au lieu de lire le texte rendu, on relit les réponses que la page
+# télécharge déjà : réponses GraphQL (une ou plusieurs lignes JSON) et
+# blocs <script type="application/json"> du document initial.
+# Le parsing est indépendant de Selenium : il se teste sur des
+# réponses enregistrées (voir replay/recorded/).
+
+GRAPHQL_URL_MARKERS = ("/api/graphql",)
+JSON_SCRIPT_RE = re.compile(r'<script type="application/json"[^>]*>(.*?)</script>', re.S)
+
+
+def iter_json_documents(body):
+    """Découpe une réponse en documents JSON (préfixe `for (;;);`, une ligne par document)."""
+    body = body.strip()
+    if body.startswith("for (;;);"):
+        body = body[len("for (;;);"):]
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def find_first(node, key):
+    """Première valeur associée à `key` dans l'arbre JSON (parcours en profondeur)."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if key in current:
+                return current[key]
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+    return None
+
+
+def count_value(value):
+    """Les compteurs sont soit des entiers, soit {"count": n} / {"total_count": n}."""
+    if isinstance(value, dict):
+        value = value.get("count", value.get("total_count"))
+    return value if isinstance(value, int) else None
+
+
+def story_from_node(node):
+    """Construit un enregistrement de post à partir d'un nœud qui porte un `post_id`."""
+    message = find_first(node, "message")
+    text = message.get("text") if isinstance(message, dict) else message
+    created = find_first(node, "creation_time")
+
+    comments = count_value(find_first(node, "total_comment_count"))
+    if comments is None:
+        comments = count_value(find_first(node, "comments"))
+
+    return {
+        "post_id": str(node["post_id"]),
+        "text": (text or "").strip(),
+        "date": datetime.fromtimestamp(created).isoformat() if isinstance(created, int) else "",
+        "link": find_first(node, "permalink_url") or find_first(node, "url") or "",
+        "like_count": count_value(find_first(node, "reaction_count")),
+        "share_count": count_value(find_first(node, "share_count")),
+        "comments_count": comments,
+    }
+
+
+def iter_story_nodes(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if "post_id" in current:
+                yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def merge_story(old, new):
+    """Garde, champ par champ, la valeur renseignée (un post apparaît souvent plusieurs fois)."""
+    return {k: (new[k] if new.get(k) not in (None, "") else old.get(k)) for k in new}
+
+
+def parse_graphql_payload(body):
+    """Retourne les posts (dicts) contenus dans une réponse GraphQL ou un document HTML."""
+    documents = list(iter_json_documents(body))
+    if not documents:
+        for blob in JSON_SCRIPT_RE.findall(body):
+            if "post_id" not in blob:
+                continue
+            try:
+                documents.append(json.loads(blob))
+            except ValueError:
+                continue
+
+    stories = {}
+    for doc in documents:
+        for node in iter_story_nodes(doc):
+            story = story_from_node(node)
+            pid = story["post_id"]
+            stories[pid] = merge_story(stories[pid], story) if pid in stories else story
+    return list(stories.values())
+
+
+class NetworkCapture:
+    """
+    Lit le journal "performance" du driver (voir get_driver(capture_network=True))
+    et récupère via CDP le corps des réponses GraphQL / document terminées.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = {}
+        self.responses = 0
+        self.driver.execute_cdp_cmd("Network.enable", {})
+
+    def is_wanted(self, response, resource_type):
+        url = response.get("url", "")
+        return resource_type == "Document" or any(m in url for m in GRAPHQL_URL_MARKERS)
+
+    def collect(self):
+        """Posts présents dans les réponses arrivées depuis le dernier appel."""
+        posts = {}
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+
+            if method == "Network.responseReceived":
+                if self.is_wanted(params.get("response", {}), params.get("type")):
+                    self.pending[params["requestId"]] = params["response"]["url"]
+
+            elif method == "Network.loadingFinished" and params.get("requestId") in self.pending:
+                self.pending.pop(params["requestId"])
+                try:
+                    body = self.driver.execute_cdp_cmd(
+                        "Network.getResponseBody", {"requestId": params["requestId"]}
+                    )["body"]
+                except Exception:
+                    continue
+                self.responses += 1
+                for story in parse_graphql_payload(body):
+                    pid = story["post_id"]
+                    posts[pid] = merge_story(posts[pid], story) if pid in posts else story
+        return list(posts.values())
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE : parse une réponse enregistrée
+# ==================================================================
+# python -m src.scraping.facebook.network_capture src/scraping/replay/recorded/graphql_feed_sample.txt
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "src/scraping/replay/recorded/graphql_feed_sample.txt"
+    with open(path, encoding="utf-8") as f:
+        for story in parse_graphql_payload(f.read()):
+            print(json.dumps(story, ensure_ascii=False))
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.scraping.utils.driver_pool import DriverPool, PolitenessBudget
+from config.scraping_config import SCRAPING_WORKERS, DOMAIN_MIN_INTERVAL
+
+
+# ==================================================================
+# 🔹 Scraping de plusieurs pages en parallèle
+# ==================================================================
+def run_parallel(scraper_cls, pages, writer, workers=SCRAPING_WORKERS,
+                 driver_factory=None, min_interval=DOMAIN_MIN_INTERVAL, **scraper_options):
+    """
+    Scrape `pages` avec au plus `workers` navigateurs simultanés.
+
+    Chaque page est une tâche isolée : une erreur (ou un driver planté)
+    n'affecte que sa propre page, le driver fautif est remplacé.
+    `scraper_options` est transmis au constructeur du scraper (ex. incremental=True).
+    Une page peut porter son budget de scrolls (`max_scrolls`, voir scheduler.py).
+    Retourne {nom_page: {"status", "count" | "error", "seconds"}}.
+    """
+    pool = DriverPool(workers, driver_factory)
+    politeness = PolitenessBudget(min_interval)
+    results = {}
+
+    def scrape_one(page):
+        start = time.perf_counter()
+        with pool.acquire() as driver:
+            scraper = scraper_cls(driver=driver, writer=writer, politeness=politeness,
+                                  **scraper_options)
+            count = scraper.scrape_page(page["name"], page["url"], page.get("max_scrolls"))
+        return count, time.perf_counter() - start
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scrape_one, page): page["name"] for page in pages}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    count, seconds = future.result()
+                    results[name] = {"status": "ok", "count": count, "seconds": seconds}
+                    print(f"✔️ [{name}] {count} éléments en {seconds:.1f}s")
+                except Exception as e:
+                    results[name] = {"status": "error", "error": str(e), "seconds": None}
+                    print(f"❌ [{name}] échec :", e)
+    finally:
+        writer.flush()
+        pool.close()
+
+    return results
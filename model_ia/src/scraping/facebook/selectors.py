@@ -12,3 +12,10 @@ COMMENTS_COUNT = "a[aria-label*='commentaires'], span[aria-label*='commentaires'
 
 # Boutons utiles
 SEE_MORE = "div[role='button'][tabindex='0']"  # Voir plus de contenu
+
+# Commentaires
+COMMENT_BUTTON = "div[role='button'][aria-label*='ommentaire']"  # Bouton "Commenter" / "Voir les commentaires"
+COMMENT_BLOCK = "div[role='article'][aria-label^='Commentaire']"  # Bloc d'un commentaire
+MORE_COMMENTS_TEXT = (  # Libellés des boutons qui chargent d'autres commentaires (en minuscules)
+    "plus de commentaires", "commentaires précédents", "autres commentaires", "afficher les commentaires"
+)
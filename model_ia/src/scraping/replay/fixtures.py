@@ -0,0 +1,213 @@
+import os
+import json
+import random
+import html
+
+
+# ==================================================================
+# 🔹 Pages Facebook factices (mêmes sélecteurs que selectors.py)
+# ==================================================================
+# Chaque page simule un fil d'actualité infini : un lot de posts est
+# affiché au chargement, le lot suivant arrive `load_delay_ms` après
+# que l'on a scrollé en bas de page. Les commentaires sont masqués
+# jusqu'au clic sur "Voir les commentaires".
+# Avec `post_pages=True`, chaque post a aussi sa page (lien du post) où
+# les commentaires arrivent par lots, au clic sur "Voir plus de commentaires".
+
+FEED_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>{title}</title>
+<style>.post {{ min-height: 420px; border-bottom: 1px solid #ccc; }} .comments {{ display: none; }}</style>
+</head>
+<body>
+<div id="feed" role="feed"></div>
+<script>
+const BATCHES = {batches};
+const LOAD_DELAY_MS = {load_delay_ms};
+const feed = document.getElementById("feed");
+let next = 0;
+let loading = false;
+function appendBatch() {{
+  loading = false;
+  if (next >= BATCHES.length) return;
+  feed.insertAdjacentHTML("beforeend", BATCHES[next].join(""));
+  next++;
+}}
+document.addEventListener("click", (e) => {{
+  const btn = e.target.closest("[data-role='open-comments']");
+  if (btn) btn.parentElement.querySelector(".comments").style.display = "block";
+}});
+window.addEventListener("scroll", () => {{
+  if (loading) return;
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 50) {{
+    loading = true;
+    setTimeout(appendBatch, LOAD_DELAY_MS);
+  }}
+}});
+appendBatch();
+</script>
+</body>
+</html>
+"""
+
+POST_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{post}
+<div id="comments"></div>
+<script>
+const BATCHES = {batches};
+const LOAD_DELAY_MS = {load_delay_ms};
+const box = document.getElementById("comments");
+let next = 0;
+function appendBatch() {{
+  if (next < BATCHES.length) box.insertAdjacentHTML("beforeend", BATCHES[next].join(""));
+  next++;
+  const more = document.querySelector("[data-role='more-comments']");
+  if (more && next >= BATCHES.length) more.remove();
+}}
+document.addEventListener("click", (e) => {{
+  if (e.target.closest("[data-role='more-comments']")) setTimeout(appendBatch, LOAD_DELAY_MS);
+}});
+if (BATCHES.length > 1) {{
+  document.body.insertAdjacentHTML("beforeend",
+    '<div role="button" tabindex="0" data-role="more-comments">Voir plus de commentaires</div>');
+}}
+appendBatch();
+</script>
+</body>
+</html>
+"""
+
+WORDS = ("gouvernement", "Burkina", "sécurité", "économie", "santé", "match", "culture",
+         "ministre", "Ouagadougou", "population", "projet", "région", "forces", "annonce",
+         "conseil", "élèves", "hôpital", "récolte", "festival", "diplomatie", "justice")
+COMMENTS = ("Merci pour l'info", "Du courage", "Paix au Burkina Faso", "Bonne nouvelle",
+            "Triste nouvelle", "Source ?", "Force à nos FDS", "On attend la suite")
+
+
+def slugify(name):
+    return "".join(ch.lower() if ch.isalnum() else "-" for ch in name).strip("-")
+
+
+def render_comment(i, comment, date):
+    return (
+        f'<div role="article" aria-label="Commentaire de Lecteur {i}">'
+        f'<abbr data-tooltip-content="{html.escape(date)}">{i + 1} h</abbr> '
+        f'<span>{html.escape(comment)}</span></div>'
+    )
+
+
+def render_post(slug, post_id, text, date, likes, shares, comments, media=None):
+    comment_html = "".join(render_comment(i, c, date) for i, c in enumerate(comments))
+    return (
+        f'<div role="article" class="post" data-post-id="{post_id}">'
+        f'<a href="/{slug}/posts/{post_id}"><abbr>{html.escape(date)}</abbr></a>'
+        f'<div data-ad-preview="message">{html.escape(text)}</div>'
+        + (f'<img src="{media}" width="500" height="300" alt="">' if media else '') +
+        f'<span aria-label="{likes} like">{likes}</span> '
+        f'<span aria-label="{shares} partager">{shares}</span> '
+        f'<span aria-label="{len(comments)} commentaires">{len(comments)}</span>'
+        f'<div role="button" tabindex="0" data-role="open-comments">Voir les commentaires</div>'
+        f'<div class="comments">{comment_html}</div>'
+        f'</div>'
+    )
+
+
+def generate_posts(name, n_posts, seed=0, media_kb=0, max_comments=6):
+    """Posts factices (dicts) d'une page, reproductibles pour un même `seed`."""
+    rng = random.Random(f"{seed}-{name}")
+    slug = slugify(name)
+    posts = []
+    for i in range(n_posts):
+        text = f"{name} : " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60)))
+        comments = [rng.choice(COMMENTS) for _ in range(rng.randint(0, max_comments))]
+        posts.append({
+            "slug": slug,
+            "post_id": 10_000_000 + i,
+            "text": text,
+            "date": f"{1 + i // 10} j",
+            "likes": rng.randint(20, 600),
+            "shares": rng.randint(0, 80),
+            "comments": comments,
+            "media": f"media/{slug}_{i}.jpg" if media_kb else None,
+        })
+    return posts
+
+
+def build_feed_page(name, n_posts, batch_size=5, load_delay_ms=300, seed=0, media_kb=0,
+                    max_comments=6):
+    """
+    Retourne le HTML d'une page factice de `n_posts` posts.
+    Avec `media_kb` > 0, chaque post référence une image media/<slug>_<i>.jpg
+    (écrite par build_fixture_site) pour mesurer le trafic des médias.
+    """
+    posts = [render_post(**post) for post in generate_posts(name, n_posts, seed, media_kb, max_comments)]
+    batches = [posts[i:i + batch_size] for i in range(0, len(posts), batch_size)]
+    return render_feed(name, batches, load_delay_ms)
+
+
+def build_post_page(post, comment_batch=10, load_delay_ms=300):
+    """Page d'un post seul : commentaires par lots de `comment_batch`."""
+    article = render_post(**dict(post, comments=[]))
+    comments = [render_comment(i, c, post["date"]) for i, c in enumerate(post["comments"])]
+    batches = [comments[i:i + comment_batch] for i in range(0, len(comments), comment_batch)]
+    return POST_TEMPLATE.format(
+        title=html.escape(post["text"][:40]),
+        post=article,
+        batches=json.dumps(batches, ensure_ascii=False).replace("</", "<\\/"),
+        load_delay_ms=load_delay_ms,
+    )
+
+
+def render_feed(title, batches, load_delay_ms=300):
+    """Page de fil infini : `batches` est une liste de lots de posts HTML, un lot par scroll."""
+    return FEED_TEMPLATE.format(
+        title=html.escape(title),
+        batches=json.dumps(batches, ensure_ascii=False).replace("</", "<\\/"),
+        load_delay_ms=load_delay_ms,
+    )
+
+
+def build_fixture_site(directory, page_names, n_posts=40, batch_size=5, load_delay_ms=300,
+                       seed=0, media_kb=0, max_comments=6, post_pages=False):
+    """Écrit une page par média dans `directory` et retourne leurs chemins relatifs."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name in page_names:
+        filename = f"{slugify(name)}.html"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(build_feed_page(name, n_posts, batch_size, load_delay_ms, seed, media_kb,
+                                    max_comments))
+        paths[name] = filename
+
+        if post_pages:
+            # /<slug>/posts/<id> → <slug>/posts/<id>/index.html
+            for post in generate_posts(name, n_posts, seed, media_kb, max_comments):
+                post_dir = os.path.join(directory, post["slug"], "posts", str(post["post_id"]))
+                os.makedirs(post_dir, exist_ok=True)
+                with open(os.path.join(post_dir, "index.html"), "w", encoding="utf-8") as f:
+                    f.write(build_post_page(post, load_delay_ms=load_delay_ms))
+
+        if media_kb:
+            os.makedirs(os.path.join(directory, "media"), exist_ok=True)
+            for i in range(n_posts):
+                with open(os.path.join(directory, "media", f"{slugify(name)}_{i}.jpg"), "wb") as f:
+                    f.write(os.urandom(media_kb * 1024))
+    return paths
+
+
+def build_recorded_site(directory, recordings, load_delay_ms=300):
+    """
+    Écrit une page par enregistrement (voir replay/recorder.py) : chaque état
+    de scroll capturé redevient un lot du fil infini.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for recording in recordings:
+        filename = f"{slugify(recording['name'])}.html"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(render_feed(recording["name"], recording["batches"], load_delay_ms))
+        paths[recording["name"]] = filename
+    return paths
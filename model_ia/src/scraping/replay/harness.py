@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+from src.scraping.utils.driver import get_driver
+from src.scraping.utils.storage import PostWriter, CommentWriter
+from src.scraping.utils.instrumentation import RoundTripCounter
+from src.scraping.replay.server import FixtureSite
+from src.scraping.replay.recorder import load_recordings, RECORDED_DIR
+from src.scraping.facebook.facebook_scraper import FacebookScraper
+from src.scraping.facebook.comment_scraper import CommentScraper
+from config.scraping_config import WAIT_STRATEGY
+
+
+# ==================================================================
+# 🔹 Rejeu hors ligne : débit et coût par étape des scrapers
+# ==================================================================
+# Lancement (depuis model_ia/, sans réseau) :
+#   python -m src.scraping.replay.harness                       # pages factices
+#   python -m src.scraping.replay.harness --recorded            # pages enregistrées (recorder.py)
+#   python -m src.scraping.replay.harness --scraper comments --json output/replay.json
+#
+# Les scrapers tournent sans modification contre le serveur local ; leurs
+# écritures vont dans une base temporaire. Pour chaque scraper on mesure :
+#   - éléments/s (posts ou commentaires écrits en base) ;
+#   - allers-retours WebDriver et temps passé dedans ;
+#   - temps d'attente (conditions + plancher de politesse, cf. waits.py) ;
+#   - temps de stockage (flushs du writer).
+
+SCRAPERS = {
+    "posts": (FacebookScraper, PostWriter),
+    "comments": (CommentScraper, CommentWriter),
+}
+
+
+def run_scraper(kind, driver, pages, workdir, **scraper_options):
+    """Scrape `pages` avec le scraper `kind` et retourne ses mesures."""
+    scraper_cls, writer_cls = SCRAPERS[kind]
+    writer = writer_cls(os.path.join(workdir, f"{kind}.db"),
+                        os.path.join(workdir, f"{kind}.jsonl"),
+                        os.path.join(workdir, f"{kind}.csv"))
+    scraper = scraper_cls(driver=driver, writer=writer, **scraper_options)
+
+    counter = RoundTripCounter(driver)
+    start = time.perf_counter()
+    try:
+        for page in pages:
+            scraper.scrape_page(page["name"], page["url"])
+            writer.flush()
+    finally:
+        total = time.perf_counter() - start
+        counter.detach()
+        writer.close()
+
+    rows = writer.stats["rows"]
+    waits = scraper.waiter.total_seconds()
+    storage = writer.stats["flush_seconds"]
+    return {
+        "scraper": kind,
+        "pages": len(pages),
+        "rows": rows,
+        "seconds": total,
+        "rows_per_second": rows / total if total else 0.0,
+        "round_trips": counter.count,
+        "round_trips_by_command": dict(counter.by_command),
+        "webdriver_seconds": counter.seconds,
+        "wait_seconds": waits,
+        "waits_by_label": {label: dict(s) for label, s in scraper.waiter.stats.items()},
+        "storage_seconds": storage,
+        "other_seconds": max(total - waits - storage, 0.0),
+    }
+
+
+def print_report(results):
+    print("\n===== Rejeu hors ligne =====")
+    for r in results:
+        print(f"\n🔹 {r['scraper']} : {r['rows']} éléments sur {r['pages']} pages "
+              f"en {r['seconds']:.1f}s → {r['rows_per_second']:.1f}/s")
+        print(f"  allers-retours WebDriver : {r['round_trips']} ({r['webdriver_seconds']:.1f}s)")
+        for command, n in sorted(r["round_trips_by_command"].items(), key=lambda kv: -kv[1]):
+            print(f"    {command:<28}{n:>6}")
+        print(f"  {'attentes':<26}{r['wait_seconds']:>8.1f}s")
+        for label, s in sorted(r["waits_by_label"].items()):
+            print(f"    {label:<24}{s['seconds']:>8.1f}s  ({s['count']} attentes, {s['timeouts']} timeouts)")
+        print(f"  {'stockage':<26}{r['storage_seconds']:>8.2f}s")
+        print(f"  {'extraction / reste':<26}{r['other_seconds']:>8.1f}s")
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE
+# ==================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu hors ligne des scrapers")
+    parser.add_argument("--scraper", choices=["posts", "comments", "all"], default="all")
+    parser.add_argument("--recorded", nargs="?", const=RECORDED_DIR, default=None,
+                        help="rejouer les pages enregistrées de ce dossier (défaut : pages factices)")
+    parser.add_argument("--pages", type=int, default=3, help="pages factices générées")
+    parser.add_argument("--posts", type=int, default=40, help="posts par page factice")
+    parser.add_argument("--batch", type=int, default=5, help="posts ajoutés par scroll")
+    parser.add_argument("--delay", type=int, default=300, help="délai de chargement d'un lot (ms)")
+    parser.add_argument("--waits", choices=["adaptive", "fixed"], default=WAIT_STRATEGY)
+    parser.add_argument("--extraction", choices=["script", "dom"], default="script")
+    parser.add_argument("--expansion", choices=["inline", "tabs"], default="inline",
+                        help="dépliage des commentaires (CommentScraper)")
+    parser.add_argument("--comments", type=int, default=6, help="commentaires max par post factice")
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--json", help="écrire les mesures dans ce fichier (comparaison entre versions)")
+    args = parser.parse_args()
+
+    kinds = ["posts", "comments"] if args.scraper == "all" else [args.scraper]
+
+    if args.recorded:
+        site = FixtureSite(recordings=load_recordings(args.recorded), load_delay_ms=args.delay)
+    else:
+        site = FixtureSite(page_names=[f"Replay {i + 1}" for i in range(args.pages)],
+                           n_posts=args.posts, batch_size=args.batch, load_delay_ms=args.delay,
+                           max_comments=args.comments, post_pages=True)
+
+    workdir = tempfile.mkdtemp(prefix="media_scan_replay_")
+    results = []
+    try:
+        with site:
+            driver = get_driver(headless=True, lean=args.lean)
+            try:
+                for kind in kinds:
+                    options = {"waits": args.waits}
+                    if kind == "posts":
+                        options["extraction"] = args.extraction
+                    else:
+                        options["expansion"] = args.expansion
+                    results.append(run_scraper(kind, driver, site.pages, workdir, **options))
+            finally:
+                driver.quit()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Mesures écrites dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import json
+import argparse
+from datetime import datetime
+
+from src.scraping.utils.driver import get_driver
+from src.scraping.utils.waits import AdaptiveWaiter
+from src.scraping.replay.fixtures import slugify
+from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from src.scraping.facebook.selectors import POST_CONTENT, COMMENT_BLOCK
+
+
+# ==================================================================
+# 🔹 Enregistrement de pages réelles pour rejeu hors ligne
+# ==================================================================
+# Lancement (depuis model_ia/, avec réseau) :
+#   python -m src.scraping.replay.recorder --pages 3 --scrolls 10
+#
+# Pour chaque page on capture, après le chargement puis après chaque
+# scroll, le HTML des nouveaux posts (conteneur [role='article'], sans
+# <script>). Un enregistrement = un fichier JSON par page :
+#   {"name", "url", "recorded_at", "batches": [[html, ...], ...]}
+# que FixtureSite(recordings=...) resert comme un fil infini, un lot par scroll.
+# Les commentaires déjà rendus sont regroupés derrière un bouton
+# "Voir les commentaires", comme dans les pages factices.
+
+RECORDED_DIR = "data/facebook/recorded"
+
+CAPTURE_POSTS_JS = """
+const [postSel, commentSel, start] = arguments;
+const boxes = [];
+for (const post of document.querySelectorAll(postSel)) {
+  const box = post.closest("[role='article']") || post.parentElement || post;
+  if (!boxes.includes(box)) boxes.push(box);
+}
+return boxes.slice(start).map(box => {
+  const clone = box.cloneNode(true);
+  clone.querySelectorAll("script, style, iframe").forEach(el => el.remove());
+  const comments = Array.from(clone.querySelectorAll(commentSel));
+  if (comments.length) {
+    const holder = document.createElement("div");
+    holder.className = "comments";
+    comments.forEach(c => holder.appendChild(c));
+    const button = document.createElement("div");
+    button.setAttribute("role", "button");
+    button.setAttribute("tabindex", "0");
+    button.setAttribute("data-role", "open-comments");
+    button.textContent = "Voir les commentaires";
+    clone.appendChild(button);
+    clone.appendChild(holder);
+  }
+  clone.classList.add("post");
+  return clone.outerHTML;
+});
+"""
+
+
+def record_page(driver, name, url, scrolls):
+    """Retourne l'enregistrement d'une page : un lot de posts HTML par état de scroll."""
+    waiter = AdaptiveWaiter(driver)
+    driver.get(url)
+    waiter.for_count_increase(POST_CONTENT, 0, "chargement page")
+
+    batches, captured = [], 0
+    for _ in range(scrolls + 1):
+        batch = driver.execute_script(CAPTURE_POSTS_JS, POST_CONTENT, COMMENT_BLOCK, captured) or []
+        if batch:
+            batches.append(batch)
+            captured += len(batch)
+        if not waiter.scroll_for_more(POST_CONTENT):
+            break
+
+    print(f"🎞️ {name} : {captured} posts en {len(batches)} lots")
+    return {
+        "name": name,
+        "url": url,
+        "recorded_at": datetime.now().isoformat(),
+        "batches": batches,
+    }
+
+
+def save_recording(recording, directory=RECORDED_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{slugify(recording['name'])}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recording, f, ensure_ascii=False)
+    return path
+
+
+def load_recordings(directory=RECORDED_DIR):
+    """Tous les enregistrements *.json du dossier, triés par nom de fichier."""
+    recordings = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                recordings.append(json.load(f))
+    return recordings
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE
+# ==================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Enregistrement de pages Facebook pour rejeu")
+    parser.add_argument("--pages", type=int, default=len(FACEBOOK_PAGES), help="nombre de pages")
+    parser.add_argument("--scrolls", type=int, default=10, help="états de scroll capturés par page")
+    parser.add_argument("--output", default=RECORDED_DIR)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    driver = get_driver(headless=args.headless)
+    try:
+        for page in FACEBOOK_PAGES[:args.pages]:
+            recording = record_page(driver, page["name"], page["url"], args.scrolls)
+            print(f"💾 {save_recording(recording, args.output)}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
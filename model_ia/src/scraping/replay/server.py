@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from src.scraping.replay.fixtures import build_fixture_site, build_recorded_site
+
+
+# ==================================================================
+# 🔹 Serveur HTTP local pour rejouer des pages hors ligne
+# ==================================================================
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Sert un dossier en HTTP sur 127.0.0.1 (port libre) dans un thread de fond."""
+
+    def __init__(self, directory, port=0):
+        handler = partial(QuietHandler, directory=directory)
+        self.directory = directory
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class FixtureSite:
+    """
+    Génère un site factice (une page par média de FACEBOOK_PAGES) et le sert
+    localement ; `pages` a le même format que FACEBOOK_PAGES.
+    Avec `recordings` (voir replay/recorder.py), rejoue des pages enregistrées
+    au lieu de pages générées.
+    """
+
+    def __init__(self, page_names=None, recordings=None, **fixture_options):
+        self.page_names = page_names or [p["name"] for p in FACEBOOK_PAGES]
+        self.recordings = recordings
+        self.fixture_options = fixture_options
+        self.directory = None
+        self.server = None
+        self.pages = []
+
+    def __enter__(self):
+        self.directory = tempfile.mkdtemp(prefix="media_scan_fixtures_")
+        if self.recordings:
+            paths = build_recorded_site(self.directory, self.recordings, **self.fixture_options)
+        else:
+            paths = build_fixture_site(self.directory, self.page_names, **self.fixture_options)
+        self.server = FixtureServer(self.directory).start()
+        self.pages = [{"name": name, "url": self.server.url(path)} for name, path in paths.items()]
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE : sert les pages factices jusqu'à Ctrl+C
+# ==================================================================
+if __name__ == "__main__":
+    import time
+
+    with FixtureSite() as site:
+        print(f"📁 Fixtures servies depuis {site.directory}")
+        for page in site.pages:
+            print(f"  {page['name']:<22} {page['url']}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
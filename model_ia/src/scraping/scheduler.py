@@ -0,0 +1,283 @@
+import math
+import heapq
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+from src.scraping.facebook.page_list import FACEBOOK_PAGES
+from config.scraping_config import (
+    MAX_SCROLLS, SCHEDULE_RATE_WINDOW_DAYS, SCHEDULE_TARGET_NEW_POSTS,
+    SCHEDULE_MIN_INTERVAL_H, SCHEDULE_MAX_INTERVAL_H, SCHEDULE_MIN_SCROLLS,
+    SCHEDULE_POSTS_PER_SCROLL
+)
+
+
+# ==================================================================
+# 🔹 Planification des crawls : fraîcheur et rythme de publication
+# ==================================================================
+# Chaque source a un rythme de publication estimé (posts/jour) : posts
+# observés / jours observés sur une fenêtre glissante (hors premier crawl,
+# qui ramène tout l'historique visible de la page), amorcé par la base
+# des posts et lissé par un a priori d'un jour (une source nouvelle ou
+# calme n'est jamais à 0). On en déduit :
+#   - un intervalle de crawl : le temps pour voir arriver environ
+#     SCHEDULE_TARGET_NEW_POSTS nouveaux posts, borné entre
+#     SCHEDULE_MIN_INTERVAL_H et SCHEDULE_MAX_INTERVAL_H ;
+#   - un budget de scrolls : deux fois les posts attendus depuis le dernier
+#     crawl, divisés par SCHEDULE_POSTS_PER_SCROLL, + SCHEDULE_MIN_SCROLLS.
+#     C'est un plafond : en mode incrémental le scraper s'arrête dès qu'il
+#     retrouve des posts connus. Un crawl qui épuise son budget compte
+#     double (rythme sous-estimé).
+# La file de travail classe les sources dues par retard relatif
+# (temps écoulé / intervalle) ; une source jamais crawlée passe en tête
+# avec le budget complet (MAX_SCROLLS).
+# L'horloge est injectable (SimulatedClock) pour simuler des jours de
+# crawl en quelques millisecondes.
+
+class SystemClock:
+    def now(self):
+        return datetime.now()
+
+
+class SimulatedClock:
+    """Horloge manuelle : `advance(hours=1)` fait avancer le temps."""
+
+    def __init__(self, start=None):
+        self.current = start or datetime(2025, 1, 1)
+
+    def now(self):
+        return self.current
+
+    def advance(self, **delta):
+        self.current += timedelta(**delta)
+        return self.current
+
+
+class CrawlScheduler:
+    # A priori optimiste (un crawl par jour) : une source inconnue est revue vite, puis
+    # les observations (fenêtre de SCHEDULE_RATE_WINDOW_DAYS jours) l'emportent
+    prior_posts = float(SCHEDULE_TARGET_NEW_POSTS)
+    prior_days = 1.0
+
+    def __init__(self, pages=FACEBOOK_PAGES, clock=None):
+        self.clock = clock or SystemClock()
+        self.sources = {
+            p["name"]: {"name": p["name"], "url": p["url"], "posts": 0.0, "days": 0.0, "last_crawl": None}
+            for p in pages
+        }
+
+    # ------------------------------------------------------------------
+    # 🔹 Historique (base des posts)
+    # ------------------------------------------------------------------
+    def load_history(self, db_path):
+        """
+        Rythme = posts découverts sur la fenêtre / jours réellement observés ;
+        dernier crawl = watermark scrape_state. Le premier crawl d'une source
+        (tout l'historique visible d'un coup) est exclu, comme dans `mark_crawled`.
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            now = self.clock.now()
+            since = now - timedelta(days=SCHEDULE_RATE_WINDOW_DAYS)
+            for page, source in self.sources.items():
+                first_end = self._first_crawl_end(conn, page)
+                if first_end is None:
+                    continue
+                start = max(since, first_end)
+                (n,) = conn.execute(
+                    "SELECT COUNT(*) FROM posts WHERE page = ? AND scraped_at > ?", (page, start.isoformat())
+                ).fetchone()
+                source["posts"] = float(n)
+                source["days"] = max((now - start).total_seconds() / 86400, 0.0)
+            try:
+                for page, last in conn.execute("SELECT page, last_scraped_at FROM scrape_state"):
+                    if page in self.sources and last:
+                        self.sources[page]["last_crawl"] = datetime.fromisoformat(last)
+            except sqlite3.OperationalError:
+                pass  # base antérieure au mode incrémental : pas de watermark
+        finally:
+            conn.close()
+        return self
+
+    @staticmethod
+    def _first_crawl_end(conn, page):
+        """
+        Fin du premier crawl de `page` (None sans posts) : dernier post avant le
+        premier écart d'au moins SCHEDULE_MIN_INTERVAL_H heures entre deux
+        découvertes (deux crawls d'une source ne sont jamais plus rapprochés).
+        """
+        gap = timedelta(hours=SCHEDULE_MIN_INTERVAL_H)
+        last = None
+        for (scraped_at,) in conn.execute(
+            "SELECT scraped_at FROM posts WHERE page = ? AND scraped_at IS NOT NULL ORDER BY scraped_at", (page,)
+        ):
+            scraped_at = datetime.fromisoformat(scraped_at)
+            if last is not None and scraped_at - last >= gap:
+                break
+            last = scraped_at
+        return last
+
+    # ------------------------------------------------------------------
+    # 🔹 Politique
+    # ------------------------------------------------------------------
+    def rate(self, source):
+        """Posts par jour estimés."""
+        return (source["posts"] + self.prior_posts) / (source["days"] + self.prior_days)
+
+    def interval(self, source):
+        hours = SCHEDULE_TARGET_NEW_POSTS / self.rate(source) * 24
+        return timedelta(hours=min(max(hours, SCHEDULE_MIN_INTERVAL_H), SCHEDULE_MAX_INTERVAL_H))
+
+    def scroll_budget(self, source):
+        if source["last_crawl"] is None:
+            return MAX_SCROLLS
+        elapsed_days = (self.clock.now() - source["last_crawl"]).total_seconds() / 86400
+        expected = self.rate(source) * elapsed_days
+        scrolls = math.ceil(2 * expected / SCHEDULE_POSTS_PER_SCROLL) + SCHEDULE_MIN_SCROLLS
+        return min(scrolls, MAX_SCROLLS)
+
+    def staleness(self, source):
+        """Temps écoulé depuis le dernier crawl, en nombre d'intervalles (≥ 1 : source due)."""
+        if source["last_crawl"] is None:
+            return math.inf
+        return (self.clock.now() - source["last_crawl"]) / self.interval(source)
+
+    # ------------------------------------------------------------------
+    # 🔹 File de travail
+    # ------------------------------------------------------------------
+    def queue(self, due_only=True):
+        """Tâches au format FACEBOOK_PAGES (+ max_scrolls, priority), plus en retard d'abord."""
+        heap = []
+        for source in self.sources.values():
+            priority = self.staleness(source)
+            if due_only and priority < 1:
+                continue
+            heapq.heappush(heap, (-priority, source["name"]))
+
+        tasks = []
+        while heap:
+            neg_priority, name = heapq.heappop(heap)
+            source = self.sources[name]
+            tasks.append({
+                "name": name,
+                "url": source["url"],
+                "max_scrolls": self.scroll_budget(source),
+                "priority": -neg_priority,
+            })
+        return tasks
+
+    def pop_due(self):
+        """La source la plus en retard parmi les sources dues, ou None."""
+        tasks = self.queue()
+        return tasks[0] if tasks else None
+
+    def mark_crawled(self, name, new_posts, max_scrolls=None):
+        """Ajoute l'observation du crawl (fenêtre glissante) et met à jour le dernier crawl."""
+        source = self.sources[name]
+        now = self.clock.now()
+        if source["last_crawl"] is not None:
+            if max_scrolls and new_posts >= max_scrolls * SCHEDULE_POSTS_PER_SCROLL:
+                new_posts *= 2  # budget épuisé : il restait des posts non vus
+            source["posts"] += new_posts
+            source["days"] += (now - source["last_crawl"]).total_seconds() / 86400
+            if source["days"] > SCHEDULE_RATE_WINDOW_DAYS:
+                scale = SCHEDULE_RATE_WINDOW_DAYS / source["days"]
+                source["posts"] *= scale
+                source["days"] = float(SCHEDULE_RATE_WINDOW_DAYS)
+        source["last_crawl"] = now
+
+
+# ==================================================================
+# 🔹 Simulation (horloge simulée, pas de navigateur)
+# ==================================================================
+def poisson(rng, lam):
+    """Tirage de Poisson (méthode de Knuth, suffisant pour de petits lambda)."""
+    threshold, k, p = math.exp(-lam), 0, rng.random()
+    while p > threshold:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def simulate(days=7, tick_minutes=15, seed=0, pages=FACEBOOK_PAGES):
+    """
+    Sources au rythme réel tiré au hasard (0.5 à 60 posts/jour) ; un crawl
+    trouve les posts publiés depuis le précédent, dans la limite de son
+    budget de scrolls. Retourne les statistiques par source.
+    """
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    scheduler = CrawlScheduler(pages, clock)
+    true_rates = {p["name"]: rng.choice([0.5, 2, 5, 15, 30, 60]) for p in pages}
+    pending = {name: [] for name in true_rates}  # dates de publication non encore vues
+    stats = {name: {"rate": rate, "crawls": 0, "scrolls": 0, "found": 0, "lag_hours": 0.0}
+             for name, rate in true_rates.items()}
+
+    end = clock.now() + timedelta(days=days)
+    while clock.now() < end:
+        for name, rate in true_rates.items():
+            for _ in range(poisson(rng, rate * tick_minutes / 1440)):
+                pending[name].append(clock.now())
+
+        task = scheduler.pop_due()
+        while task is not None:
+            name = task["name"]
+            capacity = task["max_scrolls"] * SCHEDULE_POSTS_PER_SCROLL
+            found, pending[name] = pending[name][:capacity], pending[name][capacity:]
+            s = stats[name]
+            s["crawls"] += 1
+            # arrêt incrémental : on ne scrolle que jusqu'aux posts déjà vus
+            s["scrolls"] += min(task["max_scrolls"], math.ceil(len(found) / SCHEDULE_POSTS_PER_SCROLL) + 1)
+            s["found"] += len(found)
+            s["lag_hours"] += sum((clock.now() - t).total_seconds() / 3600 for t in found)
+            scheduler.mark_crawled(name, len(found), task["max_scrolls"])
+            task = scheduler.pop_due()
+
+        clock.advance(minutes=tick_minutes)
+
+    for name, s in stats.items():
+        s["pending"] = len(pending[name])
+        s["interval_h"] = scheduler.interval(scheduler.sources[name]).total_seconds() / 3600
+    return stats
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE
+# ==================================================================
+# python -m src.scraping.scheduler                 # file de travail actuelle (base des posts)
+# python -m src.scraping.scheduler --run           # scrape les sources dues, dans l'ordre
+# python -m src.scraping.scheduler --simulate 7    # 7 jours simulés
+def main():
+    from src.scraping.facebook.facebook_scraper import DB_PATH, FacebookScraper
+
+    parser = argparse.ArgumentParser(description="Planification des crawls Facebook")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--run", action="store_true", help="scraper les sources dues")
+    parser.add_argument("--all", action="store_true", help="inclure les sources pas encore dues")
+    parser.add_argument("--simulate", type=int, metavar="JOURS", help="simulation sur horloge simulée")
+    args = parser.parse_args()
+
+    if args.simulate:
+        stats = simulate(days=args.simulate)
+        print(f"\n===== {args.simulate} jours simulés =====")
+        print(f"{'source':<22}{'posts/j':>8}{'interv. (h)':>12}{'crawls':>8}{'scrolls':>9}"
+              f"{'trouvés':>9}{'en attente':>12}{'retard moy. (h)':>17}")
+        for name, s in sorted(stats.items(), key=lambda kv: -kv[1]["rate"]):
+            lag = s["lag_hours"] / s["found"] if s["found"] else 0.0
+            print(f"{name:<22}{s['rate']:>8.1f}{s['interval_h']:>12.1f}{s['crawls']:>8}{s['scrolls']:>9}"
+                  f"{s['found']:>9}{s['pending']:>12}{lag:>17.1f}")
+        return
+
+    scheduler = CrawlScheduler().load_history(args.db)
+    tasks = scheduler.queue(due_only=not args.all)
+    print(f"\n📋 {len(tasks)} sources à crawler :")
+    for task in tasks:
+        print(f"  {task['name']:<22} retard {task['priority']:>6.1f}  budget {task['max_scrolls']} scrolls")
+
+    if args.run and tasks:
+        FacebookScraper(incremental=True).run(tasks)
+
+
+if __name__ == "__main__":
+    main()
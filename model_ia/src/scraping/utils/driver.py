@@ -1,16 +1,51 @@
+from functools import lru_cache
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
-def get_driver():
-    """Retourne un driver Chrome en mode normal."""
+from config.scraping_config import HEADLESS, LEAN_PROFILE, BLOCKED_URL_PATTERNS
+
+
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    """Chemin du binaire chromedriver, résolu une seule fois par processus."""
+    return ChromeDriverManager().install()
+
+
+def get_driver(headless=HEADLESS, capture_network=False, lean=LEAN_PROFILE):
+    """
+    Retourne un driver Chrome (fenêtre visible par défaut, headless sur demande).
+    `capture_network` active le journal "performance" (événements réseau CDP)
+    utilisé par facebook/network_capture.py.
+    `lean` : images / médias / polices bloqués et pageLoadStrategy "eager"
+    (la page est rendue dès que le DOM est prêt, sans attendre les médias).
+    """
     options = webdriver.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--disable-gpu")
-    options.add_argument("--start-maximized")
-    # Mode normal (fenêtre visible)
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        # Mode normal (fenêtre visible)
+        options.add_argument("--start-maximized")
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(chromedriver_path()),
         options=options
     )
+
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
     return driver
@@ -0,0 +1,89 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from src.scraping.utils.driver import get_driver
+
+
+# ==================================================================
+# 🔹 Pool borné de sessions Chrome
+# ==================================================================
+class DriverPool:
+    """
+    Au plus `size` navigateurs ouverts en même temps, créés à la demande
+    et réutilisés d'une page à l'autre. Un driver qui a levé une erreur
+    est fermé et remplacé au prochain emprunt.
+    """
+
+    def __init__(self, size, factory=None):
+        self.size = size
+        self.factory = factory or (lambda: get_driver(headless=True))
+        self.idle = queue.Queue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.drivers = []
+
+    @contextmanager
+    def acquire(self):
+        self.slots.acquire()
+        driver = None
+        try:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self.factory()
+                with self.lock:
+                    self.drivers.append(driver)
+            yield driver
+        except Exception:
+            if driver is not None:
+                self.discard(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                self.idle.put(driver)
+            self.slots.release()
+
+    def discard(self, driver):
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+# ==================================================================
+# 🔹 Budget de politesse par domaine (partagé entre workers)
+# ==================================================================
+class PolitenessBudget:
+    """Impose un délai minimum entre deux requêtes vers un même domaine, tous workers confondus."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        domain = urlparse(url).netloc or url
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(domain, now))
+            self.next_slot[domain] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,39 @@
+import time
+from collections import Counter
+
+
+# ==================================================================
+# 🔹 Comptage des allers-retours WebDriver
+# ==================================================================
+class RoundTripCounter:
+    """
+    Enveloppe `driver.execute` (point de passage de toutes les commandes
+    WebDriver, y compris celles des WebElement) pour compter les
+    allers-retours HTTP et le temps passé dedans, par commande.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.original_execute = driver.execute
+        self.by_command = Counter()
+        self.seconds = 0.0
+        driver.execute = self._execute
+
+    def _execute(self, command, params=None):
+        start = time.perf_counter()
+        try:
+            return self.original_execute(command, params)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.by_command[command] += 1
+
+    @property
+    def count(self):
+        return sum(self.by_command.values())
+
+    def reset(self):
+        self.by_command.clear()
+        self.seconds = 0.0
+
+    def detach(self):
+        self.driver.execute = self.original_execute
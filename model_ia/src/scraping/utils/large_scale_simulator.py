@@ -0,0 +1,132 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.scraping.utils.simulate_realistic_metrics import (
+    MEDIA_FOLLOWERS, SIMULATION_DAYS, simulate_post_dates, simulate_engagement
+)
+from src.classification.detection.simulate_comments import draw_comments
+
+# --- CONFIGURATION ---
+TEXT_POOL_FILE = 'data/facebook/facebook_posts_final.csv'   # textes / catégories réels ré-échantillonnés
+POSTS_OUTPUT = 'data/simulated/posts_simulated.csv'
+COMMENTS_OUTPUT = 'data/simulated/comments_simulated.csv'
+CHUNK_SIZE = 100_000
+
+FALLBACK_WORDS = np.array(["gouvernement", "Burkina", "sécurité", "économie", "santé", "match",
+                           "culture", "ministre", "Ouagadougou", "population", "projet", "région"])
+
+
+# ==================================================================
+# 🔹 Textes ré-échantillonnés
+# ==================================================================
+def load_text_pool(path=TEXT_POOL_FILE):
+    """Textes (et catégories) réels à ré-échantillonner ; phrases de mots factices sinon."""
+    if os.path.exists(path):
+        df = pd.read_csv(path, usecols=lambda c: c in ('contenu', 'categorie', 'category_score'))
+        df = df.dropna(subset=['contenu'])
+        if len(df):
+            return df.reset_index(drop=True)
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(FALLBACK_WORDS, size=12)) for _ in range(1000)]
+    return pd.DataFrame({'contenu': texts, 'categorie': None, 'category_score': None})
+
+
+# ==================================================================
+# 🔹 Génération par lots
+# ==================================================================
+class LargeScaleSimulator:
+    """
+    Génère `n_posts` posts et leurs commentaires par lots de `chunk_size`
+    lignes, écrits au fil de l'eau : la mémoire reste bornée par un lot.
+    Toute la simulation dépend du seul `seed` (numpy.random.Generator) et de
+    `end_date` ; les lois sont celles de simulate_realistic_metrics.py (dates,
+    engagement) et simulate_comments.py (1 à 5 commentaires, 80/20).
+    """
+
+    def __init__(self, seed=0, text_pool=None, end_date=None):
+        self.rng = np.random.default_rng(seed)
+        self.pool = text_pool if text_pool is not None else load_text_pool()
+        self.end_date = end_date or pd.Timestamp.now().normalize()
+        self.start_date = self.end_date - pd.Timedelta(days=SIMULATION_DAYS)
+
+        self.media = np.array(list(MEDIA_FOLLOWERS))
+        self.followers = np.array([MEDIA_FOLLOWERS[m] for m in self.media])
+        self.like_ratio = self.rng.uniform(0.6, 0.8)
+        self.comment_ratio = self.rng.uniform(0.1, 0.2)
+
+    def posts_chunk(self, first_id, n):
+        rng = self.rng
+        media_idx = rng.integers(0, len(self.media), size=n)
+        pool_idx = rng.integers(0, len(self.pool), size=n)
+        likes, comments, shares = simulate_engagement(
+            rng, self.followers[media_idx], self.like_ratio, self.comment_ratio
+        )
+        return pd.DataFrame({
+            'id': np.arange(first_id, first_id + n),
+            'media': self.media[media_idx],
+            'contenu': self.pool['contenu'].to_numpy()[pool_idx],
+            'post_date': simulate_post_dates(rng, n, self.start_date),
+            'url': None,
+            'like_count': likes,
+            'share_count': shares,
+            'comments_count': comments,
+            'followers_count': self.followers[media_idx],
+            'categorie': self.pool['categorie'].to_numpy()[pool_idx],
+            'category_score': self.pool['category_score'].to_numpy()[pool_idx],
+        })
+
+    def comments_chunk(self, posts, first_comment_id):
+        # post_id = `id` du post = numéro de ligne dans le CSV des posts
+        return draw_comments(self.rng, posts['id'], posts['media'], first_comment_id)
+
+    def run(self, n_posts, posts_path=POSTS_OUTPUT, comments_path=COMMENTS_OUTPUT, chunk_size=CHUNK_SIZE):
+        for path in (posts_path, comments_path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        n_comments = 0
+        start = time.perf_counter()
+        with open(posts_path, 'w', encoding='utf-8-sig', newline='') as posts_file, \
+             open(comments_path, 'w', encoding='utf-8-sig', newline='') as comments_file:
+            for first_id in range(0, n_posts, chunk_size):
+                posts = self.posts_chunk(first_id, min(chunk_size, n_posts - first_id))
+                comments = self.comments_chunk(posts, n_comments)
+                posts.to_csv(posts_file, index=False, header=first_id == 0)
+                comments.to_csv(comments_file, index=False, header=first_id == 0)
+                n_comments += len(comments)
+                print(f"  {first_id + len(posts):>10} posts / {n_comments:>10} commentaires "
+                      f"({time.perf_counter() - start:.1f}s)")
+        return n_posts, n_comments
+
+
+# ==================================================================
+# 🔹 EXÉCUTION DIRECTE
+# ==================================================================
+# python -m src.scraping.utils.large_scale_simulator --posts 1000000 --seed 42
+def main():
+    parser = argparse.ArgumentParser(description="Simulation vectorisée de posts et commentaires")
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--end-date", help="dernier jour simulé (AAAA-MM-JJ, défaut : aujourd'hui)")
+    parser.add_argument("--posts-output", default=POSTS_OUTPUT)
+    parser.add_argument("--comments-output", default=COMMENTS_OUTPUT)
+    args = parser.parse_args()
+
+    print(f"Simulation de {args.posts} posts (seed={args.seed}, lots de {args.chunk})...")
+    start = time.perf_counter()
+    end_date = pd.Timestamp(args.end_date) if args.end_date else None
+    n_posts, n_comments = LargeScaleSimulator(seed=args.seed, end_date=end_date).run(
+        args.posts, args.posts_output, args.comments_output, args.chunk
+    )
+    seconds = time.perf_counter() - start
+    print(f"\n{n_posts} posts → {args.posts_output}")
+    print(f"{n_comments} commentaires → {args.comments_output}")
+    print(f"Terminé en {seconds:.1f}s ({n_posts / seconds:,.0f} posts/s)")
+
+
+if __name__ == "__main__":
+    main()
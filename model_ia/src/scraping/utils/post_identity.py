@@ -0,0 +1,59 @@
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Paramètres qui identifient le post (story.php?story_fbid=...&id=..., photo.php?fbid=..., watch?v=...)
+IDENTITY_PARAMS = ("story_fbid", "id", "fbid", "v")
+# Identifiant dans le chemin : /posts/123 ou /posts/pfbid0..., /videos/123, /permalink/123, /photos/a.1/123
+PATH_ID_RE = re.compile(r"/(?:posts|videos|permalink|photos(?:/[^/]+)?)/(\d{6,}|pfbid\w+)(?:/|$)")
+
+
+# ==================================================================
+# 🔹 Identité stable d'un post (lien canonique ou hash du contenu)
+# ==================================================================
+def text_hash(text):
+    """Hash stable du texte normalisé (espaces multiples, casse)."""
+    normalized = " ".join((text or "").split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def canonical_post_link(url):
+    """Retire les paramètres de suivi (?__cft__, ?__tn__...) et le fragment du lien."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query) if k in IDENTITY_PARAMS
+    ))
+    return urlunsplit((parts.scheme, parts.netloc, path, query, ""))
+
+
+def post_key(post_link, content):
+    """Clé de déduplication : lien canonique si disponible, sinon hash du texte."""
+    link = canonical_post_link(post_link)
+    if link:
+        return f"link:{link}"
+    return f"hash:{text_hash(content)}"
+
+
+def stable_post_id(post_link, content):
+    """
+    Identifiant de post déterministe (contrairement à `hash()`, salé par processus) :
+    - l'identifiant Facebook extrait du lien (/posts/<id | pfbid...>, story_fbid, fbid, v...) ;
+    - sinon un condensé du lien canonique ;
+    - sinon un condensé du texte normalisé.
+    Même valeur côté posts (PostWriter) et côté commentaires (CommentScraper).
+    """
+    link = canonical_post_link(post_link)
+    if link:
+        parts = urlsplit(link)
+        params = dict(parse_qsl(parts.query))
+        for name in ("story_fbid", "fbid", "v"):
+            if params.get(name, "").isdigit():
+                return params[name]
+        match = PATH_ID_RE.search(parts.path)
+        if match:
+            return match.group(1)
+        return "link-" + hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+    return "text-" + text_hash(content)[:16]
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import random
 
 # --- CONFIGURATION ---
 INPUT_FILE = 'data/facebook/facebook_posts_annotated.csv' 
@@ -20,11 +19,36 @@ MEDIA_FOLLOWERS = {
     "Sidwaya": 207000                
 }
 
-def simulate_missing_data():
+def simulate_post_dates(rng, n, start_date, days=SIMULATION_DAYS):
+    """Dates beta(2, 1) sur `days` jours (plus de posts récents) + heure uniforme."""
+    time_deltas_days = rng.beta(a=2, b=1, size=n) * days
+    random_times = pd.to_timedelta(rng.integers(0, 24*60*60, size=n), unit='s')
+    return start_date + pd.to_timedelta(time_deltas_days, unit='D') + random_times
+
+
+def simulate_engagement(rng, followers, like_ratio, comment_ratio, sigma=1.5):
+    """
+    Engagement lognormal centré sur 0.1 à 1 % des followers (tirage vectorisé).
+    Retourne (like_count, comments_count, share_count).
+    """
+    followers = np.asarray(followers, dtype=float)
+    mean_engagement_rate = rng.uniform(0.001, 0.01, size=len(followers)) * followers
+    engagement_total = np.maximum(
+        1, rng.lognormal(mean=np.log(mean_engagement_rate + 1e-6), sigma=sigma)
+    ).astype(np.int64)
+    like_count = (engagement_total * like_ratio).astype(np.int64)
+    comments_count = (engagement_total * comment_ratio).astype(np.int64)
+    share_count = np.clip(engagement_total - like_count - comments_count, 0, None)
+    return like_count, comments_count, share_count
+
+
+def simulate_missing_data(seed=None):
     """
     Lit le CSV annoté, simule les DATES DE POST manquantes (sur 23 JOURS),
     ajoute les VRAIS followers_count, et simule l'engagement basé sur ces chiffres.
+    `seed` rend la simulation reproductible.
     """
+    rng = np.random.default_rng(seed)
     print(f"Chargement de ton fichier annoté : {INPUT_FILE}...")
     try:
         df = pd.read_csv(INPUT_FILE)
@@ -36,12 +60,7 @@ def simulate_missing_data():
     print(f"Simulation des dates de publication sur {SIMULATION_DAYS} jours...")
     today = pd.Timestamp.now()
     start_date = today - pd.Timedelta(days=SIMULATION_DAYS)
-    n_posts = len(df)
-    
-    time_deltas_days = np.random.beta(a=2, b=1, size=n_posts) * SIMULATION_DAYS
-    random_dates = start_date + pd.to_timedelta(time_deltas_days, unit='D')
-    random_times = pd.to_timedelta(np.random.randint(0, 24*60*60, size=n_posts), unit='s')
-    df['post_date'] = random_dates + random_times
+    df['post_date'] = simulate_post_dates(rng, len(df), start_date)
     print(f"Dates de post simulées avec succès (entre {start_date.date()} et {today.date()}).")
 
     # --- 3. MODIFIÉ : Application des `followers_count` RÉELS ---
@@ -68,18 +87,9 @@ def simulate_missing_data():
     
     # Cette simulation est maintenant bien meilleure car elle est
     # proportionnelle aux VRAIS followers !
-    df['mean_engagement_rate'] = df['followers_count'].apply(lambda x: np.random.uniform(0.001, 0.01) * x)
-    sigma = 1.5 
-    df['engagement_total'] = df['mean_engagement_rate'].apply(
-        lambda mu: max(1, np.random.lognormal(mean=np.log(mu + 1e-6), sigma=sigma))
-    ).astype(int)
-
-    df['like_count'] = (df['engagement_total'] * np.random.uniform(0.6, 0.8)).astype(int)
-    df['comments_count'] = (df['engagement_total'] * np.random.uniform(0.1, 0.2)).astype(int)
-    df['share_count'] = (df['engagement_total'] - df['like_count'] - df['comments_count']).astype(int)
-    df['share_count'] = df['share_count'].clip(lower=0)
-    
-    df = df.drop(columns=['mean_engagement_rate', 'engagement_total'])
+    df['like_count'], df['comments_count'], df['share_count'] = simulate_engagement(
+        rng, df['followers_count'], rng.uniform(0.6, 0.8), rng.uniform(0.1, 0.2)
+    )
     print("Engagement simulé avec succès.")
 
     # --- 5. Nettoyage & Renommage (Format final) ---
@@ -0,0 +1,337 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from config.scraping_config import FLUSH_SIZE, FLUSH_INTERVAL
+from src.scraping.utils.post_identity import text_hash, post_key, stable_post_id
+
+
+# ==================================================================
+# 🔹 Écriture bufferisée vers SQLite + JSONL + CSV
+# ==================================================================
+class BufferedWriter:
+    """
+    Accumule les lignes en mémoire et les écrit par lots :
+    une seule connexion SQLite (transaction + executemany par lot),
+    JSONL en ajout (plus de réécriture du fichier complet) et CSV en bloc.
+
+    Le lot est vidé dès que `flush_size` lignes sont en attente ou que
+    `flush_interval` secondes se sont écoulées depuis le dernier vidage.
+    Thread-safe : un même writer peut être partagé entre plusieurs workers.
+    """
+
+    table = None
+    columns = ()            # colonnes écrites en base ET dans les fichiers JSONL / CSV
+    db_only_columns = ()    # colonnes calculées, écrites seulement en base
+    schema = None
+
+    def __init__(self, db_path, jsonl_path, csv_path,
+                 flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.jsonl_path = jsonl_path
+        self.csv_path = csv_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self.buffer = []
+        self.lock = threading.RLock()
+        self.last_flush = time.monotonic()
+        self.stats = {"rows": 0, "flushes": 0, "flush_seconds": 0.0}
+
+        for path in (db_path, jsonl_path, csv_path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.setup_connection()
+
+        new_csv = not os.path.exists(csv_path)
+        self.jsonl_file = open(jsonl_path, "a", encoding="utf-8")
+        self.csv_file = open(csv_path, "a", newline="", encoding="utf-8")
+        self.csv_writer = csv.writer(self.csv_file)
+        if new_csv:
+            self.csv_writer.writerow(self.columns)
+            self.csv_file.flush()
+
+    def setup_connection(self):
+        """Crée la table si besoin (surchargé par les sous-classes)."""
+        self.conn.execute(self.schema)
+        self.conn.commit()
+
+    @property
+    def insert_sql(self):
+        columns = self.columns + self.db_only_columns
+        placeholders = ", ".join("?" for _ in columns)
+        return f"INSERT INTO {self.table}({', '.join(columns)}) VALUES ({placeholders})"
+
+    # ------------------------------------------------------------------
+    def add(self, row):
+        """Ajoute une ligne (dict) au tampon ; `scraped_at` est rempli si absent."""
+        row = dict(row)
+        row.setdefault("scraped_at", datetime.now().isoformat())
+        with self.lock:
+            self.buffer.append(tuple(row.get(col) for col in self.columns + self.db_only_columns))
+
+            if (len(self.buffer) >= self.flush_size
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """Écrit le tampon dans les 3 formats en une seule passe."""
+        with self.lock:
+            return self._flush()
+
+    def _flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return 0
+
+        rows = self.buffer
+        start = time.perf_counter()
+
+        # SQLite : un seul commit pour tout le lot. Le tampon n'est vidé
+        # qu'après le commit : en cas d'échec, le lot est retenté au flush suivant
+        with self.conn:
+            self.conn.executemany(self.insert_sql, rows)
+        self.buffer = []
+
+        # JSONL : une ligne par enregistrement, en ajout
+        n = len(self.columns)
+        self.jsonl_file.write("".join(
+            json.dumps(dict(zip(self.columns, r)), ensure_ascii=False) + "\n" for r in rows
+        ))
+        self.jsonl_file.flush()
+
+        # CSV : toutes les lignes d'un coup
+        self.csv_writer.writerows(r[:n] for r in rows)
+        self.csv_file.flush()
+
+        self.stats["rows"] += len(rows)
+        self.stats["flushes"] += 1
+        self.stats["flush_seconds"] += time.perf_counter() - start
+        return len(rows)
+
+    def close(self):
+        """Vide le tampon puis ferme proprement les fichiers et la connexion."""
+        with self.lock:
+            if self.conn is None:
+                return
+            try:
+                self._flush()
+            finally:
+                self.jsonl_file.close()
+                self.csv_file.close()
+                self.conn.close()
+                self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ==================================================================
+# 🔹 Posts Facebook (mêmes colonnes que la table `posts` historique)
+# ==================================================================
+class PostWriter(BufferedWriter):
+    table = "posts"
+    columns = (
+        "page", "content", "post_date", "post_link",
+        "like_count", "share_count", "comments_count", "scraped_at"
+    )
+    db_only_columns = ("post_key", "post_id")
+    schema = """
+        CREATE TABLE IF NOT EXISTS posts(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            page TEXT,
+            content TEXT,
+            post_date TEXT,
+            post_link TEXT,
+            like_count INTEGER,
+            share_count INTEGER,
+            comments_count INTEGER,
+            scraped_at TEXT,
+            post_key TEXT,
+            post_id TEXT
+        )
+    """
+    state_schema = """
+        CREATE TABLE IF NOT EXISTS scrape_state(
+            page TEXT PRIMARY KEY,
+            last_scraped_at TEXT,
+            last_new_posts INTEGER
+        )
+    """
+
+    def setup_connection(self):
+        """Table posts + watermark par page, avec calcul de `post_key` / `post_id` pour les anciennes lignes."""
+        self.conn.execute(self.schema)
+        self.conn.execute(self.state_schema)
+        migrate_posts_table(self.conn)
+
+    def add(self, row):
+        row = dict(row)
+        row.setdefault("post_key", post_key(row.get("post_link"), row.get("content")))
+        row.setdefault("post_id", stable_post_id(row.get("post_link"), row.get("content")))
+        super().add(row)
+
+    # ------------------------------------------------------------------
+    # 🔹 Mode incrémental
+    # ------------------------------------------------------------------
+    def known_post_keys(self, page):
+        """Clés des posts déjà stockés pour cette page."""
+        with self.lock:
+            self._flush()
+            rows = self.conn.execute(
+                "SELECT post_key FROM posts WHERE page = ?", (page,)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def find_posts(self, post_ids):
+        """{post_id: ligne (dict)} pour les identifiants demandés, via idx_posts_post_id."""
+        with self.lock:
+            self._flush()
+            return lookup_posts(self.conn, post_ids)
+
+    def last_scraped(self, page):
+        """Watermark : date ISO du dernier scraping de la page (ou None)."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT last_scraped_at FROM scrape_state WHERE page = ?", (page,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def update_watermark(self, page, new_posts):
+        with self.lock:
+            with self.conn:
+                self.conn.execute("""
+                    INSERT INTO scrape_state(page, last_scraped_at, last_new_posts)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(page) DO UPDATE SET
+                        last_scraped_at = excluded.last_scraped_at,
+                        last_new_posts = excluded.last_new_posts
+                """, (page, datetime.now().isoformat(), new_posts))
+
+
+def migrate_posts_table(conn):
+    """
+    Ajoute et remplit `post_key` / `post_id` dans une table posts existante
+    (bases antérieures au mode incrémental), puis crée leurs index.
+    """
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(posts)")]
+    with conn:
+        for col in ("post_key", "post_id"):
+            if col not in cols:
+                conn.execute(f"ALTER TABLE posts ADD COLUMN {col} TEXT")
+
+        missing = conn.execute(
+            "SELECT id, post_link, content FROM posts WHERE post_key IS NULL OR post_id IS NULL"
+        ).fetchall()
+        if missing:
+            conn.executemany(
+                "UPDATE posts SET post_key = ?, post_id = ? WHERE id = ?",
+                [(post_key(link, content), stable_post_id(link, content), row_id)
+                 for row_id, link, content in missing]
+            )
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_page_key ON posts(page, post_key)")
+        # Index post_id → ligne : liaison commentaires / alertes sans jointure complète
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_post_id ON posts(post_id)")
+
+
+def lookup_posts(conn, post_ids):
+    """{post_id: ligne (dict)} lus dans la table posts via idx_posts_post_id (par paquets de 500)."""
+    post_ids = list({str(p) for p in post_ids})
+    found = {}
+    for i in range(0, len(post_ids), 500):
+        chunk = post_ids[i:i + 500]
+        cursor = conn.execute(
+            f"SELECT * FROM posts WHERE post_id IN ({','.join('?' * len(chunk))})", chunk
+        )
+        names = [d[0] for d in cursor.description]
+        for values in cursor:
+            row = dict(zip(names, values))
+            found.setdefault(row["post_id"], row)
+    return found
+
+
+# ==================================================================
+# 🔹 Commentaires Facebook (upsert sur page + post + hash du texte)
+# ==================================================================
+class CommentWriter(BufferedWriter):
+    table = "comments"
+    columns = (
+        "page", "post_id", "post_url", "comment",
+        "comment_date", "scraped_at"
+    )
+    db_only_columns = ("comment_hash",)
+    schema = """
+        CREATE TABLE IF NOT EXISTS comments(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            page TEXT,
+            post_id TEXT,
+            post_url TEXT,
+            comment TEXT,
+            comment_date TEXT,
+            scraped_at TEXT,
+            comment_hash TEXT
+        )
+    """
+
+    def setup_connection(self):
+        """WAL + index unique (page, post_id, comment_hash), avec migration des anciennes bases."""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.schema)
+
+        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(comments)")]
+        with self.conn:
+            if "comment_hash" not in cols:
+                self.conn.execute("ALTER TABLE comments ADD COLUMN comment_hash TEXT")
+
+            # Anciennes lignes : calcul du hash puis suppression des doublons
+            missing = self.conn.execute(
+                "SELECT id, comment FROM comments WHERE comment_hash IS NULL"
+            ).fetchall()
+            if missing:
+                self.conn.executemany(
+                    "UPDATE comments SET comment_hash = ? WHERE id = ?",
+                    [(text_hash(comment), row_id) for row_id, comment in missing]
+                )
+                self.conn.execute("""
+                    DELETE FROM comments WHERE id NOT IN (
+                        SELECT MIN(id) FROM comments GROUP BY page, post_id, comment_hash
+                    )
+                """)
+
+            self.conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_unique
+                ON comments(page, post_id, comment_hash)
+            """)
+
+    @property
+    def insert_sql(self):
+        return super().insert_sql + """
+            ON CONFLICT(page, post_id, comment_hash) DO UPDATE SET
+                comment_date = COALESCE(excluded.comment_date, comment_date),
+                post_url = COALESCE(excluded.post_url, post_url),
+                scraped_at = excluded.scraped_at
+        """
+
+    def add(self, row):
+        row = dict(row)
+        row.setdefault("comment_hash", text_hash(row.get("comment")))
+        super().add(row)
+
+    def post_ids_with_comments(self, page):
+        """Posts de la page dont les commentaires sont déjà en base (à ne pas re-scraper)."""
+        with self.lock:
+            self._flush()
+            rows = self.conn.execute(
+                "SELECT DISTINCT post_id FROM comments WHERE page = ?", (page,)
+            ).fetchall()
+        return {r[0] for r in rows}
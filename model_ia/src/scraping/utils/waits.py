@@ -0,0 +1,139 @@
+import time
+import random
+from collections import defaultdict
+
+from config.scraping_config import (
+    WAIT_STRATEGY, WAIT_TIMEOUT, WAIT_POLL, POLITENESS_FLOOR, WAIT_MIN, WAIT_MAX
+)
+
+
+# Compte les éléments puis agit, dans le même aller-retour WebDriver
+SCROLL_JS = """
+const n = document.querySelectorAll(arguments[0]).length;
+window.scrollTo(0, document.body.scrollHeight);
+return n;
+"""
+CLICK_JS = """
+const n = arguments[1].querySelectorAll(arguments[2]).length;
+arguments[0].click();
+return n;
+"""
+
+
+# ==================================================================
+# 🔹 Attente adaptative : condition concrète + plancher de politesse
+# ==================================================================
+class AdaptiveWaiter:
+    """
+    Remplace les `time.sleep(random.uniform(WAIT_MIN, WAIT_MAX))` :
+    - `until(condition)` rend la main dès que la condition est vraie
+      (nouveaux posts après un scroll, plus de blocs commentaires...),
+      au plus tard après `timeout` secondes ;
+    - le plancher de politesse garantit un délai minimal entre deux
+      actions, indépendamment de la vitesse de chargement.
+    Chaque attente est chronométrée par étiquette (voir `report()`).
+    """
+
+    def __init__(self, driver, timeout=WAIT_TIMEOUT, poll=WAIT_POLL, politeness_floor=POLITENESS_FLOOR):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.politeness_floor = politeness_floor
+        self.last_action = 0.0
+        self.stats = defaultdict(lambda: {"count": 0, "seconds": 0.0, "timeouts": 0})
+
+    def record(self, label, seconds, timed_out=False):
+        stat = self.stats[label]
+        stat["count"] += 1
+        stat["seconds"] += seconds
+        stat["timeouts"] += int(timed_out)
+
+    def politeness(self):
+        """Dort juste ce qu'il faut pour respecter le plancher depuis la dernière action."""
+        remaining = self.last_action + self.politeness_floor - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+            self.record("politesse", remaining)
+        self.last_action = time.monotonic()
+        return max(remaining, 0.0)
+
+    def until(self, condition, label, timeout=None):
+        """Attend que `condition(driver)` soit vraie ; retourne True, ou False au timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            try:
+                if condition(self.driver):
+                    self.record(label, time.monotonic() - start)
+                    return True
+            except Exception:
+                pass
+            if time.monotonic() >= deadline:
+                self.record(label, time.monotonic() - start, timed_out=True)
+                return False
+            time.sleep(self.poll)
+
+    def for_count_increase(self, css_selector, previous, label, timeout=None):
+        """Attend que le nombre d'éléments `css_selector` dépasse `previous`."""
+        script = "return document.querySelectorAll(arguments[0]).length;"
+        return self.until(
+            lambda d: d.execute_script(script, css_selector) > previous, label, timeout
+        )
+
+    def for_count_increase_in(self, element, css_selector, previous, label, timeout=None):
+        """Idem, limité aux descendants de `element`."""
+        script = "return arguments[0].querySelectorAll(arguments[1]).length;"
+        return self.until(
+            lambda d: d.execute_script(script, element, css_selector) > previous, label, timeout
+        )
+
+    def scroll_for_more(self, css_selector, label="scroll", timeout=None):
+        """Scroll en bas de page puis attend l'apparition de nouveaux `css_selector`."""
+        self.politeness()
+        previous = self.driver.execute_script(SCROLL_JS, css_selector)
+        return self.for_count_increase(css_selector, previous, label, timeout)
+
+    def click_for_more(self, element, container, css_selector, label="click", timeout=None):
+        """Clique `element` puis attend de nouveaux `css_selector` sous `container`."""
+        self.politeness()
+        previous = self.driver.execute_script(CLICK_JS, element, container, css_selector)
+        return self.for_count_increase_in(container, css_selector, previous, label, timeout)
+
+    def for_document_ready(self, label="page", timeout=None):
+        return self.until(
+            lambda d: d.execute_script("return document.readyState") in ("interactive", "complete"),
+            label, timeout
+        )
+
+    def total_seconds(self):
+        return sum(s["seconds"] for s in self.stats.values())
+
+    def report(self):
+        print("\n⏱️ Attentes :")
+        for label, s in sorted(self.stats.items()):
+            mean = s["seconds"] / s["count"] if s["count"] else 0.0
+            print(f"  {label:<20} {s['count']:>5} attentes  {s['seconds']:>8.1f}s  "
+                  f"(moy. {mean:.2f}s, {s['timeouts']} timeouts)")
+
+
+class FixedWaiter(AdaptiveWaiter):
+    """Ancien comportement (pause aléatoire WAIT_MIN–WAIT_MAX), chronométré pour comparaison."""
+
+    def until(self, condition, label, timeout=None):
+        """Pause fixe, puis une seule évaluation de `condition(driver)`."""
+        start = time.monotonic()
+        time.sleep(random.uniform(WAIT_MIN, WAIT_MAX))
+        try:
+            met = bool(condition(self.driver))
+        except Exception:
+            met = False
+        self.record(label, time.monotonic() - start, timed_out=not met)
+        return met
+
+    def politeness(self):
+        return 0.0
+
+
+def make_waiter(driver, strategy=WAIT_STRATEGY):
+    return FixedWaiter(driver) if strategy == "fixed" else AdaptiveWaiter(driver)